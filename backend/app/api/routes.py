@@ -1,17 +1,33 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import json
+import logging
+from datetime import date
 from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
 
-from app.core.cache import get_cache
+from app.core.cache import TieredCache, TTLCache, get_cache
 from app.core.config import Settings, get_settings
-from app.rag.pipeline import RagPipeline, build_pipeline
-from app.rag.schemas import JobHit, QueryRequest, QueryResponse
+from app.core.semantic_cache import SemanticCache, SemanticMatch
+from app.core.singleflight import SingleFlight
+from app.rag.pipeline import RagPipeline, RetrievalRequest, build_pipeline
+from app.rag.retrieval import MetadataFilter, RetrievedChunk
+from app.rag.schemas import BatchQueryRequest, BatchQueryResponse, JobFilters, JobHit, QueryRequest, QueryResponse
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+_EPOCH = date(1970, 1, 1)
+# Server-Timing entries that carry counts rather than durations.
+_COUNT_METRICS = ("rerank_k", "prompt_tokens")
+
+# Strong references to fire-and-forget tasks, so they are not garbage collected mid-run.
+_background_tasks: Set[asyncio.Task] = set()
 
 
 @lru_cache
@@ -25,6 +41,67 @@ def get_pipeline() -> RagPipeline:
     return build_pipeline(settings)
 
 
+@lru_cache
+def get_single_flight() -> SingleFlight:
+    """Create and cache the process-wide query coalescer.
+
+    Returns:
+        A SingleFlight, using Redis locks across workers when Redis is reachable.
+    """
+    settings = get_settings()
+    return SingleFlight(
+        redis=get_cache(settings) if settings.cache_ttl_seconds > 0 else None,
+        lock_ttl_seconds=settings.singleflight_lock_ttl_seconds,
+        wait_timeout_seconds=settings.singleflight_wait_timeout_seconds,
+        poll_interval_seconds=settings.singleflight_poll_interval_ms / 1000,
+    )
+
+
+@lru_cache
+def get_response_cache() -> Optional[TieredCache]:
+    """Create and cache the process-wide response cache.
+
+    Returns:
+        A TieredCache (in-process L1 in front of Redis), or None when `CACHE_TTL_SECONDS` is 0.
+    """
+    settings = get_settings()
+    if settings.cache_ttl_seconds <= 0:
+        return None
+    l1 = None
+    if settings.response_cache_l1_entries > 0:
+        l1 = TTLCache(
+            settings.response_cache_l1_entries,
+            settings.cache_ttl_seconds,
+            max_bytes=settings.response_cache_l1_max_bytes,
+            stale_seconds=settings.response_cache_stale_seconds,
+        )
+    return TieredCache(
+        client_factory=lambda: get_cache(settings),
+        ttl_seconds=settings.cache_ttl_seconds,
+        encode=lambda response: response.model_dump_json(),
+        decode=QueryResponse.model_validate_json,
+        l1=l1,
+    )
+
+
+@lru_cache
+def get_semantic_cache() -> Optional[SemanticCache]:
+    """Create and cache the process-wide semantic response cache.
+
+    Returns:
+        A SemanticCache, or None when `SEMANTIC_CACHE_SIZE` or `CACHE_TTL_SECONDS` is 0.
+    """
+    settings = get_settings()
+    if settings.semantic_cache_size <= 0 or settings.cache_ttl_seconds <= 0:
+        return None
+    return SemanticCache(
+        settings.semantic_cache_size,
+        settings.semantic_cache_threshold,
+        ttl_seconds=settings.cache_ttl_seconds,
+        sample_rate=settings.semantic_cache_sample_rate,
+    )
+
+
 def _to_hit(chunk) -> JobHit:
     """Convert a retrieved chunk into an API response hit.
 
@@ -46,6 +123,126 @@ def _to_hit(chunk) -> JobHit:
     )
 
 
+def _resolve_options(payload: QueryRequest, settings: Settings) -> Tuple[int, bool, bool]:
+    """Apply settings defaults to a request's optional retrieval options.
+
+    Args:
+        payload: The query request payload.
+        settings: Application settings.
+    Returns:
+        A tuple of (top_k, use_hybrid, use_rerank).
+    """
+    top_k = payload.top_k or settings.top_k
+    use_hybrid = payload.use_hybrid if payload.use_hybrid is not None else settings.use_hybrid
+    use_rerank = payload.use_rerank if payload.use_rerank is not None else bool(settings.rerank_model)
+    return top_k, use_hybrid, use_rerank
+
+
+def _latency_budget(payload: QueryRequest, settings: Settings) -> Optional[float]:
+    """Resolve the retrieval latency budget for a request.
+
+    Args:
+        payload: The query request payload.
+        settings: Application settings.
+    Returns:
+        The budget in milliseconds, or None for no budget.
+    """
+    return payload.latency_budget_ms or settings.latency_budget_ms or None
+
+
+def _metadata_filter(filters: Optional[JobFilters]) -> Optional[MetadataFilter]:
+    """Convert request filters into a retrieval filter.
+
+    Args:
+        filters: Filters from the request payload.
+    Returns:
+        The equivalent MetadataFilter, or None when no filters were given.
+    """
+    if filters is None:
+        return None
+    return MetadataFilter(
+        level=tuple(filters.level),
+        location=tuple(filters.location),
+        category=tuple(filters.category),
+        published_since=(filters.published_since - _EPOCH).days if filters.published_since else None,
+        published_before=(filters.published_before - _EPOCH).days if filters.published_before else None,
+    )
+
+
+def _resolved(payload: QueryRequest, pipeline: RagPipeline) -> QueryRequest:
+    """Replace a request's filters with the effective ones.
+
+    Args:
+        payload: The query request payload.
+        pipeline: RAG pipeline resolving the filters.
+    Returns:
+        A copy of the payload with resolved `filters` and no `extract_filters`.
+    """
+    resolved = pipeline.resolve_filters(payload.query, _metadata_filter(payload.filters), payload.extract_filters)
+    filters = JobFilters(**resolved.as_dict()) if resolved is not None else None
+    return payload.model_copy(update={"filters": filters, "extract_filters": None})
+
+
+async def _with_filters(payloads: List[QueryRequest], pipeline: RagPipeline) -> List[QueryRequest]:
+    """Resolve the effective filters of a batch of requests.
+
+    Explicit filters are merged with those extracted from the query text
+    (when enabled), so cache keys and semantic namespaces reflect what
+    retrieval actually searches. Resolution runs in one worker thread for
+    the whole batch; requests without filters or extraction skip it.
+
+    Args:
+        payloads: The query request payloads.
+        pipeline: RAG pipeline resolving the filters.
+    Returns:
+        Copies of the payloads with resolved `filters` and no `extract_filters`.
+    """
+
+    def needs_resolving(payload: QueryRequest) -> bool:
+        extract = pipeline.filter_extraction if payload.extract_filters is None else payload.extract_filters
+        return payload.filters is not None or extract
+
+    if not any(needs_resolving(payload) for payload in payloads):
+        return [payload.model_copy(update={"extract_filters": None}) for payload in payloads]
+    return await asyncio.to_thread(lambda: [_resolved(payload, pipeline) for payload in payloads])
+
+
+def _server_timing(timings: Dict[str, float]) -> str:
+    """Format stage timings as a `Server-Timing` header value.
+
+    Args:
+        timings: Stage durations in milliseconds, plus the rerank depth under "rerank_k"
+            and the prompt size under "prompt_tokens".
+    Returns:
+        The header value.
+    """
+    metrics = []
+    for name, value in timings.items():
+        metrics.append(f'{name};desc="{int(value)}"' if name in _COUNT_METRICS else f"{name};dur={value:.1f}")
+    return ", ".join(metrics)
+
+
+def _cache_options(payload: QueryRequest, top_k: int, use_hybrid: bool, use_rerank: bool) -> Dict[str, Any]:
+    """Collect the request options that a cached response depends on, besides the query.
+
+    Args:
+        payload: The query request payload.
+        top_k: The number of results to return.
+        use_hybrid: Whether hybrid retrieval is enabled.
+        use_rerank: Whether reranking is enabled.
+    Returns:
+        A JSON-serializable dict of options.
+    """
+    return {
+        "top_k": top_k,
+        "use_hybrid": use_hybrid,
+        "use_rerank": use_rerank,
+        "nprobe": payload.nprobe,
+        "latency_budget_ms": payload.latency_budget_ms,
+        "filters": payload.filters.model_dump(mode="json") if payload.filters is not None else None,
+    }
+
+
 def _cache_key(payload: QueryRequest, top_k: int, use_hybrid: bool, use_rerank: bool) -> str:
     """Build a stable cache key for a query request.
 
@@ -58,64 +255,412 @@ def _cache_key(payload: QueryRequest, top_k: int, use_hybrid: bool, use_rerank:
         A deterministic cache key string.
     """
     blob = json.dumps(
-        {
-            "query": payload.query,
-            "top_k": top_k,
-            "use_hybrid": use_hybrid,
-            "use_rerank": use_rerank,
-        },
+        {"query": payload.query, **_cache_options(payload, top_k, use_hybrid, use_rerank)},
         sort_keys=True,
     )
     return f"query:{hashlib.sha256(blob.encode('utf-8')).hexdigest()}"
 
 
+def _semantic_namespace(payload: QueryRequest, top_k: int, use_hybrid: bool, use_rerank: bool) -> str:
+    """Build the semantic cache namespace: options that must match exactly for a hit.
+
+    Args:
+        payload: The query request payload.
+        top_k: The number of results to return.
+        use_hybrid: Whether hybrid retrieval is enabled.
+        use_rerank: Whether reranking is enabled.
+    Returns:
+        A deterministic namespace string.
+    """
+    return json.dumps(_cache_options(payload, top_k, use_hybrid, use_rerank), sort_keys=True)
+
+
+async def _embed_query(pipeline: RagPipeline, query: str) -> List[float]:
+    """Embed a query in a worker thread, reusing the pipeline's query embedding cache.
+
+    Args:
+        pipeline: RAG pipeline whose embedding model is used.
+        query: User query string.
+    Returns:
+        The unit-norm query embedding.
+    """
+    return (await asyncio.to_thread(pipeline.retriever.embedding_model.embed_query, [query]))[0]
+
+
+async def _semantic_lookup(
+    payload: QueryRequest,
+    top_k: int,
+    use_hybrid: bool,
+    use_rerank: bool,
+    pipeline: RagPipeline,
+    semantic_cache: SemanticCache,
+) -> Optional[QueryResponse]:
+    """Return a cached response for a similar query, sampling hits for false-hit checks.
+
+    Args:
+        payload: The query request payload.
+        top_k: The number of results to return.
+        use_hybrid: Whether hybrid retrieval is enabled.
+        use_rerank: Whether reranking is enabled.
+        pipeline: RAG pipeline dependency.
+        semantic_cache: Semantic cache dependency.
+    Returns:
+        The cached response, or None on a miss.
+    """
+    try:
+        vector = await _embed_query(pipeline, payload.query)
+    except Exception:
+        return None
+    match = semantic_cache.lookup(_semantic_namespace(payload, top_k, use_hybrid, use_rerank), vector)
+    if match is None:
+        return None
+    if semantic_cache.should_sample():
+        task = asyncio.get_running_loop().create_task(
+            _check_semantic_hit(payload, top_k, use_hybrid, use_rerank, match, pipeline, semantic_cache)
+        )
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+    return match.value
+
+
+async def _check_semantic_hit(
+    payload: QueryRequest,
+    top_k: int,
+    use_hybrid: bool,
+    use_rerank: bool,
+    match: SemanticMatch,
+    pipeline: RagPipeline,
+    semantic_cache: SemanticCache,
+) -> None:
+    """Re-run retrieval for a semantic hit and record how well the cached hits agree.
+
+    Only retrieval runs, not the LLM, so sampling stays cheap.
+
+    Args:
+        payload: The query request payload.
+        top_k: The number of results to return.
+        use_hybrid: Whether hybrid retrieval is enabled.
+        use_rerank: Whether reranking is enabled.
+        match: The semantic match that answered the request.
+        pipeline: RAG pipeline dependency.
+        semantic_cache: Semantic cache dependency.
+    """
+    try:
+        results = await pipeline.aretrieve(
+            query=payload.query,
+            top_k=top_k,
+            use_hybrid=use_hybrid,
+            use_rerank=use_rerank,
+            nprobe=payload.nprobe,
+            filters=_metadata_filter(payload.filters),
+        )
+    except Exception:
+        return
+    cached_ids = {hit.id for hit in match.value.hits}
+    fresh_ids = {chunk.id for chunk in results}
+    overlap = len(cached_ids & fresh_ids) / max(len(cached_ids), len(fresh_ids), 1)
+    semantic_cache.record_sample(payload.query, match, overlap)
+
+
+async def _semantic_store(
+    payload: QueryRequest,
+    top_k: int,
+    use_hybrid: bool,
+    use_rerank: bool,
+    response: QueryResponse,
+    pipeline: RagPipeline,
+    semantic_cache: SemanticCache,
+) -> None:
+    """Add a computed response to the semantic cache.
+
+    Args:
+        payload: The query request payload.
+        top_k: The number of results to return.
+        use_hybrid: Whether hybrid retrieval is enabled.
+        use_rerank: Whether reranking is enabled.
+        response: The response to cache.
+        pipeline: RAG pipeline dependency.
+        semantic_cache: Semantic cache dependency.
+    """
+    try:
+        vector = await _embed_query(pipeline, payload.query)
+    except Exception:
+        return
+    namespace = _semantic_namespace(payload, top_k, use_hybrid, use_rerank)
+    semantic_cache.add(namespace, vector, payload.query, response)
+
+
 @router.post("/api/query", response_model=QueryResponse)
-def query_jobs(
+async def query_jobs(
     payload: QueryRequest,
+    http_response: Response,
     settings: Settings = Depends(get_settings),
     pipeline: RagPipeline = Depends(get_pipeline),
+    single_flight: SingleFlight = Depends(get_single_flight),
+    response_cache: Optional[TieredCache] = Depends(get_response_cache),
+    semantic_cache: Optional[SemanticCache] = Depends(get_semantic_cache),
 ) -> QueryResponse:
     """Query the RAG pipeline and return a formatted response.
 
+    Concurrent identical requests (same cache key) are coalesced: one leader
+    runs the pipeline and the others await its result, within this process
+    and, through a Redis lock, across workers. A stale in-process cache entry
+    is returned immediately while one background task recomputes it. On an
+    exact-key miss, the semantic cache can answer from a similar query with
+    the same options. Requests that run the pipeline report stage timings
+    in a `Server-Timing` header. Metadata filters (explicit, or extracted
+    from the query text) are resolved first and are part of the cache key.
+
     Args:
         payload: The incoming query payload.
+        http_response: Response used to set the `Server-Timing` header.
         settings: Application settings dependency.
         pipeline: RAG pipeline dependency.
+        single_flight: Query coalescer dependency.
+        response_cache: Response cache dependency.
+        semantic_cache: Semantic cache dependency.
     Returns:
         A response containing the generated answer and job hits.
     """
-    top_k = payload.top_k or settings.top_k
-    use_hybrid = payload.use_hybrid if payload.use_hybrid is not None else settings.use_hybrid
-    use_rerank = payload.use_rerank if payload.use_rerank is not None else bool(settings.rerank_model)
+    # Runs on the event loop: blocking work (Redis, embedding, reranking) is offloaded to
+    # worker threads, and the LLM call awaits the pooled async client.
+    (payload,) = await _with_filters([payload], pipeline)
+    top_k, use_hybrid, use_rerank = _resolve_options(payload, settings)
+    key = _cache_key(payload, top_k, use_hybrid, use_rerank)
+    timings: Dict[str, float] = {}
 
-    cache = get_cache(settings)
-    cache_key = None
-    if cache and settings.cache_ttl_seconds > 0:
-        cache_key = _cache_key(payload, top_k, use_hybrid, use_rerank)
-        try:
-            cached = cache.get(cache_key)
-        except Exception:
-            cached = None
-        if cached:
-            try:
-                return QueryResponse.model_validate_json(cached)
-            except Exception:
-                pass
-
-    answer, results = pipeline.run(
-        query=payload.query,
-        top_k=top_k,
-        use_hybrid=use_hybrid,
-        use_rerank=use_rerank,
-    )
+    async def compute() -> QueryResponse:
+        answer, results = await pipeline.arun(
+            query=payload.query,
+            top_k=top_k,
+            use_hybrid=use_hybrid,
+            use_rerank=use_rerank,
+            nprobe=payload.nprobe,
+            budget_ms=_latency_budget(payload, settings),
+            timings=timings,
+            filters=_metadata_filter(payload.filters),
+        )
+
+        hits = [_to_hit(chunk) for chunk in results]
+        response = QueryResponse(answer=answer, hits=hits)
+        if response_cache is not None:
+            await response_cache.set(key, response)
+        if semantic_cache is not None:
+            await _semantic_store(payload, top_k, use_hybrid, use_rerank, response, pipeline, semantic_cache)
+        return response
 
-    hits = [_to_hit(chunk) for chunk in results]
-    response = QueryResponse(answer=answer, hits=hits)
+    async def load_fresh() -> Optional[QueryResponse]:
+        # Another worker publishes through Redis; this process's L1 can only hold the stale copy.
+        cached, _ = await response_cache.get(key, use_l1=False)
+        return cached
+
+    async def coalesced() -> QueryResponse:
+        if not settings.singleflight_enabled:
+            return await compute()
+        return await single_flight.do(key, compute, load_fresh if response_cache is not None else None)
+
+    if response_cache is not None:
+        cached, stale = await response_cache.get(key)
+        if cached is not None:
+            if stale:
+                response_cache.refresh(key, coalesced)
+            return cached
+    if semantic_cache is not None:
+        similar = await _semantic_lookup(payload, top_k, use_hybrid, use_rerank, pipeline, semantic_cache)
+        if similar is not None:
+            return similar
+    response = await coalesced()
+    if timings:
+        http_response.headers["Server-Timing"] = _server_timing(timings)
+    return response
 
-    if cache and cache_key and settings.cache_ttl_seconds > 0:
+
+@router.post("/api/query/batch", response_model=BatchQueryResponse)
+async def query_jobs_batch(
+    payload: BatchQueryRequest,
+    settings: Settings = Depends(get_settings),
+    pipeline: RagPipeline = Depends(get_pipeline),
+    response_cache: Optional[TieredCache] = Depends(get_response_cache),
+) -> BatchQueryResponse:
+    """Run many queries in one request with batched retrieval and reranking.
+
+    Fresh cached responses are reused; stale ones are recomputed like
+    misses. The remaining queries are encoded in one batch, searched
+    concurrently and reranked in one cross-encoder call, within the
+    smallest latency budget of the batch.
+    Answers are generated only when `generate` is set; otherwise `answer`
+    is empty and nothing is written to the cache.
+
+    Args:
+        payload: The batch of query payloads.
+        settings: Application settings dependency.
+        pipeline: RAG pipeline dependency.
+        response_cache: Response cache dependency.
+    Returns:
+        One response per query, in input order.
+    """
+    if len(payload.queries) > settings.batch_max_queries:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch size {len(payload.queries)} exceeds BATCH_MAX_QUERIES={settings.batch_max_queries}",
+        )
+    queries = await _with_filters(payload.queries, pipeline)
+    options = [_resolve_options(query, settings) for query in queries]
+    responses: List[Optional[QueryResponse]] = [None] * len(queries)
+
+    keys = [_cache_key(query, *opts) for query, opts in zip(queries, options)]
+    if response_cache is not None:
+        for idx, (cached, stale) in enumerate(await response_cache.get_many(keys)):
+            # Recomputing a stale entry here also rewrites it (when generating).
+            responses[idx] = None if stale else cached
+
+    pending = [idx for idx, response in enumerate(responses) if response is None]
+    if pending:
+        requests = [
+            RetrievalRequest(
+                query=queries[idx].query,
+                top_k=options[idx][0],
+                use_hybrid=options[idx][1],
+                use_rerank=options[idx][2],
+                nprobe=queries[idx].nprobe,
+                filters=_metadata_filter(queries[idx].filters),
+                budget_ms=_latency_budget(queries[idx], settings),
+            )
+            for idx in pending
+        ]
+        results = await asyncio.to_thread(pipeline.retrieve_many, requests)
+        if payload.generate:
+            answers = await pipeline.agenerate_many([request.query for request in requests], results)
+        else:
+            answers = [""] * len(requests)
+        for idx, chunks, answer in zip(pending, results, answers):
+            responses[idx] = QueryResponse(answer=answer, hits=[_to_hit(chunk) for chunk in chunks])
+
+        if response_cache is not None and payload.generate:
+            await response_cache.set_many({keys[idx]: responses[idx] for idx in pending})
+
+    return BatchQueryResponse(results=responses)
+
+
+def _sse(event: str, data: Any) -> str:
+    """Format one server-sent event.
+
+    Args:
+        event: Event name.
+        data: JSON-serializable event payload.
+    Returns:
+        The encoded event, terminated by a blank line.
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/api/query/stream")
+async def query_jobs_stream(
+    payload: QueryRequest,
+    settings: Settings = Depends(get_settings),
+    pipeline: RagPipeline = Depends(get_pipeline),
+    response_cache: Optional[TieredCache] = Depends(get_response_cache),
+    semantic_cache: Optional[SemanticCache] = Depends(get_semantic_cache),
+) -> StreamingResponse:
+    """Query the RAG pipeline and stream the response as server-sent events.
+
+    Emits a `hits` event with the job hits as soon as retrieval finishes,
+    then one `token` event per answer delta, then a `done` event carrying the
+    full answer, or an `error` event (and no caching) if the LLM stream fails
+    midway. The assembled response is cached like `/api/query`, and a
+    cached response (exact or semantic) is replayed as `hits` followed by a
+    single `token`. Retrieval stage timings are sent in a `Server-Timing`
+    header.
+
+    Args:
+        payload: The incoming query payload.
+        settings: Application settings dependency.
+        pipeline: RAG pipeline dependency.
+        response_cache: Response cache dependency.
+        semantic_cache: Semantic cache dependency.
+    Returns:
+        A `text/event-stream` response.
+    """
+    (payload,) = await _with_filters([payload], pipeline)
+    top_k, use_hybrid, use_rerank = _resolve_options(payload, settings)
+
+    cache_key = _cache_key(payload, top_k, use_hybrid, use_rerank)
+    cached_response = None
+    if response_cache is not None:
+        cached_response, _ = await response_cache.get(cache_key)
+    if cached_response is None and semantic_cache is not None:
+        cached_response = await _semantic_lookup(payload, top_k, use_hybrid, use_rerank, pipeline, semantic_cache)
+
+    # Retrieval runs before the response starts, so retrieval errors still surface as HTTP errors.
+    results: List[RetrievedChunk] = []
+    hits: List[JobHit] = cached_response.hits if cached_response else []
+    timings: Dict[str, float] = {}
+    if cached_response is None:
+        results = await pipeline.aretrieve(
+            query=payload.query,
+            top_k=top_k,
+            use_hybrid=use_hybrid,
+            use_rerank=use_rerank,
+            nprobe=payload.nprobe,
+            budget_ms=_latency_budget(payload, settings),
+            timings=timings,
+            filters=_metadata_filter(payload.filters),
+        )
+        hits = [_to_hit(chunk) for chunk in results]
+
+    async def events() -> AsyncIterator[str]:
+        yield _sse("hits", [hit.model_dump() for hit in hits])
+        if cached_response is not None:
+            yield _sse("token", {"text": cached_response.answer})
+            yield _sse("done", {"answer": cached_response.answer})
+            return
+
+        parts: List[str] = []
         try:
-            cache.setex(cache_key, settings.cache_ttl_seconds, response.model_dump_json())
+            async for delta in pipeline.astream_answer(payload.query, results):
+                parts.append(delta)
+                yield _sse("token", {"text": delta})
         except Exception:
-            pass
+            # A truncated answer must not be cached or presented as complete.
+            logger.warning("LLM stream failed after %d deltas", len(parts), exc_info=True)
+            yield _sse("error", {"detail": "The answer was interrupted; please retry."})
+            return
+        answer = "".join(parts).strip()
+        yield _sse("done", {"answer": answer})
 
-    return response
+        response = QueryResponse(answer=answer, hits=hits)
+        if response_cache is not None:
+            await response_cache.set(cache_key, response)
+        if semantic_cache is not None:
+            await _semantic_store(payload, top_k, use_hybrid, use_rerank, response, pipeline, semantic_cache)
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    if timings:
+        headers["Server-Timing"] = _server_timing(timings)
+    return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
+
+
+@router.get("/api/cache/stats")
+def cache_stats(
+    pipeline: RagPipeline = Depends(get_pipeline),
+    single_flight: SingleFlight = Depends(get_single_flight),
+    response_cache: Optional[TieredCache] = Depends(get_response_cache),
+    semantic_cache: Optional[SemanticCache] = Depends(get_semantic_cache),
+) -> dict:
+    """Return hit/miss counters for the in-process caches.
+
+    Args:
+        pipeline: RAG pipeline dependency.
+        single_flight: Query coalescer dependency.
+        response_cache: Response cache dependency.
+        semantic_cache: Semantic cache dependency.
+    Returns:
+        A JSON-serializable dict of cache stats keyed by cache name.
+    """
+    return {
+        "responses": response_cache.stats() if response_cache is not None else {},
+        "semantic": semantic_cache.stats() if semantic_cache is not None else {},
+        "query_embeddings": pipeline.retriever.embedding_model.query_cache_stats(),
+        **pipeline.cache_stats(),
+        "singleflight": single_flight.stats(),
+    }
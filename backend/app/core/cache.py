@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import asyncio
+import threading
+import time
+from collections import OrderedDict
 from functools import lru_cache
-from typing import Optional
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set, Tuple
 
 import redis
 from redis import Redis
@@ -9,16 +13,353 @@ from redis import Redis
 from app.core.config import Settings
 
 
+class TTLCache:
+    """Bounded, thread-safe in-process LRU cache with a per-entry TTL.
+
+    Entries can also be bounded by total size (`max_bytes`), and with
+    `stale_seconds` an expired entry stays readable through `lookup` for a
+    grace period so callers can serve it while refreshing it.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        max_bytes: int = 0,
+        stale_seconds: float = 0,
+    ) -> None:
+        """Configure the cache bounds.
+
+        Args:
+            max_entries: Maximum number of entries kept (LRU eviction beyond it).
+            ttl_seconds: Entry lifetime in seconds; 0 disables expiry.
+            max_bytes: Maximum total size of entries as passed to `set`; 0 disables the bound.
+            stale_seconds: How long past expiry `lookup` still returns an entry, flagged as stale.
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.stale_seconds = stale_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+
+    def lookup(self, key: Hashable) -> Tuple[Optional[Any], bool]:
+        """Return a cached value, including recently expired ones.
+
+        Args:
+            key: Cache key.
+        Returns:
+            A tuple of (value, stale): value is None on a miss, and stale is
+            True when the entry expired less than `stale_seconds` ago.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+            expires_at, value, _ = entry
+            if expires_at <= now:
+                if now < expires_at + self.stale_seconds:
+                    self._entries.move_to_end(key)
+                    self.stale_hits += 1
+                    return value, True
+                self._remove(key)
+                self.misses += 1
+                return None, False
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value, False
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return a live cached value and mark it most recently used.
+
+        Args:
+            key: Cache key.
+        Returns:
+            The cached value, or None on a miss or expired entry.
+        """
+        value, stale = self.lookup(key)
+        return None if stale else value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None, size: int = 0) -> None:
+        """Store a value, evicting least recently used entries when full.
+
+        Args:
+            key: Cache key.
+            value: Value to store.
+            ttl_seconds: Lifetime overriding the cache default for this entry.
+            size: Entry size counted against `max_bytes` (e.g. its serialized length).
+        """
+        if self.max_entries <= 0 or (self.max_bytes and size > self.max_bytes):
+            return
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires_at = time.monotonic() + ttl if ttl else float("inf")
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: Hashable) -> None:
+        """Drop an entry; the caller holds the lock.
+
+        Args:
+            key: Cache key.
+        """
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self) -> None:
+        """Drop every entry and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.stale_hits = 0
+            self.evictions = 0
+
+    def stats(self) -> Dict[str, float]:
+        """Return size and hit/miss counters.
+
+        Returns:
+            A dict with entries, bytes, hits, stale_hits, misses, evictions, and hit_rate.
+        """
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            }
+
+
+class TieredCache:
+    """In-process L1 cache in front of Redis, with stale-while-revalidate.
+
+    L1 holds decoded values, so a hot hit costs neither a network round trip
+    nor deserialization. L1 misses fall through to Redis, whose remaining TTL
+    is copied to the L1 entry. An expired L1 entry is still served at once
+    during the stale window while a single background task refreshes it,
+    from Redis if another worker already has, or by recomputing it.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Optional[Redis]],
+        ttl_seconds: int,
+        encode: Callable[[Any], str],
+        decode: Callable[[str], Any],
+        l1: Optional[TTLCache] = None,
+        retry_seconds: float = 5.0,
+    ) -> None:
+        """Configure the cache tiers.
+
+        Args:
+            client_factory: Returns a reachable Redis client, or None.
+            ttl_seconds: Lifetime of cached values in Redis and L1.
+            encode: Serializes a value for Redis.
+            decode: Deserializes a Redis value; may raise on corrupt data.
+            l1: Optional in-process tier.
+            retry_seconds: How long to wait before asking `client_factory`
+                again after it found Redis unreachable.
+        """
+        self._client_factory = client_factory
+        self.retry_seconds = retry_seconds
+        self._client: Optional[Redis] = None
+        self._retry_at = 0.0
+        self.ttl_seconds = ttl_seconds
+        self._encode = encode
+        self._decode = decode
+        self.l1 = l1
+        self._refreshing: Set[str] = set()
+        # Strong references to refresh tasks, so they are not garbage collected mid-run.
+        self._tasks: Set[asyncio.Task] = set()
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self.refreshes = 0
+
+    async def get(self, key: str, use_l1: bool = True) -> Tuple[Optional[Any], bool]:
+        """Look a key up in L1, then Redis.
+
+        Args:
+            key: Cache key.
+            use_l1: Whether to consult L1; False reads Redis only.
+        Returns:
+            A tuple of (value, stale), with value None on a miss.
+        """
+        return (await self.get_many([key], use_l1=use_l1))[0]
+
+    async def get_many(self, keys: List[str], use_l1: bool = True) -> List[Tuple[Optional[Any], bool]]:
+        """Look many keys up, fetching L1 misses from Redis in one round trip.
+
+        Stale L1 entries are returned as they are, flagged stale, without a
+        Redis read; `refresh` checks Redis for a newer copy in the background.
+
+        Args:
+            keys: Cache keys.
+            use_l1: Whether to consult L1; False reads Redis only (e.g. to
+                poll for a value published by another worker).
+        Returns:
+            One (value, stale) tuple per key.
+        """
+        found: List[Tuple[Optional[Any], bool]] = [
+            self.l1.lookup(key) if self.l1 is not None and use_l1 else (None, False) for key in keys
+        ]
+        missing = [idx for idx, (value, _) in enumerate(found) if value is None]
+        if not missing:
+            return found
+        client = await self._redis()
+        if client is None:
+            return found
+        try:
+            replies = await asyncio.to_thread(self._fetch, client, [keys[idx] for idx in missing])
+        except Exception:
+            self._client = None
+            return found
+        for idx, (blob, ttl_ms) in zip(missing, replies):
+            if not blob:
+                self.redis_misses += 1
+                continue
+            try:
+                value = self._decode(blob)
+            except Exception:
+                self.redis_misses += 1
+                continue
+            self.redis_hits += 1
+            found[idx] = (value, False)
+            if self.l1 is not None and ttl_ms and ttl_ms > 0:
+                self.l1.set(keys[idx], value, ttl_seconds=ttl_ms / 1000, size=len(blob))
+        return found
+
+    async def _redis(self) -> Optional[Redis]:
+        """Return the memoized Redis client, connecting (and pinging) only when there is none.
+
+        Returns:
+            A reachable Redis client, or None while Redis is unreachable.
+        """
+        if self._client is None and time.monotonic() >= self._retry_at:
+            self._client = await asyncio.to_thread(self._client_factory)
+            if self._client is None:
+                self._retry_at = time.monotonic() + self.retry_seconds
+        return self._client
+
+    @staticmethod
+    def _fetch(client: Redis, keys: List[str]) -> List[Tuple[Optional[str], int]]:
+        """Read values and remaining TTLs from Redis in one pipeline.
+
+        Args:
+            client: Redis client.
+            keys: Cache keys.
+        Returns:
+            One (value, remaining TTL in ms) tuple per key.
+        """
+        pipe = client.pipeline(transaction=False)
+        for key in keys:
+            pipe.get(key)
+            pipe.pttl(key)
+        replies = pipe.execute()
+        return list(zip(replies[0::2], replies[1::2]))
+
+    async def set(self, key: str, value: Any) -> None:
+        """Store a value in both tiers.
+
+        Args:
+            key: Cache key.
+            value: Value to store.
+        """
+        await self.set_many({key: value})
+
+    async def set_many(self, values: Dict[str, Any]) -> None:
+        """Store many values in both tiers, writing Redis in one round trip.
+
+        Args:
+            values: Mapping of cache key to value.
+        """
+        encoded = {key: self._encode(value) for key, value in values.items()}
+        if self.l1 is not None:
+            for key, value in values.items():
+                self.l1.set(key, value, size=len(encoded[key]))
+        client = await self._redis()
+        if client is None:
+            return
+        try:
+            pipe = client.pipeline(transaction=False)
+            for key, blob in encoded.items():
+                pipe.setex(key, self.ttl_seconds, blob)
+            await asyncio.to_thread(pipe.execute)
+        except Exception:
+            self._client = None
+
+    def refresh(self, key: str, compute: Callable[[], Awaitable[Any]]) -> None:
+        """Refresh a stale key in the background, at most once at a time.
+
+        Redis is read first, since another worker may already have refreshed
+        the key; its copy then replaces the stale L1 entry. Otherwise
+        `compute` runs and is expected to store its result (e.g. via `set`).
+
+        Args:
+            key: Cache key being refreshed.
+            compute: Coroutine function producing and storing the fresh value.
+        """
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        self.refreshes += 1
+
+        async def run() -> None:
+            try:
+                fresh, _ = await self.get(key, use_l1=False)
+                if fresh is None:
+                    await compute()
+            except Exception:
+                pass
+            finally:
+                self._refreshing.discard(key)
+
+        task = asyncio.get_running_loop().create_task(run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return counters for both tiers.
+
+        Returns:
+            A dict with the L1 stats (if any), Redis hits/misses and refresh count.
+        """
+        return {
+            "l1": self.l1.stats() if self.l1 is not None else {},
+            "redis_hits": self.redis_hits,
+            "redis_misses": self.redis_misses,
+            "refreshes": self.refreshes,
+            "refreshing": len(self._refreshing),
+        }
+
+
 @lru_cache
-def _get_client(redis_url: str) -> Redis:
+def _get_client(redis_url: str, decode_responses: bool = True) -> Redis:
     """Create and memoize a Redis client for the given URL.
 
     Args:
         redis_url: Redis connection URL.
+        decode_responses: Whether replies are decoded to str (False keeps bytes).
     Returns:
         A Redis client instance.
     """
-    return redis.Redis.from_url(redis_url, decode_responses=True)
+    return redis.Redis.from_url(redis_url, decode_responses=decode_responses)
 
 
 def get_cache(settings: Settings) -> Optional[Redis]:
@@ -37,3 +378,21 @@ def get_cache(settings: Settings) -> Optional[Redis]:
         return client
     except Exception:
         return None
+
+
+def get_binary_cache(settings: Settings) -> Optional[Redis]:
+    """Return a reachable Redis client that keeps replies as raw bytes.
+
+    Args:
+        settings: Application settings containing Redis configuration.
+    Returns:
+        A bytes-mode Redis client if available; otherwise None.
+    """
+    if not settings.redis_url:
+        return None
+    try:
+        client = _get_client(settings.redis_url, decode_responses=False)
+        client.ping()
+        return client
+    except Exception:
+        return None
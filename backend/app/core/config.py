@@ -16,26 +16,80 @@ class Settings(BaseSettings):
     vector_dir: str = Field(default="./storage")
     embedding_model: str = Field(default="intfloat/e5-large-v2")
     embedding_batch_size: int = Field(default=16)
+    embedding_query_backend: str = Field(default="torch")
+    embedding_query_threads: int = Field(default=0, ge=0)
+    ingest_csv_chunksize: int = Field(default=1000, ge=1)
+    ingest_queue_size: int = Field(default=8, ge=1)
+    ingest_workers: int = Field(default=1, ge=1)
+    ingest_pool_chunksize: int = Field(default=64, ge=1)
+    upsert_batch_size: int = Field(default=100, ge=1)
+    upsert_concurrency: int = Field(default=4, ge=1)
+    query_embedding_cache_size: int = Field(default=2048, ge=0)
+    query_embedding_cache_ttl_seconds: int = Field(default=3600, ge=0)
+    query_embedding_cache_shared: bool = Field(default=False)
 
     top_k: int = Field(default=5)
     use_hybrid: bool = Field(default=False)
     hybrid_alpha: float = Field(default=0.35)
+    hybrid_fusion: str = Field(default="minmax")
+    rrf_k: int = Field(default=60, ge=1)
+    job_collapse: str = Field(default="none")
+    job_collapse_overfetch: int = Field(default=3, ge=1)
     rerank_model: str | None = Field(default=None)
+    rerank_backend: str = Field(default="torch")
+    rerank_batch_size: int = Field(default=32, ge=1)
+    rerank_max_length: int | None = Field(default=None, ge=16)
+    retrieval_candidate_k: int = Field(default=20, ge=1)
+    retrieval_fetch_k: int = Field(default=0, ge=0)
+    rerank_k: int = Field(default=0, ge=0)
+    latency_budget_ms: int = Field(default=0, ge=0)
+    rerank_pair_ms: float = Field(default=0.0, ge=0)
+    filter_extraction: bool = Field(default=False)
+    retrieval_workers: int = Field(default=0, ge=0)
+    vector_timeout_seconds: float = Field(default=0.0, ge=0)
+    bm25_timeout_seconds: float = Field(default=0.0, ge=0)
+    batch_max_queries: int = Field(default=1000, ge=1)
 
     llm_base_url: str = Field(default="https://api.openai.com/v1")
     llm_api_key: str | None = Field(default=None)
     llm_model: str = Field(default="gpt-4o-mini")
     llm_temperature: float = Field(default=0.2)
     llm_max_tokens: int = Field(default=500)
+    prompt_token_budget: int = Field(default=0, ge=0)
+    llm_timeout_seconds: float = Field(default=60.0, gt=0)
+    llm_max_connections: int = Field(default=200, ge=1)
+    llm_max_keepalive_connections: int = Field(default=50, ge=0)
+    llm_keepalive_expiry_seconds: float = Field(default=30.0, ge=0)
+
+    vector_backend: str = Field(default="pinecone")
+    local_vector_dtype: str = Field(default="float32")
+    local_index_type: str = Field(default="flat")
+    ivf_nlist: int = Field(default=0, ge=0)
+    ivf_nprobe: int = Field(default=8, ge=1)
+    local_rescore_candidates: int = Field(default=100, ge=0)
 
     pinecone_api_key: str | None = Field(default=None)
     pinecone_index: str = Field(default="job-rag")
     pinecone_cloud: str = Field(default="aws")
     pinecone_region: str = Field(default="us-east-1")
     pinecone_metric: str = Field(default="cosine")
+    vector_query_concurrency: int = Field(default=8, ge=1)
 
     redis_url: str | None = Field(default=None)
     cache_ttl_seconds: int = Field(default=300, ge=0)
+    response_cache_l1_entries: int = Field(default=1024, ge=0)
+    response_cache_l1_max_bytes: int = Field(default=64 * 1024 * 1024, ge=0)
+    response_cache_stale_seconds: int = Field(default=60, ge=0)
+    candidate_cache_size: int = Field(default=1024, ge=0)
+    rerank_score_cache_size: int = Field(default=100_000, ge=0)
+    answer_cache_size: int = Field(default=1024, ge=0)
+    semantic_cache_size: int = Field(default=0, ge=0)
+    semantic_cache_threshold: float = Field(default=0.95, gt=0, le=1)
+    semantic_cache_sample_rate: float = Field(default=0.01, ge=0, le=1)
+    singleflight_enabled: bool = Field(default=True)
+    singleflight_lock_ttl_seconds: float = Field(default=30.0, gt=0)
+    singleflight_wait_timeout_seconds: float = Field(default=30.0, ge=0)
+    singleflight_poll_interval_ms: int = Field(default=50, ge=1)
 
     model_config = SettingsConfigDict(env_file=(".env", ".env.example"), case_sensitive=False)
 
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+# Hits whose sampled re-retrieval shares less than this fraction of job hits count as false hits.
+_FALSE_HIT_OVERLAP = 0.5
+# A lookup/hit-rate summary is logged once per this many lookups.
+_LOG_EVERY = 500
+
+
+@dataclass
+class SemanticMatch:
+    """A cached value returned for a similar (not identical) query."""
+
+    value: Any
+    query: str
+    similarity: float
+
+
+class SemanticCache:
+    """In-process cache of values keyed by query-embedding similarity.
+
+    Entries live in one preallocated float32 matrix of unit-norm query
+    embeddings, so a lookup is a single matrix-vector product over at most
+    `max_entries` rows. Each entry also carries a namespace (the request
+    options that must match exactly) and an expiry; the oldest entry is
+    overwritten once the cache is full. Namespaces are stored as small
+    integer IDs, which are reused once no slot holds them, so at most
+    `max_entries` are tracked however many option combinations clients send.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        threshold: float,
+        ttl_seconds: float = 0,
+        sample_rate: float = 0.0,
+    ) -> None:
+        """Configure the cache.
+
+        Args:
+            max_entries: Maximum number of cached queries.
+            threshold: Minimum cosine similarity for a hit.
+            ttl_seconds: Entry lifetime in seconds; 0 disables expiry.
+            sample_rate: Fraction of hits selected for false-hit checks by `should_sample`.
+        """
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.sample_rate = sample_rate
+        self._matrix: Optional[np.ndarray] = None
+        self._namespaces = np.full(max_entries, -1, dtype=np.int32)
+        self._expires = np.zeros(max_entries, dtype=np.float64)
+        self._queries: List[str] = [""] * max_entries
+        self._values: List[Any] = [None] * max_entries
+        self._namespace_ids: Dict[str, int] = {}
+        self._namespace_slots: Dict[str, int] = {}
+        self._slot_namespaces: List[Optional[str]] = [None] * max_entries
+        self._free_namespace_ids: List[int] = []
+        self._next = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.samples = 0
+        self.false_hits = 0
+
+    def lookup(self, namespace: str, vector: Sequence[float]) -> Optional[SemanticMatch]:
+        """Return the value of the most similar live entry in a namespace.
+
+        Args:
+            namespace: Options that must match exactly (e.g. top_k and retrieval flags).
+            vector: Unit-norm query embedding.
+        Returns:
+            The best match at or above the threshold, or None.
+        """
+        with self._lock:
+            slot, similarity = self._best(namespace, np.asarray(vector, dtype=np.float32))
+            if slot is not None and similarity >= self.threshold:
+                self.hits += 1
+                match = SemanticMatch(self._values[slot], self._queries[slot], similarity)
+            else:
+                self.misses += 1
+                match = None
+            lookups = self.hits + self.misses
+        if lookups % _LOG_EVERY == 0:
+            logger.info(
+                "semantic cache: %d lookups, hit rate %.3f, %d/%d sampled hits false",
+                lookups,
+                self.hits / lookups,
+                self.false_hits,
+                self.samples,
+            )
+        return match
+
+    def add(self, namespace: str, vector: Sequence[float], query: str, value: Any) -> None:
+        """Store a value for a query embedding.
+
+        A near-duplicate of an existing live entry replaces it rather than
+        taking a new slot.
+
+        Args:
+            namespace: Options that must match exactly on lookup.
+            vector: Unit-norm query embedding.
+            query: Query text, kept for false-hit logging.
+            value: Value to return on a hit.
+        """
+        vector = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            if self._matrix is None:
+                self._matrix = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+            slot, similarity = self._best(namespace, vector)
+            if slot is None or similarity < 0.9999:
+                slot = self._next
+                self._next = (self._next + 1) % self.max_entries
+            self._release(slot)
+            self._matrix[slot] = vector
+            self._namespaces[slot] = self._acquire(slot, namespace)
+            self._expires[slot] = time.monotonic() + self.ttl_seconds if self.ttl_seconds else np.inf
+            self._queries[slot] = query
+            self._values[slot] = value
+
+    def _acquire(self, slot: int, namespace: str) -> int:
+        """Assign a slot to a namespace; the caller holds the lock.
+
+        Args:
+            slot: Slot being filled.
+            namespace: Namespace of the new entry.
+        Returns:
+            The namespace's ID.
+        """
+        namespace_id = self._namespace_ids.get(namespace)
+        if namespace_id is None:
+            if self._free_namespace_ids:
+                namespace_id = self._free_namespace_ids.pop()
+            else:
+                namespace_id = len(self._namespace_ids)
+            self._namespace_ids[namespace] = namespace_id
+        self._namespace_slots[namespace] = self._namespace_slots.get(namespace, 0) + 1
+        self._slot_namespaces[slot] = namespace
+        return namespace_id
+
+    def _release(self, slot: int) -> None:
+        """Detach a slot from its namespace, freeing the ID when no slot is left; the caller holds the lock.
+
+        Args:
+            slot: Slot about to be overwritten.
+        """
+        namespace = self._slot_namespaces[slot]
+        if namespace is None:
+            return
+        self._slot_namespaces[slot] = None
+        self._namespaces[slot] = -1
+        self._namespace_slots[namespace] -= 1
+        if not self._namespace_slots[namespace]:
+            del self._namespace_slots[namespace]
+            self._free_namespace_ids.append(self._namespace_ids.pop(namespace))
+
+    def _best(self, namespace: str, vector: np.ndarray) -> Tuple[Optional[int], float]:
+        """Find the most similar live entry; the caller holds the lock.
+
+        Args:
+            namespace: Namespace to search.
+            vector: Unit-norm query embedding.
+        Returns:
+            A tuple of (slot, similarity), with slot None when the namespace has no live entry.
+        """
+        namespace_id = self._namespace_ids.get(namespace)
+        if self._matrix is None or namespace_id is None:
+            return None, 0.0
+        scores = self._matrix @ vector
+        live = (self._namespaces == namespace_id) & (self._expires > time.monotonic())
+        if not live.any():
+            return None, 0.0
+        scores[~live] = -np.inf
+        slot = int(np.argmax(scores))
+        return slot, float(scores[slot])
+
+    def should_sample(self) -> bool:
+        """Decide whether a hit should be checked for being a false hit.
+
+        Returns:
+            True for roughly `sample_rate` of calls.
+        """
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def record_sample(self, query: str, match: SemanticMatch, overlap: float) -> None:
+        """Record and log the outcome of a false-hit check.
+
+        Args:
+            query: The query that was answered from the cache.
+            match: The semantic match that answered it.
+            overlap: Fraction of cached job hits also found by fresh retrieval for `query`.
+        """
+        false_hit = overlap < _FALSE_HIT_OVERLAP
+        with self._lock:
+            self.samples += 1
+            self.false_hits += int(false_hit)
+        logger.info(
+            "semantic cache sample: similarity=%.4f overlap=%.2f false_hit=%s query=%r cached_query=%r",
+            match.similarity,
+            overlap,
+            false_hit,
+            query,
+            match.query,
+        )
+
+    def stats(self) -> Dict[str, float]:
+        """Return size, hit/miss and false-hit counters.
+
+        Returns:
+            A dict with entries, hits, misses, hit_rate, samples, false_hits and threshold.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": int(((self._namespaces >= 0) & (self._expires > time.monotonic())).sum()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "samples": self.samples,
+                "false_hits": self.false_hits,
+                "threshold": self.threshold,
+            }
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import uuid
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+from redis import Redis
+
+
+T = TypeVar("T")
+
+# Delete the lock only if this caller still owns it (it may have expired and been re-acquired).
+_RELEASE_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) else return 0 end"
+
+
+class SingleFlight:
+    """Coalesce concurrent computations that share a key.
+
+    Within a process, the first caller for a key starts the computation as a
+    task and later callers await the same task. With a Redis client, the
+    task also takes a short `lock:<key>` lock; a worker that finds the lock
+    held polls `load` (typically a cache read) until the leading worker has
+    published its result, instead of recomputing it.
+    """
+
+    def __init__(
+        self,
+        redis: Optional[Redis] = None,
+        lock_ttl_seconds: float = 30.0,
+        wait_timeout_seconds: float = 30.0,
+        poll_interval_seconds: float = 0.05,
+    ) -> None:
+        """Configure coalescing.
+
+        Args:
+            redis: Optional Redis client for cross-worker coalescing.
+            lock_ttl_seconds: Lifetime of the Redis lock, bounding how long a crashed leader blocks others.
+            wait_timeout_seconds: Longest a follower waits before computing the result itself.
+            poll_interval_seconds: Delay between `load` polls while another worker leads.
+        """
+        self._redis = redis
+        self.lock_ttl_seconds = lock_ttl_seconds
+        self.wait_timeout_seconds = wait_timeout_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._stats_lock = threading.Lock()
+        self.leaders = 0
+        self.local_followers = 0
+        self.remote_followers = 0
+
+    async def do(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[T]],
+        load: Optional[Callable[[], Awaitable[Optional[T]]]] = None,
+    ) -> T:
+        """Return the result for `key`, computing it at most once at a time.
+
+        The computation runs as its own task, so a caller that disconnects
+        does not cancel it for the callers still waiting.
+
+        Args:
+            key: Coalescing key (e.g. the response cache key).
+            compute: Produces the result; it should publish it (e.g. write the
+                cache) before returning so other workers can `load` it.
+            load: Reads a result published by another worker, or None if absent.
+        Returns:
+            The computed or loaded result.
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self._count("local_followers")
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(self._run(key, compute, load))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _run(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[T]],
+        load: Optional[Callable[[], Awaitable[Optional[T]]]],
+    ) -> T:
+        """Compute under the Redis lock, or wait for the worker holding it.
+
+        Args:
+            key: Coalescing key.
+            compute: Produces and publishes the result.
+            load: Reads a published result.
+        Returns:
+            The computed or loaded result.
+        """
+        if self._redis is None or load is None:
+            self._count("leaders")
+            return await compute()
+
+        loop = asyncio.get_running_loop()
+        lock_key = f"lock:{key}"
+        token = uuid.uuid4().hex
+        deadline = loop.time() + self.wait_timeout_seconds
+        acquired = False
+        while loop.time() < deadline:
+            try:
+                acquired = bool(
+                    await asyncio.to_thread(
+                        self._redis.set, lock_key, token, nx=True, px=int(self.lock_ttl_seconds * 1000)
+                    )
+                )
+            except Exception:
+                break
+            if acquired:
+                break
+            # Another worker is computing: wait for its result or for the lock to go away.
+            while loop.time() < deadline:
+                await asyncio.sleep(self.poll_interval_seconds)
+                value = await load()
+                if value is not None:
+                    self._count("remote_followers")
+                    return value
+                try:
+                    if not await asyncio.to_thread(self._redis.exists, lock_key):
+                        break
+                except Exception:
+                    break
+
+        self._count("leaders")
+        try:
+            return await compute()
+        finally:
+            if acquired:
+                try:
+                    await asyncio.to_thread(self._redis.eval, _RELEASE_SCRIPT, 1, lock_key, token)
+                except Exception:
+                    pass
+
+    def _count(self, name: str) -> None:
+        """Increment a stats counter.
+
+        Args:
+            name: Counter attribute name.
+        """
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self) -> Dict[str, int]:
+        """Return coalescing counters.
+
+        Returns:
+            A dict with leaders, local_followers, remote_followers and in_flight.
+        """
+        with self._stats_lock:
+            return {
+                "leaders": self.leaders,
+                "local_followers": self.local_followers,
+                "remote_followers": self.remote_followers,
+                "in_flight": len(self._inflight),
+            }
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 
-from app.api.routes import router
+from app.api.routes import get_pipeline, router
 from app.core.config import get_settings
 from app.core.logging import configure_logging
 
@@ -10,7 +13,23 @@ from app.core.logging import configure_logging
 settings = get_settings()
 configure_logging(settings.log_level)
 
-app = FastAPI(title=settings.app_name)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Close pooled LLM connections on shutdown.
+
+    Args:
+        app: The FastAPI application.
+    Yields:
+        Control to the running application.
+    """
+    yield
+    # Only close a pipeline that was actually built; calling get_pipeline() would build one.
+    if get_pipeline.cache_info().currsize:
+        await get_pipeline().aclose()
+
+
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
 app.include_router(router)
 
 
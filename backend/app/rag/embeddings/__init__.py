@@ -1,3 +1,4 @@
+from .cache import PassageEmbeddingCache
 from .model import EmbeddingModel
 
-__all__ = ["EmbeddingModel"]
+__all__ = ["EmbeddingModel", "PassageEmbeddingCache"]
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, List, Optional
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+
+QUERY_BACKENDS = ("torch", "int8", "onnx", "onnx-int8")
+_POOLING_FILE = "pooling.json"
+
+
+class OnnxSentenceEncoder:
+    """Sentence encoder run with ONNX Runtime, exposing `SentenceTransformer.encode`.
+
+    The transformer is exported once to `export_dir` (and, for int8,
+    dynamically quantized there) together with the SentenceTransformer
+    pooling mode and sequence limit, so embeddings match the PyTorch model
+    up to numerical precision. Requires the `onnx` extra.
+    """
+
+    def __init__(self, model_name: str, export_dir: str, quantize: bool = False, threads: int = 0) -> None:
+        """Export (if needed) and load the ONNX model.
+
+        Args:
+            model_name: SentenceTransformer model name or path.
+            export_dir: Directory holding the exported fp32 and int8 models.
+            quantize: Whether to run the int8 dynamically quantized export.
+            threads: ONNX Runtime intra-op threads; 0 keeps the runtime default.
+        """
+        try:
+            import onnxruntime
+            from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+            from optimum.onnxruntime.configuration import AutoQuantizationConfig
+            from transformers import AutoTokenizer
+        except ImportError as exc:
+            raise RuntimeError("EMBEDDING_QUERY_BACKEND=onnx requires the onnx extra (pip install 'optimum[onnxruntime]')") from exc
+
+        fp32_dir = os.path.join(export_dir, "fp32")
+        if not os.path.exists(os.path.join(fp32_dir, "model.onnx")):
+            _export(model_name, fp32_dir, ORTModelForFeatureExtraction, AutoTokenizer)
+        model_dir, file_name = fp32_dir, "model.onnx"
+        if quantize:
+            model_dir, file_name = os.path.join(export_dir, "int8"), "model_quantized.onnx"
+            if not os.path.exists(os.path.join(model_dir, file_name)):
+                config = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+                ORTQuantizer.from_pretrained(fp32_dir).quantize(save_dir=model_dir, quantization_config=config)
+
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        self._model = ORTModelForFeatureExtraction.from_pretrained(model_dir, file_name=file_name, session_options=options)
+        self._tokenizer = AutoTokenizer.from_pretrained(fp32_dir)
+        with open(os.path.join(fp32_dir, _POOLING_FILE), "r", encoding="utf-8") as f:
+            pooling = json.load(f)
+        self.pooling_mode = pooling["mode"]
+        self.max_seq_length = pooling["max_seq_length"]
+
+    def encode(
+        self,
+        texts: List[str],
+        batch_size: int = 32,
+        normalize_embeddings: bool = False,
+        **_: Any,
+    ) -> np.ndarray:
+        """Embed texts.
+
+        Args:
+            texts: Input texts.
+            batch_size: Texts per ONNX Runtime call.
+            normalize_embeddings: Whether to L2-normalize the embeddings.
+        Returns:
+            A float32 matrix with one embedding per text.
+        """
+        batches: List[np.ndarray] = []
+        for start in range(0, len(texts), batch_size):
+            features = self._tokenizer(
+                texts[start : start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np",
+            )
+            hidden = np.asarray(self._model(**features).last_hidden_state, dtype=np.float32)
+            if self.pooling_mode == "cls":
+                pooled = hidden[:, 0]
+            else:
+                mask = features["attention_mask"][..., None].astype(np.float32)
+                pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            batches.append(pooled)
+        embeddings = np.concatenate(batches) if batches else np.zeros((0, 0), dtype=np.float32)
+        if normalize_embeddings and len(embeddings):
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings
+
+
+def _export(model_name: str, fp32_dir: str, ort_model_cls: Any, tokenizer_cls: Any) -> None:
+    """Export a SentenceTransformer's transformer to ONNX with its pooling settings.
+
+    Args:
+        model_name: SentenceTransformer model name or path.
+        fp32_dir: Output directory.
+        ort_model_cls: optimum's ORTModelForFeatureExtraction.
+        tokenizer_cls: transformers' AutoTokenizer.
+    """
+    reference = SentenceTransformer(model_name, device="cpu")
+    transformer = reference[0].auto_model.name_or_path
+    pooling = reference[1].get_pooling_mode_str() if len(reference) > 1 else "mean"
+    if pooling not in ("mean", "cls"):
+        raise RuntimeError(f"ONNX query encoding supports mean or cls pooling, not '{pooling}'")
+    ort_model_cls.from_pretrained(transformer, export=True).save_pretrained(fp32_dir)
+    tokenizer_cls.from_pretrained(transformer).save_pretrained(fp32_dir)
+    with open(os.path.join(fp32_dir, _POOLING_FILE), "w", encoding="utf-8") as f:
+        json.dump({"mode": pooling, "max_seq_length": reference.max_seq_length}, f)
+
+
+def load_query_encoder(
+    model_name: str,
+    backend: str,
+    export_dir: Optional[str] = None,
+    threads: int = 0,
+) -> Any:
+    """Load the encoder used for query embeddings.
+
+    Args:
+        model_name: SentenceTransformer model name or path.
+        backend: One of `QUERY_BACKENDS`.
+        export_dir: Directory for ONNX exports (ONNX backends only).
+        threads: Intra-op threads; 0 keeps the runtime default. For the torch
+            backends this sets PyTorch's process-wide thread count.
+    Returns:
+        An object with a SentenceTransformer-compatible `encode`.
+    """
+    if backend not in QUERY_BACKENDS:
+        raise RuntimeError(f"Unsupported EMBEDDING_QUERY_BACKEND '{backend}'")
+    if backend in ("onnx", "onnx-int8"):
+        if not export_dir:
+            raise RuntimeError("EMBEDDING_QUERY_BACKEND=onnx requires an export directory")
+        return OnnxSentenceEncoder(model_name, export_dir, quantize=backend == "onnx-int8", threads=threads)
+
+    if threads:
+        import torch
+
+        torch.set_num_threads(threads)
+    if backend == "torch":
+        return SentenceTransformer(model_name)
+    import torch
+
+    # Dynamic int8 quantization replaces the Linear layers, which dominate CPU time; CPU only.
+    model = SentenceTransformer(model_name, device="cpu")
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
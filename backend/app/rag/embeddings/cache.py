@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.rag.embeddings.model import EmbeddingModel
+
+
+_VECTORS_FILE = "vectors.f32"
+_KEYS_FILE = "keys.txt"
+_SLUG_RE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+class PassageEmbeddingCache:
+    """Append-only, content-addressed on-disk cache of passage embeddings.
+
+    Each model gets its own directory holding a raw float32 matrix
+    (`vectors.f32`) and an index file with one content hash per row
+    (`keys.txt`). Rows are only ever appended, so an interrupted build
+    leaves a usable cache: on open, the row count is the shorter of the two.
+    """
+
+    def __init__(self, path: str, model_name: str, dimension: int, flush_every: int = 4096) -> None:
+        """Open (or create) the cache for a model.
+
+        Args:
+            path: Root cache directory.
+            model_name: Embedding model name; part of every key.
+            dimension: Embedding dimension.
+            flush_every: Pending embeddings buffered before appending to disk.
+        """
+        self.model_name = model_name
+        self.dimension = dimension
+        self.flush_every = flush_every
+        self.path = os.path.join(path, _SLUG_RE.sub("_", model_name))
+        os.makedirs(self.path, exist_ok=True)
+        self._vectors_path = os.path.join(self.path, _VECTORS_FILE)
+        self._keys_path = os.path.join(self.path, _KEYS_FILE)
+        self._rows: Dict[str, int] = {}
+        self._pending: Dict[str, np.ndarray] = {}
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self) -> None:
+        """Index existing rows and memory-map the stored vectors."""
+        keys: List[str] = []
+        if os.path.exists(self._keys_path):
+            with open(self._keys_path, "r", encoding="ascii") as f:
+                keys = [line.strip() for line in f if line.strip()]
+        row_bytes = 4 * self.dimension
+        stored_rows = os.path.getsize(self._vectors_path) // row_bytes if os.path.exists(self._vectors_path) else 0
+        n_rows = min(len(keys), stored_rows)
+        if n_rows < len(keys) or n_rows < stored_rows:
+            self._truncate(keys[:n_rows], n_rows * row_bytes)
+        self._rows = {key: row for row, key in enumerate(keys[:n_rows])}
+        self._size = n_rows
+        self._map()
+
+    def _map(self) -> None:
+        """Memory-map the first `_size` rows of the vector file."""
+        self._matrix = (
+            np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(self._size, self.dimension))
+            if self._size
+            else None
+        )
+
+    def _truncate(self, keys: List[str], vector_bytes: int) -> None:
+        """Drop partially written rows left by an interrupted run.
+
+        Args:
+            keys: Keys to keep.
+            vector_bytes: Byte length of the vector file to keep.
+        """
+        with open(self._keys_path, "w", encoding="ascii") as f:
+            f.writelines(f"{key}\n" for key in keys)
+        if os.path.exists(self._vectors_path):
+            with open(self._vectors_path, "r+b") as f:
+                f.truncate(vector_bytes)
+
+    def key(self, text: str) -> str:
+        """Return the content hash for a passage under this model.
+
+        Args:
+            text: Passage text (before any model prefix).
+        Returns:
+            A hex SHA-256 digest of the model name and text.
+        """
+        return hashlib.sha256(f"{self.model_name}\x00{text}".encode("utf-8")).hexdigest()
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """Return the cached embedding for a passage, if any.
+
+        Args:
+            text: Passage text.
+        Returns:
+            The float32 embedding, or None on a miss.
+        """
+        key = self.key(text)
+        if key in self._pending:
+            return self._pending[key]
+        row = self._rows.get(key)
+        if row is None or self._matrix is None:
+            return None
+        return np.asarray(self._matrix[row])
+
+    def embed(self, embedder: EmbeddingModel, texts: List[str]) -> np.ndarray:
+        """Embed passages, encoding only those missing from the cache.
+
+        Args:
+            embedder: Model used for cache misses.
+            texts: Passage texts.
+        Returns:
+            A float32 matrix with one embedding row per input text.
+        """
+        vectors: List[Optional[np.ndarray]] = [self.get(text) for text in texts]
+        missing = [idx for idx, vector in enumerate(vectors) if vector is None]
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            encoded = embedder.embed([texts[idx] for idx in missing])
+            for idx, vector in zip(missing, encoded):
+                vectors[idx] = vector
+                self._pending[self.key(texts[idx])] = vector
+            if len(self._pending) >= self.flush_every:
+                self.flush()
+        if not vectors:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack(vectors)
+
+    def flush(self) -> None:
+        """Append pending embeddings to disk and extend the memory map."""
+        new_keys = [key for key in self._pending if key not in self._rows]
+        if not new_keys:
+            self._pending.clear()
+            return
+        block = np.stack([self._pending[key] for key in new_keys]).astype(np.float32, copy=False)
+        with open(self._vectors_path, "ab") as f:
+            f.write(block.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        with open(self._keys_path, "a", encoding="ascii") as f:
+            f.writelines(f"{key}\n" for key in new_keys)
+        for key in new_keys:
+            self._rows[key] = self._size
+            self._size += 1
+        self._pending.clear()
+        self._map()
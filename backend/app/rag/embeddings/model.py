@@ -1,25 +1,58 @@
 from __future__ import annotations
 
-from typing import List
+import hashlib
+from typing import Any, Dict, List, Optional
 
 import numpy as np
+from redis import Redis
 from sentence_transformers import SentenceTransformer
 
+from app.core.cache import TTLCache
+from app.rag.embeddings.backends import load_query_encoder
+from app.rag.preprocess import normalize_whitespace
+
 
 class EmbeddingModel:
-    """Wrapper around SentenceTransformer with optional E5-style prefixes."""
+    """Wrapper around SentenceTransformer with optional E5-style prefixes.
+
+    Queries can be encoded by a faster backend than passages (see
+    `load_query_encoder`); the fp32 passage model is then only loaded when
+    passages are embedded.
+    """
 
-    def __init__(self, model_name: str, batch_size: int = 64) -> None:
+    def __init__(
+        self,
+        model_name: str,
+        batch_size: int = 64,
+        query_cache_size: int = 0,
+        query_cache_ttl: int = 0,
+        shared_cache: Optional[Redis] = None,
+        query_backend: str = "torch",
+        query_threads: int = 0,
+        export_dir: Optional[str] = None,
+    ) -> None:
         """Initialize the embedding model and configuration.
 
         Args:
             model_name: The SentenceTransformer model name or path.
             batch_size: The batch size used during encoding.
+            query_cache_size: Max query embeddings kept in process (0 disables caching).
+            query_cache_ttl: Lifetime of cached query embeddings in seconds (0 = no expiry).
+            shared_cache: Optional bytes-mode Redis client shared by all workers.
+            query_backend: Runtime for query encoding: torch (fp32), int8, onnx or onnx-int8.
+            query_threads: Intra-op threads for query encoding; 0 keeps the runtime default.
+            export_dir: Where ONNX exports of the model are written and reused.
         """
         self.model_name = model_name
         self.batch_size = batch_size
-        self._model = SentenceTransformer(model_name)
+        self.query_backend = query_backend
+        self._query_model = load_query_encoder(model_name, query_backend, export_dir=export_dir, threads=query_threads)
+        self._model: Optional[SentenceTransformer] = self._query_model if query_backend == "torch" else None
         self._use_e5_prefix = "e5" in model_name.lower()
+        self._query_cache = TTLCache(query_cache_size, query_cache_ttl) if query_cache_size > 0 else None
+        self._query_cache_ttl = query_cache_ttl
+        self._shared_cache = shared_cache if self._query_cache is not None else None
+        self._shared_hits = 0
 
     def _apply_prefix(self, texts: List[str], prefix: str) -> List[str]:
         """Apply the appropriate prefix to the texts based on the model's requirements.
@@ -43,15 +76,30 @@ class EmbeddingModel:
                 prefixed.append(f"{prefix} {stripped}")
         return prefixed
 
-    def _encode(self, texts: List[str]) -> List[List[float]]:
+    def _passage_model(self) -> SentenceTransformer:
+        """Return the fp32 model used for passages, loading it on first use.
+
+        Returns:
+            The SentenceTransformer model.
+        """
+        if self._model is None:
+            self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    def _encode(self, texts: List[str], model: Any = None) -> np.ndarray:
         """Encode texts into normalized embedding vectors.
 
+        Embeddings stay a float32 matrix: converting them to Python floats
+        costs several times their size and is undone by every vector store.
+
         Args:
             texts: A list of input texts to be embedded.
+            model: Encoder to use; defaults to the passage model.
         Returns:
-            A list of embedding vectors, one per input text.
+            A float32 matrix with one embedding row per input text.
         """
-        embeddings = self._model.encode(
+        model = model if model is not None else self._passage_model()
+        embeddings = model.encode(
             texts,
             batch_size=self.batch_size,
             show_progress_bar=False,
@@ -59,34 +107,122 @@ class EmbeddingModel:
             normalize_embeddings=True,
         )
         if isinstance(embeddings, np.ndarray):
-            return embeddings.tolist()
-        return [emb.tolist() for emb in embeddings]
+            return embeddings.astype(np.float32, copy=False)
+        return np.stack([np.asarray(emb, dtype=np.float32) for emb in embeddings])
 
-    def embed(self, texts: List[str]) -> List[List[float]]:
+    def embed(self, texts: List[str]) -> np.ndarray:
         """Embed general passages with model-specific prefixes.
 
         Args:
             texts: A list of passage texts to be embedded.
         Returns:
-            A list of embedding vectors for the passages.
+            A float32 matrix of embedding vectors for the passages.
         """
         if not texts:
-            return []
+            return np.zeros((0, 0), dtype=np.float32)
         texts = self._apply_prefix(texts, "passage:")
         return self._encode(texts)
 
-    def embed_query(self, texts: List[str]) -> List[List[float]]:
+    def embed_query(self, texts: List[str]) -> np.ndarray:
         """Embed query texts with model-specific prefixes.
 
+        Cached embeddings are reused when a query cache is configured; only
+        misses are encoded, in a single batch.
+
         Args:
             texts: A list of query texts to be embedded.
         Returns:
-            A list of embedding vectors for the queries.
+            A float32 matrix of embedding vectors for the queries.
         """
         if not texts:
-            return []
-        texts = self._apply_prefix(texts, "query:")
-        return self._encode(texts)
+            return np.zeros((0, 0), dtype=np.float32)
+        texts = self._apply_prefix([normalize_whitespace(text) for text in texts], "query:")
+        if self._query_cache is None:
+            return self._encode(texts, self._query_model)
+
+        found: Dict[str, np.ndarray] = {}
+        for text in dict.fromkeys(texts):
+            cached = self._query_cache.get(self._query_cache_key(text))
+            if cached is not None:
+                found[text] = cached
+        missing = [text for text in dict.fromkeys(texts) if text not in found]
+        if missing and self._shared_cache is not None:
+            found.update(self._shared_get(missing))
+            missing = [text for text in missing if text not in found]
+        if missing:
+            encoded = self._encode(missing, self._query_model)
+            for text, vector in zip(missing, encoded):
+                found[text] = vector
+                self._query_cache.set(self._query_cache_key(text), vector)
+            if self._shared_cache is not None:
+                self._shared_set({text: found[text] for text in missing})
+        return np.stack([found[text] for text in texts])
+
+    def _query_cache_key(self, prefixed_text: str) -> str:
+        """Build the cache key for a normalized, prefixed query.
+
+        Args:
+            prefixed_text: Query text after normalization and prefixing.
+        Returns:
+            A hex digest over the model name and text.
+        """
+        model_id = self.model_name if self.query_backend == "torch" else f"{self.model_name}#{self.query_backend}"
+        blob = f"{model_id}\x00{prefixed_text}".encode("utf-8")
+        return hashlib.sha256(blob).hexdigest()
+
+    def _shared_get(self, texts: List[str]) -> Dict[str, np.ndarray]:
+        """Fetch query embeddings from the shared Redis cache.
+
+        Args:
+            texts: Normalized, prefixed query texts.
+        Returns:
+            A mapping of text to embedding for the entries found.
+        """
+        keys = [self._query_cache_key(text) for text in texts]
+        try:
+            blobs = self._shared_cache.mget([f"qemb:{key}" for key in keys])
+        except Exception:
+            return {}
+        found: Dict[str, np.ndarray] = {}
+        for text, key, blob in zip(texts, keys, blobs):
+            if not blob:
+                continue
+            vector = np.frombuffer(blob, dtype=np.float32)
+            found[text] = vector
+            self._query_cache.set(key, vector)
+        self._shared_hits += len(found)
+        return found
+
+    def _shared_set(self, vectors: Dict[str, np.ndarray]) -> None:
+        """Write query embeddings to the shared Redis cache.
+
+        Args:
+            vectors: Mapping of normalized, prefixed query text to embedding.
+        """
+        try:
+            pipe = self._shared_cache.pipeline(transaction=False)
+            for text, vector in vectors.items():
+                key = f"qemb:{self._query_cache_key(text)}"
+                blob = np.asarray(vector, dtype=np.float32).tobytes()
+                if self._query_cache_ttl:
+                    pipe.setex(key, self._query_cache_ttl, blob)
+                else:
+                    pipe.set(key, blob)
+            pipe.execute()
+        except Exception:
+            pass
+
+    def query_cache_stats(self) -> Dict[str, float]:
+        """Return hit/miss counters for the query cache.
+
+        Returns:
+            In-process cache stats plus Redis hits, or an empty dict when caching is disabled.
+        """
+        if self._query_cache is None:
+            return {}
+        stats = self._query_cache.stats()
+        stats["shared_hits"] = self._shared_hits
+        return stats
 
     def dimension(self) -> int:
         """Return the embedding dimension for the configured model.
@@ -94,5 +230,4 @@ class EmbeddingModel:
         Returns:
             The dimensionality of the embeddings produced by this model.
         """
-        probe = self.embed(["dimension probe"])[0]
-        return len(probe)
+        return int(self._encode(["dimension probe"], self._query_model).shape[1])
@@ -0,0 +1,28 @@
+from .chunking import METADATA_VERSION, ChunkBatch, IncrementalChunker, PreparedJob, job_metadata, prepare_job
+from .loader import JobRecord, iter_jobs, iter_raw_jobs, load_jobs
+from .manifest import BuildManifest, ManifestDiff, ManifestEntry, content_hash
+from .parallel import iter_prepared_jobs
+from .stages import StageStats, prefetch, timed
+from .writer import PipelinedWriter
+
+__all__ = [
+    "METADATA_VERSION",
+    "BuildManifest",
+    "ChunkBatch",
+    "IncrementalChunker",
+    "JobRecord",
+    "ManifestDiff",
+    "ManifestEntry",
+    "PipelinedWriter",
+    "PreparedJob",
+    "StageStats",
+    "content_hash",
+    "iter_jobs",
+    "iter_prepared_jobs",
+    "iter_raw_jobs",
+    "job_metadata",
+    "load_jobs",
+    "prefetch",
+    "prepare_job",
+    "timed",
+]
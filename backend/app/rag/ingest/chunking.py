@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List
+
+from app.rag.ingest.loader import JobRecord
+from app.rag.ingest.manifest import BuildManifest, ManifestDiff, ManifestEntry, content_hash
+from app.rag.preprocess import chunk_text, clean_html, publication_day
+
+
+# Bump when `job_metadata` changes shape; it is part of the build fingerprint,
+# so existing chunks are re-upserted with the new fields.
+METADATA_VERSION = 2
+
+
+@dataclass
+class ChunkBatch:
+    """A batch of chunks ready to embed and upsert."""
+
+    ids: List[str] = field(default_factory=list)
+    documents: List[str] = field(default_factory=list)
+    metadatas: List[Dict[str, Any]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+@dataclass
+class PreparedJob:
+    """A job with a cleaned description, its chunks and content hash."""
+
+    job: JobRecord
+    chunks: List[str]
+    content_hash: str
+
+
+def prepare_job(job: JobRecord, max_chars: int = 1200, overlap: int = 200, clean: bool = True) -> PreparedJob:
+    """Clean, chunk and hash one job.
+
+    This is the CPU-heavy unit of ingestion; it is a module-level function
+    so it can run in worker processes.
+
+    Args:
+        job: Job record, with a raw description when `clean` is True.
+        max_chars: Maximum characters per chunk.
+        overlap: Number of characters to overlap between chunks.
+        clean: Whether to strip HTML from the description first.
+    Returns:
+        The prepared job.
+    """
+    if clean:
+        job.description = clean_html(job.description)
+    chunks = chunk_text(job.description, max_chars=max_chars, overlap=overlap)
+    return PreparedJob(job=job, chunks=chunks, content_hash=content_hash(asdict(job).values()))
+
+
+def job_metadata(job: JobRecord) -> Dict[str, Any]:
+    """Build the metadata stored with each chunk of a job.
+
+    `publication_day` (days since the epoch) is a numeric copy of the
+    publication date, so vector stores that only range-filter numbers can
+    filter on it.
+
+    Args:
+        job: Parsed job record.
+    Returns:
+        A metadata dict shared by all chunks of the job.
+    """
+    metadata: Dict[str, Any] = {
+        "job_id": job.job_id,
+        "job_title": job.job_title,
+        "company": job.company,
+        "location": job.location,
+        "level": job.level,
+        "category": job.job_category,
+        "tags": job.tags,
+        "publication_date": job.publication_date,
+    }
+    day = publication_day(job.publication_date)
+    if day is not None:
+        metadata["publication_day"] = day
+    return metadata
+
+
+class IncrementalChunker:
+    """Streams chunk batches for jobs that changed since the last build.
+
+    Each prepared job is compared against the manifest as it arrives, so
+    unchanged jobs are dropped before embedding. The new manifest and the
+    diff (including jobs that disappeared) are complete once the job stream
+    is exhausted.
+    """
+
+    def __init__(self, manifest: BuildManifest) -> None:
+        """Configure batching against a previous manifest.
+
+        Args:
+            manifest: Manifest from the previous build (may be empty).
+        """
+        self.manifest = manifest
+        self.current: Dict[str, ManifestEntry] = {}
+        self.diff = ManifestDiff()
+
+    def batches(self, prepared: Iterable[PreparedJob], batch_size: int) -> Iterator[ChunkBatch]:
+        """Group the chunks of changed jobs into batches.
+
+        Args:
+            prepared: Cleaned and chunked jobs, in dataset order.
+            batch_size: Chunks per yielded batch.
+        Yields:
+            ChunkBatch instances of up to `batch_size` chunks.
+        """
+        batch = ChunkBatch()
+        for item in prepared:
+            job, chunks = item.job, item.chunks
+            entry = ManifestEntry(
+                content_hash=item.content_hash,
+                chunk_ids=[f"{job.job_id}-{idx}" for idx in range(len(chunks))],
+            )
+            self.current[job.job_id] = entry
+            changed, stale = self.manifest.compare_job(job.job_id, entry)
+            if not changed:
+                self.diff.unchanged += 1
+                continue
+            self.diff.changed.append(job.job_id)
+            self.diff.stale_chunk_ids.extend(stale)
+
+            metadata = job_metadata(job)
+            for chunk_id, chunk in zip(entry.chunk_ids, chunks):
+                batch.ids.append(chunk_id)
+                batch.documents.append(chunk)
+                batch.metadatas.append(dict(metadata))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = ChunkBatch()
+        if len(batch):
+            yield batch
+
+        self.diff.removed, removed_ids = self.manifest.removed_chunk_ids(self.current)
+        self.diff.stale_chunk_ids.extend(removed_ids)
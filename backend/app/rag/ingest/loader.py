@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterator, List
+
+import pandas as pd
+
+from app.rag.preprocess import clean_html
+
+
+_COLUMNS = {
+    "job_id": "ID",
+    "job_category": "Job Category",
+    "job_title": "Job Title",
+    "company": "Company Name",
+    "publication_date": "Publication Date",
+    "location": "Job Location",
+    "level": "Job Level",
+    "tags": "Tags",
+    "description": "Job Description",
+}
+
+
+@dataclass
+class JobRecord:
+    """Structured job record parsed from the CSV dataset."""
+
+    job_id: str
+    job_category: str
+    job_title: str
+    company: str
+    publication_date: str
+    location: str
+    level: str
+    tags: str
+    description: str
+
+
+def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Strip whitespace from column names in place.
+
+    Args:
+        df: Input dataframe.
+    Returns:
+        The same dataframe with normalized column names.
+    """
+    df.columns = [col.strip() for col in df.columns]
+    return df
+
+
+def _column(df: pd.DataFrame, name: str) -> List[str]:
+    """Return a column as strings, or empty strings when it is missing.
+
+    Args:
+        df: Input dataframe.
+        name: Column name.
+    Returns:
+        One string per row.
+    """
+    if name not in df.columns:
+        return [""] * len(df)
+    return [str(value) for value in df[name].tolist()]
+
+
+def iter_raw_jobs(path: str, chunksize: int = 1000) -> Iterator[JobRecord]:
+    """Stream job records from a CSV file without cleaning descriptions.
+
+    The CSV is read `chunksize` rows at a time, so memory stays bounded by
+    the chunk size rather than the file size.
+
+    Args:
+        path: Path to the CSV dataset.
+        chunksize: Rows parsed per read.
+    Yields:
+        JobRecord entries with the raw (HTML) description.
+    """
+    for df in pd.read_csv(path, chunksize=chunksize):
+        _normalize_columns(df)
+        columns = [_column(df, name) for name in _COLUMNS.values()]
+        for values in zip(*columns):
+            yield JobRecord(*values)
+
+
+def iter_jobs(path: str, chunksize: int = 1000) -> Iterator[JobRecord]:
+    """Stream job records from a CSV file with cleaned descriptions.
+
+    Args:
+        path: Path to the CSV dataset.
+        chunksize: Rows parsed per read.
+    Yields:
+        JobRecord entries.
+    """
+    for job in iter_raw_jobs(path, chunksize=chunksize):
+        job.description = clean_html(job.description)
+        yield job
+
+
+def load_jobs(path: str) -> List[JobRecord]:
+    """Load job records from a CSV file.
+
+    Args:
+        path: Path to the CSV dataset.
+    Returns:
+        A list of JobRecord entries.
+    """
+    return list(iter_jobs(path))
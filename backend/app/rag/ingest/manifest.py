@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List
+
+
+def content_hash(fields: Iterable[str]) -> str:
+    """Hash a job's indexed fields into a stable digest.
+
+    Args:
+        fields: Field values that affect the indexed chunks or metadata.
+    Returns:
+        A hex SHA-256 digest.
+    """
+    return hashlib.sha256("\x1f".join(fields).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ManifestEntry:
+    """Indexed state of one job: its content hash and chunk IDs."""
+
+    content_hash: str
+    chunk_ids: List[str]
+
+
+@dataclass
+class ManifestDiff:
+    """Changes between a stored manifest and the current dataset."""
+
+    changed: List[str] = field(default_factory=list)
+    stale_chunk_ids: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    removed: int = 0
+
+
+class BuildManifest:
+    """Per-job record of what the last `build_index` run indexed.
+
+    The fingerprint captures everything that invalidates all vectors at once
+    (embedding model, backend, chunking parameters); under a different
+    fingerprint every job is re-indexed, but the stored chunk IDs are kept so
+    chunks of removed jobs are still deleted.
+    """
+
+    def __init__(self, fingerprint: str, jobs: Dict[str, ManifestEntry] | None = None) -> None:
+        """Create a manifest.
+
+        Args:
+            fingerprint: Build configuration fingerprint.
+            jobs: Mapping of job ID to its indexed state.
+        """
+        self.fingerprint = fingerprint
+        self.jobs: Dict[str, ManifestEntry] = jobs or {}
+
+    @classmethod
+    def load(cls, path: str, fingerprint: str) -> "BuildManifest":
+        """Load a manifest, invalidating its content hashes if the fingerprint differs.
+
+        Args:
+            path: Manifest JSON path.
+            fingerprint: Fingerprint of the current build configuration.
+        Returns:
+            The stored manifest (with blank hashes on a fingerprint mismatch), or an empty one.
+        """
+        if not os.path.exists(path):
+            return cls(fingerprint)
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        # Blank hashes never match, so every job re-indexes and its old chunk IDs are diffed.
+        matches = data.get("fingerprint") == fingerprint
+        jobs = {
+            job_id: ManifestEntry(
+                content_hash=entry["hash"] if matches else "",
+                chunk_ids=list(entry["chunk_ids"]),
+            )
+            for job_id, entry in data.get("jobs", {}).items()
+        }
+        return cls(fingerprint, jobs)
+
+    def save(self, path: str) -> None:
+        """Write the manifest atomically.
+
+        Args:
+            path: Manifest JSON path.
+        """
+        payload = {
+            "fingerprint": self.fingerprint,
+            "jobs": {
+                job_id: {"hash": entry.content_hash, "chunk_ids": entry.chunk_ids}
+                for job_id, entry in self.jobs.items()
+            },
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
+
+    def compare_job(self, job_id: str, entry: ManifestEntry) -> tuple[bool, List[str]]:
+        """Compare one job's current state against the manifest.
+
+        Args:
+            job_id: Job ID.
+            entry: The job's state in the current dataset.
+        Returns:
+            A tuple of (whether the job must be re-indexed, its stale chunk IDs).
+        """
+        previous = self.jobs.get(job_id)
+        if previous is None:
+            return True, []
+        if previous.content_hash == entry.content_hash:
+            return False, []
+        keep = set(entry.chunk_ids)
+        return True, [chunk_id for chunk_id in previous.chunk_ids if chunk_id not in keep]
+
+    def removed_chunk_ids(self, current_job_ids: Iterable[str]) -> tuple[int, List[str]]:
+        """Collect chunk IDs of jobs that are no longer in the dataset.
+
+        Args:
+            current_job_ids: Job IDs present in the current dataset.
+        Returns:
+            A tuple of (number of removed jobs, their chunk IDs).
+        """
+        present = set(current_job_ids)
+        removed = [entry for job_id, entry in self.jobs.items() if job_id not in present]
+        return len(removed), [chunk_id for entry in removed for chunk_id in entry.chunk_ids]
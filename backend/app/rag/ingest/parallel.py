@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import Deque, Iterable, Iterator, List
+
+from app.rag.ingest.chunking import PreparedJob, prepare_job
+from app.rag.ingest.loader import JobRecord
+
+
+def _prepare_many(jobs: List[JobRecord], max_chars: int, overlap: int) -> List[PreparedJob]:
+    """Prepare a slice of jobs inside a worker process.
+
+    Args:
+        jobs: Raw job records.
+        max_chars: Maximum characters per chunk.
+        overlap: Number of characters to overlap between chunks.
+    Returns:
+        Prepared jobs in input order.
+    """
+    return [prepare_job(job, max_chars=max_chars, overlap=overlap) for job in jobs]
+
+
+def iter_prepared_jobs(
+    jobs: Iterable[JobRecord],
+    max_chars: int = 1200,
+    overlap: int = 200,
+    workers: int = 1,
+    chunksize: int = 64,
+) -> Iterator[PreparedJob]:
+    """Clean and chunk raw jobs, optionally across a process pool.
+
+    Jobs are sent to workers in slices of `chunksize`. At most two slices
+    per worker are in flight, so the raw job stream is consumed lazily and
+    memory stays bounded; results are yielded in input order.
+
+    Args:
+        jobs: Raw job records (HTML descriptions).
+        max_chars: Maximum characters per chunk.
+        overlap: Number of characters to overlap between chunks.
+        workers: Worker processes; 1 or less prepares jobs in-process.
+        chunksize: Jobs per task sent to a worker.
+    Yields:
+        Prepared jobs in input order.
+    """
+    if workers <= 1:
+        for job in jobs:
+            yield prepare_job(job, max_chars=max_chars, overlap=overlap)
+        return
+
+    task = partial(_prepare_many, max_chars=max_chars, overlap=overlap)
+    source = iter(jobs)
+    max_pending = 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: Deque[Future] = deque()
+        while True:
+            while len(pending) < max_pending:
+                slice_ = list(islice(source, max(1, chunksize)))
+                if not slice_:
+                    break
+                pending.append(executor.submit(task, slice_))
+            if not pending:
+                return
+            yield from pending.popleft().result()
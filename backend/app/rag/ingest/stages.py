@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Sized, TypeVar
+
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+class _StageError:
+    """Wraps an exception raised by a producer thread."""
+
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+@dataclass
+class StageStats:
+    """Item count and busy time accumulated by one pipeline stage."""
+
+    name: str
+    items: int = 0
+    seconds: float = 0.0
+
+    def __post_init__(self) -> None:
+        self._lock = threading.Lock()
+
+    def record(self, items: int, seconds: float) -> None:
+        """Add work done by the stage (safe to call from several threads).
+
+        Args:
+            items: Number of items processed.
+            seconds: Time spent processing them.
+        """
+        with self._lock:
+            self.items += items
+            self.seconds += seconds
+
+    def summary(self, unit: str = "chunks") -> str:
+        """Format the stage throughput.
+
+        Args:
+            unit: Label for the counted items.
+        Returns:
+            A one-line human-readable summary.
+        """
+        rate = self.items / self.seconds if self.seconds > 0 else 0.0
+        return f"{self.name}: {self.items} {unit} in {self.seconds:.1f}s busy ({rate:.1f} {unit}/s)"
+
+
+def timed(source: Iterable[T], stats: StageStats) -> Iterator[T]:
+    """Measure the time spent producing each item of an iterator.
+
+    Args:
+        source: Iterable whose production time is measured.
+        stats: Stage stats to record into; sized items count by their length.
+    Yields:
+        Items from `source`, unchanged.
+    """
+    iterator = iter(source)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            stats.record(0, time.perf_counter() - start)
+            return
+        stats.record(len(item) if isinstance(item, Sized) else 1, time.perf_counter() - start)
+        yield item
+
+
+def prefetch(source: Iterable[T], maxsize: int = 8, name: str = "ingest-stage") -> Iterator[T]:
+    """Run an iterator on a background thread behind a bounded queue.
+
+    The producer blocks once `maxsize` items are waiting, so a slow consumer
+    applies back-pressure instead of letting memory grow. Exceptions raised
+    by the producer are re-raised in the consumer.
+
+    Args:
+        source: Iterable to drain on the background thread.
+        maxsize: Maximum number of buffered items.
+        name: Thread name, for debugging.
+    Yields:
+        Items from `source`, in order.
+    """
+    buffer: "queue.Queue[object]" = queue.Queue(maxsize=max(1, maxsize))
+    stop = threading.Event()
+
+    def _put(item: object) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce() -> None:
+        try:
+            for item in source:
+                if not _put(item):
+                    return
+        except Exception as exc:
+            _put(_StageError(exc))
+            return
+        _put(_DONE)
+
+    thread = threading.Thread(target=_produce, name=name, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _StageError):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+        thread.join(timeout=1.0)
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.rag.ingest.chunking import ChunkBatch
+from app.rag.ingest.stages import StageStats
+
+
+class PipelinedWriter:
+    """Upserts vectors on background threads while the caller keeps encoding.
+
+    Incoming embeddings are re-batched to `batch_size` (independent of the
+    embedding batch size) and upserted by up to `concurrency` threads. At
+    most `max_pending` batches may be queued or in flight; beyond that
+    `write` blocks, which bounds memory and applies back-pressure to the
+    encoder.
+    """
+
+    def __init__(
+        self,
+        vector_store: Any,
+        batch_size: int = 100,
+        concurrency: int = 4,
+        max_pending: Optional[int] = None,
+    ) -> None:
+        """Configure the writer.
+
+        Args:
+            vector_store: Store exposing `upsert(ids, embeddings, documents, metadatas)`.
+            batch_size: Vectors per upsert request.
+            concurrency: Parallel upsert threads.
+            max_pending: Batches allowed in flight; defaults to twice the concurrency.
+        """
+        self.vector_store = vector_store
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.stats = StageStats("upsert")
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="upsert")
+        self._slots = threading.BoundedSemaphore(max_pending or 2 * self.concurrency)
+        self._futures: List[Future] = []
+        self._buffer = ChunkBatch()
+        self._embeddings: List[Sequence[float]] = []
+
+    def write(
+        self,
+        ids: List[str],
+        embeddings: Sequence[Sequence[float]],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+    ) -> None:
+        """Queue vectors for upsert, dispatching full batches.
+
+        Args:
+            ids: Vector IDs.
+            embeddings: Embedding vectors aligned with `ids`.
+            documents: Chunk texts aligned with `ids`.
+            metadatas: Metadata dicts aligned with `ids`.
+        """
+        self._buffer.ids.extend(ids)
+        self._buffer.documents.extend(documents)
+        self._buffer.metadatas.extend(metadatas)
+        self._embeddings.extend(embeddings)
+        while len(self._buffer) >= self.batch_size:
+            self._dispatch(self.batch_size)
+
+    def _dispatch(self, size: int) -> None:
+        """Hand the first `size` buffered vectors to an upsert thread.
+
+        Args:
+            size: Number of buffered vectors to send.
+        """
+        batch = ChunkBatch(self._buffer.ids[:size], self._buffer.documents[:size], self._buffer.metadatas[:size])
+        embeddings = self._embeddings[:size]
+        del self._buffer.ids[:size], self._buffer.documents[:size], self._buffer.metadatas[:size]
+        del self._embeddings[:size]
+
+        self._raise_failures()
+        self._slots.acquire()
+        future = self._executor.submit(self._upsert, batch, embeddings)
+        future.add_done_callback(lambda _: self._slots.release())
+        self._futures.append(future)
+
+    def _upsert(self, batch: ChunkBatch, embeddings: List[Sequence[float]]) -> None:
+        """Upsert one batch and record its timing.
+
+        Args:
+            batch: IDs, documents and metadata to upsert.
+            embeddings: Embedding vectors aligned with the batch.
+        """
+        start = time.perf_counter()
+        self.vector_store.upsert(batch.ids, embeddings, batch.documents, batch.metadatas)
+        self.stats.record(len(batch), time.perf_counter() - start)
+
+    def _raise_failures(self) -> None:
+        """Re-raise the first error from a finished upsert and drop finished futures."""
+        running: List[Future] = []
+        for future in self._futures:
+            if not future.done():
+                running.append(future)
+            elif future.exception() is not None:
+                raise future.exception()
+        self._futures = running
+
+    def close(self) -> None:
+        """Flush the remaining buffer and wait for every upsert to finish."""
+        try:
+            if len(self._buffer):
+                self._dispatch(len(self._buffer))
+            for future in self._futures:
+                future.result()
+            self._futures = []
+        finally:
+            self._executor.shutdown(wait=True)
@@ -1,12 +1,18 @@
 from __future__ import annotations
 
-from typing import Any, Dict
+import json
+from typing import Any, AsyncIterator, Dict
 
 import httpx
 
 
 class OpenAICompatibleClient:
-    """Minimal client for OpenAI-compatible chat completion endpoints."""
+    """Minimal client for OpenAI-compatible chat completion endpoints.
+
+    HTTP connections are pooled: the sync and async transports are created on
+    first use and reused for every call, so requests skip TCP/TLS setup while
+    a keep-alive connection is available. Call `close`/`aclose` on shutdown.
+    """
 
     def __init__(
         self,
@@ -15,6 +21,10 @@ class OpenAICompatibleClient:
         model: str,
         temperature: float = 0.2,
         max_tokens: int = 500,
+        timeout: float = 60.0,
+        max_connections: int = 200,
+        max_keepalive_connections: int = 50,
+        keepalive_expiry: float = 30.0,
     ) -> None:
         """Configure the OpenAI-compatible client.
 
@@ -24,20 +34,34 @@ class OpenAICompatibleClient:
             model: Model name to use for generation.
             temperature: Sampling temperature for generation.
             max_tokens: Maximum tokens to generate in a response.
+            timeout: Per-request timeout in seconds.
+            max_connections: Maximum concurrent connections in the pool.
+            max_keepalive_connections: Idle connections kept open for reuse.
+            keepalive_expiry: Seconds an idle connection is kept open.
         """
         self.base_url = base_url.rstrip("/")
         self.api_key = api_key
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._client: httpx.Client | None = None
+        self._async_client: httpx.AsyncClient | None = None
 
-    def generate(self, prompt: str) -> str:
-        """Generate a response for the given prompt.
+    def _request(self, prompt: str, stream: bool = False) -> tuple[str, Dict[str, Any], Dict[str, str]]:
+        """Build the chat completion request for a prompt.
 
         Args:
             prompt: The prompt to send to the model.
+            stream: Whether to request a server-sent-events token stream.
         Returns:
-            The generated response text.
+            A tuple of (url, JSON payload, headers).
         """
         if not self.api_key:
             raise RuntimeError("LLM_API_KEY is not configured")
@@ -50,10 +74,89 @@ class OpenAICompatibleClient:
             "temperature": self.temperature,
             "max_tokens": self.max_tokens,
         }
+        if stream:
+            payload["stream"] = True
         headers = {"Authorization": f"Bearer {self.api_key}"}
-        url = f"{self.base_url}/chat/completions"
-        with httpx.Client(timeout=60.0) as client:
-            response = client.post(url, json=payload, headers=headers)
+        return f"{self.base_url}/chat/completions", payload, headers
+
+    @staticmethod
+    def _parse(response: httpx.Response) -> str:
+        """Extract the answer text from a chat completion response.
+
+        Args:
+            response: The HTTP response.
+        Returns:
+            The generated response text.
+        """
         response.raise_for_status()
         data = response.json()
         return data["choices"][0]["message"]["content"].strip()
+
+    def _pooled_async_client(self) -> httpx.AsyncClient:
+        """Return the shared async HTTP client, creating it on first use.
+
+        Returns:
+            The pooled httpx.AsyncClient.
+        """
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits)
+        return self._async_client
+
+    def generate(self, prompt: str) -> str:
+        """Generate a response for the given prompt.
+
+        Args:
+            prompt: The prompt to send to the model.
+        Returns:
+            The generated response text.
+        """
+        url, payload, headers = self._request(prompt)
+        if self._client is None:
+            self._client = httpx.Client(timeout=self.timeout, limits=self.limits)
+        return self._parse(self._client.post(url, json=payload, headers=headers))
+
+    async def agenerate(self, prompt: str) -> str:
+        """Generate a response without blocking the event loop.
+
+        Args:
+            prompt: The prompt to send to the model.
+        Returns:
+            The generated response text.
+        """
+        url, payload, headers = self._request(prompt)
+        return self._parse(await self._pooled_async_client().post(url, json=payload, headers=headers))
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        """Stream the response for a prompt as it is generated.
+
+        Args:
+            prompt: The prompt to send to the model.
+        Yields:
+            Text deltas in generation order.
+        """
+        url, payload, headers = self._request(prompt, stream=True)
+        async with self._pooled_async_client().stream("POST", url, json=payload, headers=headers) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:") :].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or []
+                delta = (choices[0].get("delta") or {}).get("content") if choices else None
+                if delta:
+                    yield delta
+
+    def close(self) -> None:
+        """Close the pooled sync HTTP client, if one was opened."""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    async def aclose(self) -> None:
+        """Close both pooled HTTP clients, if they were opened."""
+        self.close()
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
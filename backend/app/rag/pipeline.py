@@ -1,23 +1,84 @@
 from __future__ import annotations
 
-from typing import List, Optional
+import asyncio
+import hashlib
+import os
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
+from app.core.cache import TTLCache, get_binary_cache
 from app.core.config import Settings
 from app.rag.embeddings import EmbeddingModel
 from app.rag.llm import OpenAICompatibleClient
-from app.rag.prompts import build_prompt
-from app.rag.retrieval import BM25Index, CrossEncoderReranker, RetrievedChunk, Retriever, build_reranker
-from app.rag.retrieval import PineconeVectorStore
+from app.rag.preprocess import normalize_whitespace
+from app.rag.prompts import TokenCounter, build_prompt, get_token_counter
+from app.rag.retrieval import BM25Index, CrossEncoderReranker, MetadataFilter, RetrievedChunk, Retriever, build_reranker
+from app.rag.retrieval import build_vector_store
+from app.rag.retrieval.filters import FilterExtractor
+from app.rag.retrieval.reranker import onnx_export_dir
+
+
+_LLM_FALLBACK = (
+    "LLM not configured. Showing top matching jobs based on retrieval. "
+    "Set LLM_API_KEY to enable generated answers."
+)
+# Weight of the latest rerank measurement in the per-pair cost estimate.
+_RERANK_COST_DECAY = 0.2
+# Pairs scored by `warm_up_reranker`, with a passage about as long as an indexed chunk.
+_WARM_UP_PAIRS = 8
+_WARM_UP_PASSAGE = "Design, build and operate data pipelines and services for a growing team. " * 14
+
+
+@dataclass
+class RetrievalRequest:
+    """One query in a batch passed to `RagPipeline.retrieve_many`."""
+
+    query: str
+    top_k: int
+    use_hybrid: bool
+    use_rerank: bool
+    nprobe: Optional[int] = None
+    filters: Optional[MetadataFilter] = None
+    budget_ms: Optional[float] = None
 
 
 class RagPipeline:
-    """Orchestrates retrieval, optional reranking, and generation."""
+    """Orchestrates retrieval, optional reranking, and generation.
+
+    Each stage can be cached on its own, so requests that differ only in a
+    later stage reuse the earlier ones: candidates per (query, hybrid,
+    nprobe, filters) at the retriever's full depth, rerank scores per (query, chunk)
+    inside the reranker, and answers per final prompt.
+
+    Retrieval is a cascade: the retriever returns its fused candidates, of
+    which the first `max(top_k, rerank_k)` go to the cross-encoder. With a
+    latency budget, that shortlist shrinks to what the measured per-pair
+    rerank cost allows in the time left after retrieval, and reranking is
+    skipped when not even `top_k` pairs fit. The estimate starts from
+    `rerank_pair_ms` or a `warm_up_reranker` call, so budgets hold from the
+    first request.
+
+    Metadata filters narrow the search inside the retriever. `resolve_filters`
+    combines filters given by the caller with ones extracted from the query
+    text (locations, levels, categories and recency phrases).
+
+    Prompts are assembled within `prompt_token_budget` tokens (0 = no
+    limit), and their size is reported as "prompt_tokens" in `timings`.
+    """
 
     def __init__(
         self,
         retriever: Retriever,
         llm: OpenAICompatibleClient,
         reranker: Optional[CrossEncoderReranker] = None,
+        rerank_k: int = 5,
+        candidate_cache: Optional[TTLCache] = None,
+        answer_cache: Optional[TTLCache] = None,
+        filter_extraction: bool = False,
+        prompt_token_budget: int = 0,
+        token_counter: Optional[TokenCounter] = None,
+        rerank_pair_ms: float = 0.0,
     ) -> None:
         """Initialize the pipeline components.
 
@@ -25,10 +86,28 @@ class RagPipeline:
             retriever: Retriever instance for fetching relevant chunks.
             llm: LLM client used to generate answers.
             reranker: Optional reranker for refining retrieval results.
+            rerank_k: Minimum number of leading candidates reranked (at least `top_k` are).
+            candidate_cache: Optional cache of retriever candidates.
+            answer_cache: Optional cache of generated answers keyed by prompt.
+            filter_extraction: Whether `resolve_filters` extracts filters from
+                query text by default.
+            prompt_token_budget: Maximum prompt tokens; 0 disables the limit.
+            token_counter: Token counter for the LLM's tokenizer.
+            rerank_pair_ms: Initial rerank cost per (query, chunk) pair in
+                milliseconds; 0 leaves it unknown until measured.
         """
         self.retriever = retriever
         self.llm = llm
         self.reranker = reranker
+        self.rerank_k = rerank_k
+        self._candidate_cache = candidate_cache
+        self._answer_cache = answer_cache
+        self._rerank_pair_seconds: Optional[float] = rerank_pair_ms / 1000 if rerank_pair_ms else None
+        self.filter_extraction = filter_extraction
+        # Built up front: collecting the indexed vocabulary scans the metadata postings.
+        self._extractor = FilterExtractor(retriever.filter_vocabulary())
+        self.prompt_token_budget = prompt_token_budget
+        self.token_counter = token_counter or get_token_counter()
 
     def run(
         self,
@@ -36,6 +115,10 @@ class RagPipeline:
         top_k: int,
         use_hybrid: bool,
         use_rerank: bool,
+        nprobe: Optional[int] = None,
+        budget_ms: Optional[float] = None,
+        timings: Optional[Dict[str, float]] = None,
+        filters: Optional[MetadataFilter] = None,
     ) -> tuple[str, List[RetrievedChunk]]:
         """Run retrieval (and optional reranking) then generate an answer.
 
@@ -44,19 +127,434 @@ class RagPipeline:
             top_k: Number of results to return.
             use_hybrid: Whether to blend vector and BM25 results.
             use_rerank: Whether to apply reranking.
+            nprobe: Optional ANN search breadth for local IVF indexes.
+            budget_ms: Optional latency budget for retrieval and reranking.
+            timings: Optional dict receiving stage durations in milliseconds.
+            filters: Optional metadata filter restricting retrieval.
         Returns:
             A tuple of (answer, retrieved chunks).
         """
-        results = self.retriever.retrieve(query, use_hybrid=use_hybrid)
-        if results and use_rerank and self.reranker:
-            results = self.reranker.rerank(query, results)[:top_k]
-        else:
-            results = results[:top_k]
+        results = self.retrieve(
+            query, top_k, use_hybrid, use_rerank, nprobe=nprobe, budget_ms=budget_ms, timings=timings, filters=filters
+        )
+        start = time.perf_counter()
+        answer = self._safe_generate(self._prompt(query, results, timings))
+        _record(timings, "generate", start)
+        return answer, results
 
-        prompt = build_prompt(query, results)
-        answer = self._safe_generate(prompt)
+    async def arun(
+        self,
+        query: str,
+        top_k: int,
+        use_hybrid: bool,
+        use_rerank: bool,
+        nprobe: Optional[int] = None,
+        budget_ms: Optional[float] = None,
+        timings: Optional[Dict[str, float]] = None,
+        filters: Optional[MetadataFilter] = None,
+    ) -> tuple[str, List[RetrievedChunk]]:
+        """Async variant of `run` for use inside the API event loop.
+
+        Query encoding, search and reranking are CPU-bound, so they run in a
+        worker thread; the LLM call awaits the pooled async HTTP client and
+        holds no thread while it waits.
+
+        Args:
+            query: User query string.
+            top_k: Number of results to return.
+            use_hybrid: Whether to blend vector and BM25 results.
+            use_rerank: Whether to apply reranking.
+            nprobe: Optional ANN search breadth for local IVF indexes.
+            budget_ms: Optional latency budget for retrieval and reranking.
+            timings: Optional dict receiving stage durations in milliseconds.
+            filters: Optional metadata filter restricting retrieval.
+        Returns:
+            A tuple of (answer, retrieved chunks).
+        """
+        results = await self.aretrieve(query, top_k, use_hybrid, use_rerank, nprobe, budget_ms, timings, filters)
+        start = time.perf_counter()
+        answer = await self._safe_agenerate(self._prompt(query, results, timings))
+        _record(timings, "generate", start)
         return answer, results
 
+    async def aretrieve(
+        self,
+        query: str,
+        top_k: int,
+        use_hybrid: bool,
+        use_rerank: bool,
+        nprobe: Optional[int] = None,
+        budget_ms: Optional[float] = None,
+        timings: Optional[Dict[str, float]] = None,
+        filters: Optional[MetadataFilter] = None,
+    ) -> List[RetrievedChunk]:
+        """Run `retrieve` in a worker thread.
+
+        Args:
+            query: User query string.
+            top_k: Number of results to return.
+            use_hybrid: Whether to blend vector and BM25 results.
+            use_rerank: Whether to apply reranking.
+            nprobe: Optional ANN search breadth for local IVF indexes.
+            budget_ms: Optional latency budget for retrieval and reranking.
+            timings: Optional dict receiving stage durations in milliseconds.
+            filters: Optional metadata filter restricting retrieval.
+        Returns:
+            Up to `top_k` retrieved chunks.
+        """
+        return await asyncio.to_thread(
+            self.retrieve, query, top_k, use_hybrid, use_rerank, nprobe, budget_ms, timings, filters
+        )
+
+    def retrieve_many(self, requests: List[RetrievalRequest]) -> List[List[RetrievedChunk]]:
+        """Retrieve and optionally rerank chunks for a batch of queries.
+
+        Queries are encoded together and searched concurrently (see
+        `Retriever.retrieve_many`), and every (query, chunk) pair that needs
+        reranking is scored in a single cross-encoder call.
+
+        The batch returns as a whole, so it is held to the smallest request
+        `budget_ms`: rerank depths are allotted in input order from the time
+        left after retrieval, and requests the budget cannot cover keep
+        their retrieval order.
+
+        Args:
+            requests: Queries with their retrieval options.
+        Returns:
+            Up to `top_k` chunks per request, in input order.
+        """
+        start = time.perf_counter()
+        budgets = [request.budget_ms for request in requests if request.budget_ms]
+        results: List[Optional[List[RetrievedChunk]]] = [
+            self._cached_candidates(request.query, request.use_hybrid, request.nprobe, request.filters)
+            for request in requests
+        ]
+        missing = [idx for idx, chunks in enumerate(results) if chunks is None]
+        if missing:
+            fetched = self.retriever.retrieve_many(
+                [requests[idx].query for idx in missing],
+                use_hybrid=[requests[idx].use_hybrid for idx in missing],
+                nprobe=[requests[idx].nprobe for idx in missing],
+                filters=[requests[idx].filters for idx in missing],
+            )
+            for idx, chunks in zip(missing, fetched):
+                request = requests[idx]
+                self._store_candidates(request.query, request.use_hybrid, request.nprobe, request.filters, chunks)
+                results[idx] = chunks
+        if self.reranker:
+            remaining = min(budgets) / 1000 - (time.perf_counter() - start) if budgets else None
+            depths: Dict[int, int] = {}
+            for idx, request in enumerate(requests):
+                if not (request.use_rerank and results[idx]):
+                    continue
+                depth = self._rerank_depth(request.top_k, len(results[idx]), remaining)
+                if depth:
+                    depths[idx] = depth
+                if remaining is not None and self._rerank_pair_seconds is not None:
+                    remaining -= depth * self._rerank_pair_seconds
+            if depths:
+                rerank_start = time.perf_counter()
+                reranked = self.reranker.rerank_many(
+                    [requests[idx].query for idx in depths],
+                    [results[idx][:depth] for idx, depth in depths.items()],
+                )
+                self._observe_rerank(time.perf_counter() - rerank_start, sum(depths.values()))
+                for idx, chunks in zip(depths, reranked):
+                    results[idx] = chunks
+        return [chunks[: request.top_k] for request, chunks in zip(requests, results)]
+
+    async def agenerate_many(self, queries: List[str], results: List[List[RetrievedChunk]]) -> List[str]:
+        """Generate answers for many queries concurrently.
+
+        In-flight calls are capped at the LLM connection pool size so large
+        batches queue for a connection instead of timing out waiting for one.
+
+        Args:
+            queries: User query strings.
+            results: Retrieved chunks for each query.
+        Returns:
+            One answer per query (the fallback message where generation fails).
+        """
+        limit = asyncio.Semaphore(self.llm.max_connections)
+
+        async def generate(query: str, chunks: List[RetrievedChunk]) -> str:
+            async with limit:
+                return await self._safe_agenerate(self._prompt(query, chunks))
+
+        return list(await asyncio.gather(*(generate(query, chunks) for query, chunks in zip(queries, results))))
+
+    async def astream_answer(self, query: str, results: List[RetrievedChunk]) -> AsyncIterator[str]:
+        """Stream the generated answer for already retrieved chunks.
+
+        Falls back to the retrieval-only message if the LLM call fails before
+        producing any text. A failure mid-stream is re-raised after the partial
+        output, so callers can tell a truncated answer from a complete one.
+
+        Args:
+            query: User query string.
+            results: Chunks returned by `retrieve`.
+        Yields:
+            Answer text deltas.
+        """
+        prompt = self._prompt(query, results)
+        cached = self._answer_cache.get(self._answer_key(prompt)) if self._answer_cache is not None else None
+        if cached is not None:
+            yield cached
+            return
+        parts: List[str] = []
+        try:
+            async for delta in self.llm.astream(prompt):
+                parts.append(delta)
+                yield delta
+        except Exception:
+            if parts:
+                raise
+            yield _LLM_FALLBACK
+            return
+        if parts and self._answer_cache is not None:
+            self._answer_cache.set(self._answer_key(prompt), "".join(parts).strip())
+
+    def retrieve(
+        self,
+        query: str,
+        top_k: int,
+        use_hybrid: bool,
+        use_rerank: bool,
+        nprobe: Optional[int] = None,
+        budget_ms: Optional[float] = None,
+        timings: Optional[Dict[str, float]] = None,
+        filters: Optional[MetadataFilter] = None,
+    ) -> List[RetrievedChunk]:
+        """Retrieve and optionally rerank chunks for a query.
+
+        Args:
+            query: User query string.
+            top_k: Number of results to return.
+            use_hybrid: Whether to blend vector and BM25 results.
+            use_rerank: Whether to apply reranking.
+            nprobe: Optional ANN search breadth for local IVF indexes.
+            budget_ms: Optional latency budget for retrieval and reranking;
+                reranking shrinks or is skipped to stay within it.
+            timings: Optional dict receiving stage durations in milliseconds
+                ("retrieve", its legs, "rerank") and the number of reranked
+                candidates ("rerank_k").
+            filters: Optional metadata filter restricting retrieval.
+        Returns:
+            Up to `top_k` retrieved chunks.
+        """
+        start = time.perf_counter()
+        results = self._cached_candidates(query, use_hybrid, nprobe, filters)
+        if results is None:
+            results = self.retriever.retrieve(
+                query, use_hybrid=use_hybrid, nprobe=nprobe, timings=timings, filters=filters
+            )
+            self._store_candidates(query, use_hybrid, nprobe, filters, results)
+        _record(timings, "retrieve", start)
+        if not (results and use_rerank and self.reranker):
+            return results[:top_k]
+
+        remaining = budget_ms / 1000 - (time.perf_counter() - start) if budget_ms else None
+        depth = self._rerank_depth(top_k, len(results), remaining)
+        if timings is not None:
+            timings["rerank_k"] = depth
+        if not depth:
+            return results[:top_k]
+        rerank_start = time.perf_counter()
+        reranked = self.reranker.rerank(query, results[:depth])
+        self._observe_rerank(time.perf_counter() - rerank_start, depth)
+        _record(timings, "rerank", rerank_start)
+        return reranked[:top_k]
+
+    def _rerank_depth(self, top_k: int, available: int, remaining: Optional[float]) -> int:
+        """Choose how many leading candidates to rerank.
+
+        Args:
+            top_k: Number of results to return.
+            available: Number of candidates retrieved.
+            remaining: Seconds left in the latency budget, or None without a budget.
+        Returns:
+            The rerank depth, or 0 to skip reranking.
+        """
+        depth = min(max(top_k, self.rerank_k), available)
+        if remaining is None or self._rerank_pair_seconds is None:
+            return depth
+        affordable = int(max(remaining, 0.0) / self._rerank_pair_seconds)
+        if affordable >= depth:
+            return depth
+        # Reranking fewer than top_k would mix cross-encoder and retrieval scores in one list.
+        return affordable if affordable >= min(top_k, available) else 0
+
+    def _observe_rerank(self, seconds: float, pairs: int) -> None:
+        """Update the moving estimate of rerank cost per (query, chunk) pair.
+
+        Cached scores make pairs cheaper, so the estimate tracks the observed
+        cache hit rate as well as model speed.
+
+        Args:
+            seconds: Duration of a rerank call.
+            pairs: Number of candidates it reranked.
+        """
+        cost = seconds / max(pairs, 1)
+        previous = self._rerank_pair_seconds
+        self._rerank_pair_seconds = cost if previous is None else previous + _RERANK_COST_DECAY * (cost - previous)
+
+    def warm_up_reranker(self) -> None:
+        """Load the cross-encoder and measure its per-pair cost.
+
+        The first call absorbs model loading and one-off allocations; the
+        second, with a different query so no score is cached, seeds the
+        cost estimate that latency budgets are checked against.
+        """
+        if self.reranker is None:
+            return
+        chunks = [
+            RetrievedChunk(id=f"warm-up-{idx}", text=_WARM_UP_PASSAGE, metadata={}, score=0.0)
+            for idx in range(_WARM_UP_PAIRS)
+        ]
+        for attempt in range(2):
+            start = time.perf_counter()
+            self.reranker.rerank(f"warm-up query {attempt}", chunks)
+        self._observe_rerank(time.perf_counter() - start, _WARM_UP_PAIRS)
+
+    def resolve_filters(
+        self,
+        query: str,
+        explicit: Optional[MetadataFilter] = None,
+        extract: Optional[bool] = None,
+    ) -> Optional[MetadataFilter]:
+        """Combine caller-supplied filters with filters extracted from the query.
+
+        Explicit values win per field; extraction only fills fields left
+        empty. Values are respelled as indexed so exact-match stores
+        (Pinecone) and cache keys agree across spellings.
+
+        Args:
+            query: User query string.
+            explicit: Filter given by the caller.
+            extract: Whether to extract filters from the query text; defaults
+                to the pipeline setting.
+        Returns:
+            The effective filter, or None when nothing is constrained.
+        """
+        resolved = explicit or MetadataFilter()
+        if self.filter_extraction if extract is None else extract:
+            resolved = resolved.merge(self._extractor.extract(query))
+        resolved = resolved.canonical(self._extractor.vocabulary)
+        return None if resolved.is_empty() else resolved
+
+    @staticmethod
+    def _candidate_key(
+        query: str,
+        use_hybrid: bool,
+        nprobe: Optional[int],
+        filters: Optional[MetadataFilter],
+    ) -> Tuple[str, bool, Optional[int], Optional[MetadataFilter]]:
+        """Build the candidate cache key; results do not depend on `top_k` or reranking.
+
+        Args:
+            query: User query string.
+            use_hybrid: Whether BM25 results are blended in.
+            nprobe: ANN search breadth.
+            filters: Metadata filter applied during retrieval.
+        Returns:
+            A hashable cache key.
+        """
+        return normalize_whitespace(query), use_hybrid, nprobe, filters
+
+    def _cached_candidates(
+        self,
+        query: str,
+        use_hybrid: bool,
+        nprobe: Optional[int],
+        filters: Optional[MetadataFilter],
+    ) -> Optional[List[RetrievedChunk]]:
+        """Return cached retriever candidates for a query.
+
+        Cached chunks are shared between requests and must not be mutated.
+
+        Args:
+            query: User query string.
+            use_hybrid: Whether BM25 results are blended in.
+            nprobe: ANN search breadth.
+            filters: Metadata filter applied during retrieval.
+        Returns:
+            A copy of the cached candidate list, or None on a miss.
+        """
+        if self._candidate_cache is None:
+            return None
+        cached = self._candidate_cache.get(self._candidate_key(query, use_hybrid, nprobe, filters))
+        return list(cached) if cached is not None else None
+
+    def _store_candidates(
+        self,
+        query: str,
+        use_hybrid: bool,
+        nprobe: Optional[int],
+        filters: Optional[MetadataFilter],
+        results: List[RetrievedChunk],
+    ) -> None:
+        """Cache retriever candidates for a query.
+
+        Args:
+            query: User query string.
+            use_hybrid: Whether BM25 results are blended in.
+            nprobe: ANN search breadth.
+            filters: Metadata filter applied during retrieval.
+            results: Candidates returned by the retriever.
+        """
+        if self._candidate_cache is not None:
+            self._candidate_cache.set(self._candidate_key(query, use_hybrid, nprobe, filters), list(results))
+
+    def _prompt(
+        self,
+        query: str,
+        results: List[RetrievedChunk],
+        timings: Optional[Dict[str, float]] = None,
+    ) -> str:
+        """Build the LLM prompt within the token budget.
+
+        Args:
+            query: User query string.
+            results: Chunks to include as context, best first.
+            timings: Optional dict receiving the prompt size under "prompt_tokens".
+        Returns:
+            The prompt string.
+        """
+        usage: Optional[Dict[str, int]] = {} if timings is not None else None
+        prompt = build_prompt(
+            query,
+            results,
+            max_tokens=self.prompt_token_budget or None,
+            counter=self.token_counter,
+            usage=usage,
+        )
+        if timings is not None:
+            timings["prompt_tokens"] = usage["prompt_tokens"]
+        return prompt
+
+    @staticmethod
+    def _answer_key(prompt: str) -> str:
+        """Build the answer cache key for a final prompt.
+
+        Args:
+            prompt: Prompt passed to the LLM.
+        Returns:
+            A hex digest of the prompt.
+        """
+        return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+    def cache_stats(self) -> Dict[str, Dict[str, float]]:
+        """Return hit/miss counters for the per-stage caches.
+
+        Returns:
+            Stats for the candidate, rerank score and answer caches (empty when disabled).
+        """
+        return {
+            "candidates": self._candidate_cache.stats() if self._candidate_cache is not None else {},
+            "rerank_scores": self.reranker.score_cache_stats() if self.reranker is not None else {},
+            "answers": self._answer_cache.stats() if self._answer_cache is not None else {},
+        }
+
     def _safe_generate(self, prompt: str) -> str:
         """Generate with a safe fallback if the LLM call fails.
 
@@ -65,13 +563,53 @@ class RagPipeline:
         Returns:
             The generated answer, or a fallback message if generation fails.
         """
+        key = self._answer_key(prompt)
+        cached = self._answer_cache.get(key) if self._answer_cache is not None else None
+        if cached is not None:
+            return cached
         try:
-            return self.llm.generate(prompt)
+            answer = self.llm.generate(prompt)
         except Exception:
-            return (
-                "LLM not configured. Showing top matching jobs based on retrieval. "
-                "Set LLM_API_KEY to enable generated answers."
-            )
+            return _LLM_FALLBACK
+        if self._answer_cache is not None:
+            self._answer_cache.set(key, answer)
+        return answer
+
+    async def _safe_agenerate(self, prompt: str) -> str:
+        """Async variant of `_safe_generate`.
+
+        Args:
+            prompt: Prompt passed to the LLM.
+        Returns:
+            The generated answer, or a fallback message if generation fails.
+        """
+        key = self._answer_key(prompt)
+        cached = self._answer_cache.get(key) if self._answer_cache is not None else None
+        if cached is not None:
+            return cached
+        try:
+            answer = await self.llm.agenerate(prompt)
+        except Exception:
+            return _LLM_FALLBACK
+        if self._answer_cache is not None:
+            self._answer_cache.set(key, answer)
+        return answer
+
+    async def aclose(self) -> None:
+        """Release pooled LLM connections."""
+        await self.llm.aclose()
+
+
+def _record(timings: Optional[Dict[str, float]], stage: str, start: float) -> None:
+    """Record the milliseconds elapsed since `start` for a stage.
+
+    Args:
+        timings: Optional dict receiving stage durations.
+        stage: Stage name.
+        start: `time.perf_counter()` at the start of the stage.
+    """
+    if timings is not None:
+        timings[stage] = (time.perf_counter() - start) * 1000
 
 
 def build_pipeline(settings: Settings) -> RagPipeline:
@@ -85,29 +623,37 @@ def build_pipeline(settings: Settings) -> RagPipeline:
     embedding_model = EmbeddingModel(
         model_name=settings.embedding_model,
         batch_size=settings.embedding_batch_size,
+        query_cache_size=settings.query_embedding_cache_size,
+        query_cache_ttl=settings.query_embedding_cache_ttl_seconds,
+        shared_cache=get_binary_cache(settings) if settings.query_embedding_cache_shared else None,
+        query_backend=settings.embedding_query_backend,
+        query_threads=settings.embedding_query_threads,
+        export_dir=onnx_export_dir(settings.vector_dir, settings.embedding_model),
     )
-    vector_store = PineconeVectorStore(
-        api_key=settings.pinecone_api_key,
-        index_name=settings.pinecone_index,
-        cloud=settings.pinecone_cloud,
-        region=settings.pinecone_region,
-        metric=settings.pinecone_metric,
-        dimension=embedding_model.dimension(),
-    )
+    vector_store = build_vector_store(settings, dimension=embedding_model.dimension())
 
     bm25_index = None
     if settings.use_hybrid:
         try:
-            bm25_index = BM25Index.load(f"{settings.vector_dir}/bm25.pkl")
+            bm25_dir = f"{settings.vector_dir}/bm25"
+            bm25_index = BM25Index.load(bm25_dir if os.path.isdir(bm25_dir) else f"{settings.vector_dir}/bm25.pkl")
         except FileNotFoundError:
             bm25_index = None
 
     retriever = Retriever(
         vector_store=vector_store,
         embedding_model=embedding_model,
-        top_k=settings.top_k,
+        top_k=max(settings.top_k, settings.retrieval_candidate_k),
         bm25_index=bm25_index,
         hybrid_alpha=settings.hybrid_alpha,
+        max_workers=settings.retrieval_workers,
+        vector_timeout=settings.vector_timeout_seconds,
+        bm25_timeout=settings.bm25_timeout_seconds,
+        fetch_k=settings.retrieval_fetch_k,
+        fusion=settings.hybrid_fusion,
+        rrf_k=settings.rrf_k,
+        collapse=settings.job_collapse,
+        collapse_overfetch=settings.job_collapse_overfetch,
     )
 
     llm = OpenAICompatibleClient(
@@ -116,7 +662,36 @@ def build_pipeline(settings: Settings) -> RagPipeline:
         model=settings.llm_model,
         temperature=settings.llm_temperature,
         max_tokens=settings.llm_max_tokens,
+        timeout=settings.llm_timeout_seconds,
+        max_connections=settings.llm_max_connections,
+        max_keepalive_connections=settings.llm_max_keepalive_connections,
+        keepalive_expiry=settings.llm_keepalive_expiry_seconds,
     )
 
-    reranker = build_reranker(settings.rerank_model)
-    return RagPipeline(retriever=retriever, llm=llm, reranker=reranker)
+    def stage_cache(size: int) -> Optional[TTLCache]:
+        return TTLCache(size, settings.cache_ttl_seconds) if size > 0 and settings.cache_ttl_seconds > 0 else None
+
+    reranker = build_reranker(
+        settings.rerank_model,
+        score_cache=stage_cache(settings.rerank_score_cache_size),
+        backend=settings.rerank_backend,
+        batch_size=settings.rerank_batch_size,
+        max_length=settings.rerank_max_length,
+        export_dir=onnx_export_dir(settings.vector_dir, settings.rerank_model or ""),
+    )
+    pipeline = RagPipeline(
+        retriever=retriever,
+        llm=llm,
+        reranker=reranker,
+        rerank_k=settings.rerank_k or settings.top_k,
+        candidate_cache=stage_cache(settings.candidate_cache_size),
+        answer_cache=stage_cache(settings.answer_cache_size),
+        filter_extraction=settings.filter_extraction,
+        prompt_token_budget=settings.prompt_token_budget,
+        token_counter=get_token_counter(settings.llm_model),
+        rerank_pair_ms=settings.rerank_pair_ms,
+    )
+    if not settings.rerank_pair_ms:
+        # Otherwise the first budgeted request, on a cold model, would rerank at full depth.
+        pipeline.warm_up_reranker()
+    return pipeline
@@ -1,3 +1,3 @@
-from .text import batch_chunk_text, chunk_text, clean_html, normalize_whitespace
+from .text import batch_chunk_text, chunk_text, clean_html, normalize_whitespace, publication_day
 
-__all__ = ["batch_chunk_text", "chunk_text", "clean_html", "normalize_whitespace"]
+__all__ = ["batch_chunk_text", "chunk_text", "clean_html", "normalize_whitespace", "publication_day"]
@@ -1,17 +1,59 @@
 from __future__ import annotations
 
+import html
 import re
-from typing import Iterable, List
+from datetime import date
+from html.entities import name2codepoint
+from typing import Iterable, List, Optional
 
 from bs4 import BeautifulSoup
 
 
 _WHITESPACE_RE = re.compile(r"\s+")
+_TAG_RE = re.compile(
+    r"""</?[A-Za-z][^\s/>]*(?:\s+(?:[^\s"'>/=]+(?:\s*=\s*(?:"[^"]*"|'[^']*'|[^\s"'>]+))?|/))*\s*/?>"""
+)
+_HARD_HTML_RE = re.compile(r"<\s*(?:script|style)\b|<!--|<!\[CDATA\[", re.IGNORECASE)
+_NAMED_ENTITY_RE = re.compile(r"&([A-Za-z][A-Za-z0-9]*);")
+_ENTITY_RE = re.compile(r"&(?:[A-Za-z][A-Za-z0-9]*;|#[0-9]+;|#[xX][0-9A-Fa-f]+;)")
+_BARE_AMPERSAND_RE = re.compile(r"&[A-Za-z#]")
+_SAFE_ENTITIES = frozenset(name2codepoint) | {"apos"}
+
+
+def _fast_clean_html(raw_html: str) -> Optional[str]:
+    """Clean plain text or simple HTML without building a parse tree.
+
+    Only handles input whose result is known to match BeautifulSoup: every
+    `<` must open a well-formed tag, there must be no script/style/comment
+    blocks, and every `&` must start a standard, terminated entity.
+
+    Args:
+        raw_html: Raw HTML string.
+    Returns:
+        Cleaned text, or None when the input needs the full parser.
+    """
+    if "<" not in raw_html and "&" not in raw_html:
+        return normalize_whitespace(raw_html)
+    if _HARD_HTML_RE.search(raw_html):
+        return None
+    text = _TAG_RE.sub(" ", raw_html)
+    if "<" in text:
+        return None
+    if "&" in text:
+        if any(name not in _SAFE_ENTITIES for name in _NAMED_ENTITY_RE.findall(text)):
+            return None
+        if _BARE_AMPERSAND_RE.search(_ENTITY_RE.sub("", text)):
+            return None
+        text = html.unescape(text)
+    return normalize_whitespace(text)
 
 
 def clean_html(raw_html: str) -> str:
     """Strip HTML markup and normalize whitespace.
 
+    Plain text and simple markup take a regex fast path; anything else is
+    parsed with BeautifulSoup.
+
     Args:
         raw_html: Raw HTML string.
     Returns:
@@ -19,6 +61,9 @@ def clean_html(raw_html: str) -> str:
     """
     if not raw_html:
         return ""
+    fast = _fast_clean_html(raw_html)
+    if fast is not None:
+        return fast
     soup = BeautifulSoup(raw_html, "html.parser")
     text = soup.get_text(" ")
     return normalize_whitespace(text)
@@ -35,6 +80,20 @@ def normalize_whitespace(text: str) -> str:
     return _WHITESPACE_RE.sub(" ", text).strip()
 
 
+def publication_day(value: str) -> Optional[int]:
+    """Parse the date part of an ISO timestamp into a day number.
+
+    Args:
+        value: Timestamp such as "2024-01-15T00:00:00Z".
+    Returns:
+        Days since 1970-01-01, or None if the value is not an ISO date.
+    """
+    try:
+        return (date.fromisoformat(value.strip()[:10]) - date(1970, 1, 1)).days
+    except ValueError:
+        return None
+
+
 def chunk_text(text: str, max_chars: int = 1200, overlap: int = 200) -> List[str]:
     """Split text into overlapping character chunks.
 
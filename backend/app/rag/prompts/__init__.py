@@ -1,3 +1,4 @@
 from .builder import build_prompt
+from .tokens import TokenCounter, get_token_counter
 
-__all__ = ["build_prompt"]
+__all__ = ["TokenCounter", "build_prompt", "get_token_counter"]
@@ -1,32 +1,28 @@
 from __future__ import annotations
 
-from typing import List
+import re
+from typing import Dict, List, Optional, Tuple
 
+from app.rag.prompts.tokens import TokenCounter, get_token_counter
 from app.rag.retrieval import RetrievedChunk
 
 
-def build_prompt(query: str, chunks: List[RetrievedChunk]) -> str:
-    """Build the LLM prompt from a query and retrieved chunks.
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+# Shortest suffix/prefix match treated as chunking overlap rather than coincidence.
+_MIN_OVERLAP_CHARS = 20
+# Chunks whose allocation leaves fewer body tokens than this are dropped instead of trimmed.
+_MIN_BODY_TOKENS = 16
+
+
+def _render(query: str, context: str) -> str:
+    """Fill the prompt template.
 
     Args:
         query: User query string.
-        chunks: Retrieved chunks to include as context.
+        context: Formatted context blocks.
     Returns:
-        A formatted prompt string for the LLM.
+        The prompt string.
     """
-    context_blocks = []
-    for idx, chunk in enumerate(chunks, start=1):
-        meta = chunk.metadata
-        header = (
-            f"[{idx}] {meta.get('job_title', 'Unknown Role')}"
-            f" at {meta.get('company', 'Unknown Company')}"
-            f" | {meta.get('location', 'N/A')}"
-            f" | Level: {meta.get('level', 'N/A')}"
-        )
-        context_blocks.append(f"{header}\n{chunk.text}")
-
-    context = "\n\n".join(context_blocks) if context_blocks else "No context found."
-
     return (
         "You are an expert job assistant. Use ONLY the provided context. "
         "Do not invent companies, roles, or locations. If the context is insufficient, say so.\n\n"
@@ -39,3 +35,197 @@ def build_prompt(query: str, chunks: List[RetrievedChunk]) -> str:
         "- <Job Title> | <Company> | <Location> | <1-sentence reason>\n"
         "If there are no relevant jobs in context, return SUMMARY and then JOBS: with no bullets."
     )
+
+
+def _header(idx: int, chunk: RetrievedChunk) -> str:
+    """Format the header line of a context block.
+
+    Args:
+        idx: 1-based position of the block.
+        chunk: Chunk whose metadata is shown.
+    Returns:
+        The header line.
+    """
+    meta = chunk.metadata
+    return (
+        f"[{idx}] {meta.get('job_title', 'Unknown Role')}"
+        f" at {meta.get('company', 'Unknown Company')}"
+        f" | {meta.get('location', 'N/A')}"
+        f" | Level: {meta.get('level', 'N/A')}"
+    )
+
+
+def _overlap(left: str, right: str) -> int:
+    """Length of the longest suffix of `left` that is a prefix of `right`.
+
+    Args:
+        left: Earlier chunk of a description.
+        right: The following chunk.
+    Returns:
+        The overlap in characters, or 0 if shorter than `_MIN_OVERLAP_CHARS`.
+    """
+    probe = right[:_MIN_OVERLAP_CHARS]
+    if len(probe) < _MIN_OVERLAP_CHARS:
+        return 0
+    start = left.find(probe)
+    while start != -1:
+        if right.startswith(left[start:]):
+            return len(left) - start
+        start = left.find(probe, start + 1)
+    return 0
+
+
+def _drop_overlaps(chunks: List[RetrievedChunk]) -> List[str]:
+    """Remove text repeated between adjacent chunks of the same job.
+
+    Chunk IDs are `"{job_id}-{idx}"` and consecutive chunks share an overlap
+    region; when both are in context, the lower-ranked one loses it.
+
+    Args:
+        chunks: Chunks in rank order.
+    Returns:
+        Chunk texts, aligned with `chunks`.
+    """
+    ranks: Dict[Tuple[str, int], int] = {}
+    for rank, chunk in enumerate(chunks):
+        job_id, _, idx = chunk.id.rpartition("-")
+        if idx.isdigit():
+            ranks[(job_id, int(idx))] = rank
+    texts = [chunk.text for chunk in chunks]
+    for (job_id, idx), rank in ranks.items():
+        following = ranks.get((job_id, idx + 1))
+        if following is None:
+            continue
+        shared = _overlap(chunks[rank].text, chunks[following].text)
+        if not shared:
+            continue
+        if following > rank:
+            texts[following] = texts[following][shared:].lstrip()
+        else:
+            texts[rank] = texts[rank][: len(texts[rank]) - shared].rstrip()
+    return texts
+
+
+def _allocate(needs: List[int], budget: int) -> List[int]:
+    """Split a token budget across chunks, favouring higher ranks.
+
+    Each chunk is entitled to a share proportional to `1 / rank`; chunks
+    needing less than their share get what they need and the rest is
+    re-split among the others (weighted max-min fairness).
+
+    Args:
+        needs: Tokens each chunk would take in full, in rank order.
+        budget: Tokens available for all chunks.
+    Returns:
+        Tokens allotted to each chunk.
+    """
+    weights = [1.0 / rank for rank in range(1, len(needs) + 1)]
+    allotted = [0] * len(needs)
+    active = list(range(len(needs)))
+    remaining = max(budget, 0)
+    while active:
+        total = sum(weights[i] for i in active)
+        satisfied = [i for i in active if needs[i] <= remaining * weights[i] / total]
+        if not satisfied:
+            for i in active:
+                allotted[i] = int(remaining * weights[i] / total)
+            break
+        for i in satisfied:
+            allotted[i] = needs[i]
+            remaining -= needs[i]
+        active = [i for i in active if i not in satisfied]
+    return allotted
+
+
+def _fit(text: str, budget: int, counter: TokenCounter) -> str:
+    """Trim text to a token budget, cutting at sentence boundaries.
+
+    Falls back to a word boundary when not even the first sentence fits.
+
+    Args:
+        text: Text to trim.
+        budget: Maximum tokens.
+        counter: Token counter.
+    Returns:
+        The longest leading run of whole sentences within the budget.
+    """
+    sentences = _SENTENCE_RE.split(text)
+    kept: List[str] = []
+    used = 0
+    for sentence in sentences:
+        cost = counter.count(sentence)
+        if used + cost > budget:
+            break
+        kept.append(sentence)
+        used += cost
+    if kept:
+        return " ".join(kept)
+    words = sentences[0].split(" ")
+    lo, hi = 0, len(words)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if counter.count(" ".join(words[:mid])) <= budget:
+            lo = mid
+        else:
+            hi = mid - 1
+    return " ".join(words[:lo])
+
+
+def build_prompt(
+    query: str,
+    chunks: List[RetrievedChunk],
+    max_tokens: Optional[int] = None,
+    counter: Optional[TokenCounter] = None,
+    usage: Optional[Dict[str, int]] = None,
+) -> str:
+    """Build the LLM prompt from a query and retrieved chunks.
+
+    Overlap shared by adjacent chunks of one job is included once. With
+    `max_tokens`, the context gets what the template and query leave, split
+    across chunks by rank; lower-ranked chunks are trimmed at sentence
+    boundaries or dropped.
+
+    Args:
+        query: User query string.
+        chunks: Retrieved chunks to include as context, best first.
+        max_tokens: Optional token budget for the whole prompt.
+        counter: Token counter; defaults to the shared default-encoding counter.
+        usage: Optional dict receiving the prompt's token count ("prompt_tokens").
+    Returns:
+        A formatted prompt string for the LLM.
+    """
+    texts = _drop_overlaps(chunks)
+    headers = [_header(idx, chunk) for idx, chunk in enumerate(chunks, start=1)]
+    if max_tokens is not None or usage is not None:
+        counter = counter or get_token_counter()
+
+    if max_tokens is None:
+        context_blocks = [f"{header}\n{text}" for header, text in zip(headers, texts)]
+    else:
+        # Block separators and headers are charged to their chunk.
+        header_costs = [counter.count(f"{header}\n") + 1 for header in headers]
+        text_costs = [counter.count(text) for text in texts]
+        budget = max_tokens - counter.count(_render(query, ""))
+        allotted = _allocate([h + t for h, t in zip(header_costs, text_costs)], budget)
+        context_blocks = []
+        spare = 0
+        for chunk, text, header_cost, text_cost, tokens in zip(chunks, texts, header_costs, text_costs, allotted):
+            # Tokens left unused by trimmed or dropped chunks pass down to the next ones.
+            tokens += spare
+            spare = tokens
+            if tokens - header_cost < min(text_cost, _MIN_BODY_TOKENS):
+                continue
+            if tokens < header_cost + text_cost:
+                text = _fit(text, tokens - header_cost, counter)
+                text_cost = counter.count(text)
+            if not text:
+                continue
+            spare = tokens - header_cost - text_cost
+            # Renumber so kept blocks stay consecutive.
+            context_blocks.append(f"{_header(len(context_blocks) + 1, chunk)}\n{text}")
+
+    context = "\n\n".join(context_blocks) if context_blocks else "No context found."
+    prompt = _render(query, context)
+    if usage is not None:
+        usage["prompt_tokens"] = counter.count(prompt)
+    return prompt
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import logging
+from functools import lru_cache
+from typing import Any, Optional
+
+
+logger = logging.getLogger(__name__)
+
+# Average characters per token of English text under GPT-style BPE vocabularies.
+_CHARS_PER_TOKEN = 4
+_DEFAULT_ENCODING = "cl100k_base"
+
+
+class TokenCounter:
+    """Counts prompt tokens with tiktoken, or estimates them without it.
+
+    The encoding follows the LLM model name, falling back to `cl100k_base`
+    for unknown or unspecified models. Without the `tokens` extra
+    (`tiktoken`), counts are estimated at four characters per token, which
+    is close for English text but not exact.
+    """
+
+    def __init__(self, model: Optional[str] = None) -> None:
+        """Load the encoding for a model.
+
+        Args:
+            model: LLM model name, e.g. "gpt-4o-mini"; None uses the default encoding.
+        """
+        self.model = model
+        self._encoding: Optional[Any] = None
+        try:
+            import tiktoken
+        except ImportError:
+            logger.info("tiktoken not installed; estimating prompt tokens at %d chars/token", _CHARS_PER_TOKEN)
+            return
+        try:
+            self._encoding = tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding(_DEFAULT_ENCODING)
+        except KeyError:
+            self._encoding = tiktoken.get_encoding(_DEFAULT_ENCODING)
+
+    def count(self, text: str) -> int:
+        """Count the tokens of a text.
+
+        Args:
+            text: Text to count.
+        Returns:
+            The token count.
+        """
+        if not text:
+            return 0
+        if self._encoding is None:
+            return -(-len(text) // _CHARS_PER_TOKEN)
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+
+@lru_cache
+def get_token_counter(model: Optional[str] = None) -> TokenCounter:
+    """Create and cache the token counter for a model.
+
+    Args:
+        model: LLM model name; None uses the default encoding.
+    Returns:
+        A shared TokenCounter.
+    """
+    return TokenCounter(model)
@@ -1,13 +1,21 @@
+from .bm25 import BM25Index, tokenize
+from .filters import MetadataFilter
+from .local_store import LocalVectorStore
 from .reranker import CrossEncoderReranker, build_reranker
-from .retriever import BM25Index, RetrievedChunk, Retriever, tokenize
-from .vector_store import PineconeVectorStore
+from .retriever import Retriever
+from .types import RetrievedChunk
+from .vector_store import PineconeVectorStore, VectorStore, build_vector_store
 
 __all__ = [
     "BM25Index",
     "CrossEncoderReranker",
+    "LocalVectorStore",
+    "MetadataFilter",
     "PineconeVectorStore",
     "RetrievedChunk",
     "Retriever",
+    "VectorStore",
     "build_reranker",
+    "build_vector_store",
     "tokenize",
 ]
@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import os
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+_CENTROIDS_FILE = "ivf_centroids.npy"
+_OFFSETS_FILE = "ivf_offsets.npy"
+_ROWS_FILE = "ivf_rows.npy"
+_ASSIGN_BLOCK_ROWS = 8192
+
+
+def default_nlist(n_vectors: int) -> int:
+    """Pick a list count for an IVF index of the given size.
+
+    Args:
+        n_vectors: Number of indexed vectors.
+    Returns:
+        Roughly 4 * sqrt(n), clamped to [1, n].
+    """
+    if n_vectors <= 0:
+        return 1
+    return int(max(1, min(n_vectors, round(4 * np.sqrt(n_vectors)))))
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Assign each vector to its most similar centroid.
+
+    Args:
+        vectors: Matrix of unit-length vectors (float16 or float32).
+        centroids: Matrix of unit-length centroids.
+    Returns:
+        An int32 array of centroid indices, one per vector.
+    """
+    labels = np.empty(vectors.shape[0], dtype=np.int32)
+    for start in range(0, vectors.shape[0], _ASSIGN_BLOCK_ROWS):
+        block = np.asarray(vectors[start : start + _ASSIGN_BLOCK_ROWS], dtype=np.float32)
+        labels[start : start + block.shape[0]] = np.argmax(block @ centroids.T, axis=1)
+    return labels
+
+
+def _spherical_kmeans(sample: np.ndarray, nlist: int, n_iter: int, seed: int) -> np.ndarray:
+    """Train unit-length centroids with spherical k-means.
+
+    Args:
+        sample: Training vectors as a float32 matrix.
+        nlist: Number of centroids.
+        n_iter: Number of Lloyd iterations.
+        seed: Random seed for initialization.
+    Returns:
+        A float32 matrix of shape (nlist, d) with unit-length rows.
+    """
+    rng = np.random.default_rng(seed)
+    centroids = sample[rng.choice(sample.shape[0], size=nlist, replace=False)].copy()
+    for _ in range(n_iter):
+        labels = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, sample)
+        empty = np.flatnonzero(np.bincount(labels, minlength=nlist) == 0)
+        if empty.size:
+            sums[empty] = sample[rng.choice(sample.shape[0], size=empty.size, replace=False)]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids = sums / norms
+    return centroids.astype(np.float32)
+
+
+class IVFIndex:
+    """Inverted-file ANN index over a row-aligned vector matrix.
+
+    A spherical k-means coarse quantizer partitions rows into `nlist` lists
+    stored CSR-style (`offsets`, `rows`). A query scores the centroids, then
+    exactly rescans only the rows of the `nprobe` closest lists.
+    """
+
+    def __init__(self, centroids: np.ndarray, offsets: np.ndarray, rows: np.ndarray) -> None:
+        """Wrap trained IVF arrays.
+
+        Args:
+            centroids: Unit-length centroid matrix of shape (nlist, d).
+            offsets: List boundaries into `rows`, length nlist + 1.
+            rows: Matrix row indices grouped by list.
+        """
+        self.centroids = centroids
+        self.offsets = offsets
+        self.rows = rows
+
+    @property
+    def nlist(self) -> int:
+        """Number of inverted lists."""
+        return int(self.centroids.shape[0])
+
+    @property
+    def size(self) -> int:
+        """Number of indexed rows."""
+        return int(self.rows.shape[0])
+
+    @classmethod
+    def train(
+        cls,
+        vectors: np.ndarray,
+        nlist: int = 0,
+        n_iter: int = 20,
+        max_train_points: int = 100_000,
+        seed: int = 0,
+    ) -> "IVFIndex":
+        """Train an IVF index on a matrix of unit-length vectors.
+
+        Args:
+            vectors: Matrix to index (rows must be L2-normalized).
+            nlist: Number of lists; 0 picks `default_nlist`.
+            n_iter: k-means iterations.
+            max_train_points: Upper bound on the k-means training sample.
+            seed: Random seed for sampling and initialization.
+        Returns:
+            A trained IVFIndex covering every row of `vectors`.
+        """
+        n_vectors = int(vectors.shape[0])
+        nlist = min(nlist or default_nlist(n_vectors), max(n_vectors, 1))
+        rng = np.random.default_rng(seed)
+        if n_vectors > max_train_points:
+            sample_rows = np.sort(rng.choice(n_vectors, size=max_train_points, replace=False))
+            sample = np.asarray(vectors[sample_rows], dtype=np.float32)
+        else:
+            sample = np.asarray(vectors, dtype=np.float32)
+        centroids = _spherical_kmeans(sample, nlist, n_iter, seed)
+        return cls.from_labels(centroids, _assign(vectors, centroids))
+
+    @classmethod
+    def from_labels(cls, centroids: np.ndarray, labels: np.ndarray) -> "IVFIndex":
+        """Group rows into inverted lists from their centroid assignments.
+
+        Args:
+            centroids: Unit-length centroid matrix of shape (nlist, d).
+            labels: Centroid index of each row.
+        Returns:
+            An IVFIndex covering every row of `labels`.
+        """
+        nlist = int(centroids.shape[0])
+        rows = np.argsort(labels, kind="stable").astype(np.int64)
+        offsets = np.zeros(nlist + 1, dtype=np.int64)
+        np.cumsum(np.bincount(labels, minlength=nlist), out=offsets[1:])
+        return cls(centroids, offsets, rows)
+
+    def labels(self) -> np.ndarray:
+        """Return the list each indexed row belongs to.
+
+        Returns:
+            An int32 array with one centroid index per row.
+        """
+        labels = np.empty(self.size, dtype=np.int32)
+        labels[np.asarray(self.rows)] = np.repeat(np.arange(self.nlist, dtype=np.int32), np.diff(self.offsets))
+        return labels
+
+    def reassign(self, vectors: np.ndarray, source_rows: np.ndarray) -> "IVFIndex":
+        """Index an edited matrix with these centroids, without retraining.
+
+        Rows carried over from the indexed matrix keep their list; only new
+        or overwritten rows are assigned to their nearest centroid.
+
+        Args:
+            vectors: The edited matrix (rows must be L2-normalized).
+            source_rows: For each row of `vectors`, its row in the matrix this
+                index covers, or -1 if it is new or was overwritten.
+        Returns:
+            An IVFIndex covering every row of `vectors`.
+        """
+        labels = np.empty(source_rows.shape[0], dtype=np.int32)
+        reused = source_rows >= 0
+        labels[reused] = self.labels()[source_rows[reused]]
+        fresh = np.flatnonzero(~reused)
+        if fresh.size:
+            labels[fresh] = _assign(np.asarray(vectors[fresh]), self.centroids)
+        return IVFIndex.from_labels(self.centroids, labels)
+
+    def save(self, path: str) -> None:
+        """Persist the IVF arrays under `path`.
+
+        Args:
+            path: Directory to write into.
+        """
+        os.makedirs(path, exist_ok=True)
+        for name, array in (
+            (_CENTROIDS_FILE, self.centroids),
+            (_OFFSETS_FILE, self.offsets),
+            (_ROWS_FILE, self.rows),
+        ):
+            target = os.path.join(path, name)
+            with open(f"{target}.tmp", "wb") as f:
+                np.save(f, array)
+            os.replace(f"{target}.tmp", target)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["IVFIndex"]:
+        """Memory-map IVF arrays from `path` when they exist.
+
+        Args:
+            path: Directory holding the IVF files.
+        Returns:
+            An IVFIndex, or None if no index has been saved.
+        """
+        files = [os.path.join(path, name) for name in (_CENTROIDS_FILE, _OFFSETS_FILE, _ROWS_FILE)]
+        if not all(os.path.exists(p) for p in files):
+            return None
+        centroids = np.load(files[0])
+        offsets = np.load(files[1])
+        rows = np.load(files[2], mmap_mode="r")
+        return cls(centroids, offsets, rows)
+
+    @staticmethod
+    def remove(path: str) -> None:
+        """Delete saved IVF files under `path`, if any.
+
+        Args:
+            path: Directory holding the IVF files.
+        """
+        for name in (_CENTROIDS_FILE, _OFFSETS_FILE, _ROWS_FILE):
+            target = os.path.join(path, name)
+            if os.path.exists(target):
+                os.remove(target)
+
+    def candidates(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        """Return the matrix rows in the `nprobe` lists closest to a query.
+
+        Args:
+            query: Unit-length query vector.
+            nprobe: Number of lists to visit.
+        Returns:
+            An int64 array of candidate row indices.
+        """
+        nprobe = max(1, min(nprobe, self.nlist))
+        centroid_scores = self.centroids @ query
+        if nprobe < self.nlist:
+            probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        else:
+            probe = np.arange(self.nlist)
+        parts = [self.rows[self.offsets[l] : self.offsets[l + 1]] for l in probe]
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(parts))
+
+    def search(
+        self,
+        matrix: np.ndarray,
+        queries: np.ndarray,
+        k: int,
+        nprobe: int,
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Search the index, rescoring candidates exactly against `matrix`.
+
+        Args:
+            matrix: The row-aligned vector matrix the index was trained on.
+            queries: Unit-length query matrix of shape (m, d).
+            k: Number of neighbours per query.
+            nprobe: Number of lists to visit per query.
+        Returns:
+            Per query, a tuple of (row indices, scores) sorted by descending score.
+        """
+        results: List[Tuple[np.ndarray, np.ndarray]] = []
+        for query in queries:
+            rows = self.candidates(query, nprobe)
+            if rows.size == 0:
+                results.append((rows, np.empty(0, dtype=np.float32)))
+                continue
+            scores = np.asarray(matrix[rows], dtype=np.float32) @ query
+            top_n = min(k, rows.size)
+            if top_n < rows.size:
+                top = np.argpartition(-scores, top_n - 1)[:top_n]
+            else:
+                top = np.arange(rows.size)
+            top = top[np.argsort(-scores[top], kind="stable")]
+            results.append((rows[top], scores[top]))
+        return results
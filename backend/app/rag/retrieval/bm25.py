@@ -0,0 +1,721 @@
+from __future__ import annotations
+
+import json
+import os
+import pickle
+import re
+from array import array
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.rag.retrieval.filters import MetadataFilter, MetadataIndex
+from app.rag.retrieval.types import RetrievedChunk
+
+
+_TOKEN_RE = re.compile(r"\b\w+\b")
+_PARAMS_FILE = "params.json"
+
+
+def tokenize(text: str) -> List[str]:
+    """Tokenize text into lowercase word tokens.
+
+    Args:
+        text: Input text.
+    Returns:
+        A list of word tokens.
+    """
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _save_array(path: str, array: np.ndarray) -> None:
+    """Write a NumPy array via a temporary file and rename.
+
+    Args:
+        path: Destination `.npy` path.
+        array: Array to persist.
+    """
+    with open(f"{path}.tmp", "wb") as f:
+        np.save(f, array)
+    os.replace(f"{path}.tmp", path)
+
+
+class StringTable:
+    """Read-only list of strings stored as one UTF-8 blob plus offsets.
+
+    Saved tables are memory-mapped, so loading is constant time and pages
+    are shared between worker processes; strings are decoded on access.
+    """
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray) -> None:
+        """Wrap a blob and its offsets.
+
+        Args:
+            blob: uint8 array with the concatenated UTF-8 strings.
+            offsets: int64 array of length n + 1 with string boundaries.
+        """
+        self._blob = blob
+        self._offsets = offsets
+
+    @classmethod
+    def from_strings(cls, values: Iterable[str]) -> "StringTable":
+        """Encode strings into a new table.
+
+        Args:
+            values: Strings to store, in order.
+        Returns:
+            An in-memory StringTable.
+        """
+        encoded = [value.encode("utf-8") for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(item) for item in encoded], out=offsets[1:])
+        blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(blob, offsets)
+
+    def save(self, path: str, name: str) -> None:
+        """Persist the table as `<name>.bin` and `<name>_offsets.npy`.
+
+        Args:
+            path: Target directory.
+            name: File name stem.
+        """
+        blob_path = os.path.join(path, f"{name}.bin")
+        with open(f"{blob_path}.tmp", "wb") as f:
+            f.write(self._blob.tobytes())
+        os.replace(f"{blob_path}.tmp", blob_path)
+        _save_array(os.path.join(path, f"{name}_offsets.npy"), self._offsets)
+
+    @classmethod
+    def load(cls, path: str, name: str) -> "StringTable":
+        """Memory-map a saved table.
+
+        Args:
+            path: Directory holding the table.
+            name: File name stem.
+        Returns:
+            A memory-mapped StringTable.
+        """
+        offsets = np.load(os.path.join(path, f"{name}_offsets.npy"), mmap_mode="r")
+        blob_path = os.path.join(path, f"{name}.bin")
+        if os.path.getsize(blob_path) == 0:
+            blob = np.empty(0, dtype=np.uint8)
+        else:
+            blob = np.memmap(blob_path, dtype=np.uint8, mode="r")
+        return cls(blob, offsets)
+
+    def select(self, mask: np.ndarray) -> "StringTable":
+        """Copy the entries where `mask` is set into a new in-memory table.
+
+        Args:
+            mask: Boolean array with one flag per entry.
+        Returns:
+            A StringTable with the selected entries, in order.
+        """
+        lengths = np.diff(np.asarray(self._offsets))
+        blob = np.asarray(self._blob)[np.repeat(mask, lengths)]
+        offsets = np.zeros(int(mask.sum()) + 1, dtype=np.int64)
+        np.cumsum(lengths[mask], out=offsets[1:])
+        return StringTable(blob, offsets)
+
+    @classmethod
+    def concat(cls, first: "StringTable", second: "StringTable") -> "StringTable":
+        """Append one table to another.
+
+        Args:
+            first: Leading entries.
+            second: Trailing entries.
+        Returns:
+            An in-memory StringTable with the entries of both.
+        """
+        blob = np.concatenate([np.asarray(first._blob), np.asarray(second._blob)])
+        offsets = np.concatenate([np.asarray(first._offsets), np.asarray(second._offsets)[1:] + first._offsets[-1]])
+        return cls(blob, offsets.astype(np.int64))
+
+    def raw(self, idx: int) -> bytes:
+        """Return the encoded bytes of one entry.
+
+        Args:
+            idx: Entry index.
+        Returns:
+            The UTF-8 bytes.
+        """
+        return self._blob[int(self._offsets[idx]) : int(self._offsets[idx + 1])].tobytes()
+
+    def __getitem__(self, idx: int) -> str:
+        return self.raw(idx).decode("utf-8")
+
+    def __len__(self) -> int:
+        return int(self._offsets.shape[0]) - 1
+
+
+class BM25Index:
+    """BM25 index wrapper for lexical retrieval.
+
+    Scores match `rank_bm25.BM25Okapi`, but the index is a precomputed
+    inverted index: a sorted vocabulary, CSR postings (`indptr`, document
+    IDs, term frequencies), document lengths and IDF. `save` writes these
+    as flat files that `load` memory-maps, so startup does not re-tokenize
+    the corpus and workers share the pages. `merge` folds a segment built
+    from new documents into an existing index without re-tokenizing it.
+
+    Queries only touch the posting lists of their terms, so latency scales
+    with posting-list sizes rather than corpus size. Each term also stores
+    its maximum possible score contribution, which `search` uses for
+    MaxScore pruning. Metadata filters are resolved against a saved
+    `MetadataIndex` into a document mask applied to the postings.
+    """
+
+    def __init__(
+        self,
+        vocab: StringTable,
+        indptr: np.ndarray,
+        postings: np.ndarray,
+        term_freqs: np.ndarray,
+        doc_len: np.ndarray,
+        idf: np.ndarray,
+        ids: StringTable,
+        texts: StringTable,
+        metadatas: StringTable,
+        k1: float = 1.5,
+        b: float = 0.75,
+        avgdl: float = 0.0,
+        max_impact: Optional[np.ndarray] = None,
+        metadata_index: Optional[MetadataIndex] = None,
+    ) -> None:
+        """Wrap precomputed BM25 arrays.
+
+        Args:
+            vocab: Terms sorted by their UTF-8 bytes.
+            indptr: Posting boundaries per term (length V + 1).
+            postings: Document indices, grouped by term.
+            term_freqs: Term frequencies aligned with `postings`.
+            doc_len: Token count per document.
+            idf: IDF per term, with BM25Okapi's epsilon floor applied.
+            ids: Chunk IDs per document.
+            texts: Chunk texts per document.
+            metadatas: JSON-encoded metadata per document.
+            k1: BM25 term-frequency saturation.
+            b: BM25 length normalization.
+            avgdl: Average document length.
+            max_impact: Per-term upper bound on a document's score contribution;
+                computed from the postings when omitted.
+            metadata_index: Filterable metadata postings; built from
+                `metadatas` on first use when omitted.
+        """
+        self.vocab = vocab
+        self.indptr = indptr
+        self.postings = postings
+        self.term_freqs = term_freqs
+        self.doc_len = doc_len
+        self.idf = idf
+        self.ids = ids
+        self.texts = texts
+        self._metadatas = metadatas
+        self.k1 = k1
+        self.b = b
+        self.avgdl = avgdl
+        if len(doc_len) and avgdl > 0:
+            self._length_norm = (k1 * (1 - b + b * np.asarray(doc_len, dtype=np.float64) / avgdl)).astype(np.float32)
+        else:
+            self._length_norm = np.zeros(len(doc_len), dtype=np.float32)
+        self.max_impact = max_impact if max_impact is not None else self._compute_max_impact()
+        self._metadata_index = metadata_index
+
+    def _compute_max_impact(self) -> np.ndarray:
+        """Compute each term's largest per-document score contribution.
+
+        Returns:
+            A float32 array with one upper bound per term.
+        """
+        n_terms = len(self.idf)
+        if n_terms == 0:
+            return np.empty(0, dtype=np.float32)
+        list_sizes = np.diff(np.asarray(self.indptr))
+        term_of = np.repeat(np.arange(n_terms), list_sizes)
+        contributions = self._contribution(
+            np.asarray(self.idf)[term_of],
+            np.asarray(self.term_freqs),
+            np.asarray(self.postings),
+        )
+        # Every vocabulary term has at least one posting, so no reduceat segment is empty.
+        return np.maximum.reduceat(contributions, np.asarray(self.indptr[:-1])).astype(np.float32)
+
+    def _contribution(self, idf: Any, tfs: np.ndarray, docs: np.ndarray) -> np.ndarray:
+        """Return BM25 term contributions for postings.
+
+        Args:
+            idf: IDF of the term (scalar or one per posting).
+            tfs: Term frequencies.
+            docs: Document indices aligned with `tfs`.
+        Returns:
+            A float64 array of score contributions.
+        """
+        tfs = np.asarray(tfs, dtype=np.float64)
+        return idf * (tfs * (self.k1 + 1) / (tfs + self._length_norm[docs]))
+
+    @classmethod
+    def from_documents(
+        cls,
+        ids: Sequence[str],
+        texts: Sequence[str],
+        metadatas: Sequence[Dict[str, Any]],
+        k1: float = 1.5,
+        b: float = 0.75,
+        epsilon: float = 0.25,
+    ) -> "BM25Index":
+        """Tokenize documents and build the inverted index in memory.
+
+        Args:
+            ids: Document IDs.
+            texts: Document texts.
+            metadatas: Document metadata entries.
+            k1: BM25 term-frequency saturation.
+            b: BM25 length normalization.
+            epsilon: Floor for negative IDF, as a fraction of the average IDF.
+        Returns:
+            A BM25Index instance.
+        """
+        return cls.from_records(zip(ids, texts, metadatas), k1=k1, b=b, epsilon=epsilon)
+
+    @classmethod
+    def from_records(
+        cls,
+        records: Iterable[Tuple[str, str, Dict[str, Any]]],
+        k1: float = 1.5,
+        b: float = 0.75,
+        epsilon: float = 0.25,
+    ) -> "BM25Index":
+        """Tokenize a stream of documents and build the inverted index in memory.
+
+        Records are consumed one at a time into packed arrays, so memory
+        grows with the postings and encoded text rather than with Python
+        objects per document.
+
+        Args:
+            records: (id, text, metadata) tuples.
+            k1: BM25 term-frequency saturation.
+            b: BM25 length normalization.
+            epsilon: Floor for negative IDF, as a fraction of the average IDF.
+        Returns:
+            A BM25Index instance.
+        """
+        term_ids: Dict[str, int] = {}
+        post_terms = array("q")
+        post_docs = array("i")
+        post_tfs = array("f")
+        doc_len = array("f")
+        strings = {name: (bytearray(), array("q", [0])) for name in ("ids", "texts", "metadatas")}
+        for doc, (chunk_id, text, meta) in enumerate(records):
+            counts = Counter(tokenize(text))
+            doc_len.append(sum(counts.values()))
+            for term, tf in counts.items():
+                post_terms.append(term_ids.setdefault(term, len(term_ids)))
+                post_docs.append(doc)
+                post_tfs.append(tf)
+            for name, value in (("ids", chunk_id), ("texts", text), ("metadatas", json.dumps(meta))):
+                blob, offsets = strings[name]
+                blob += value.encode("utf-8")
+                offsets.append(len(blob))
+
+        tables = {
+            name: StringTable(np.frombuffer(blob, dtype=np.uint8), np.frombuffer(offsets, dtype=np.int64))
+            for name, (blob, offsets) in strings.items()
+        }
+        return cls._from_postings(
+            list(term_ids),
+            np.frombuffer(post_terms, dtype=np.int64),
+            np.frombuffer(post_docs, dtype=np.int32),
+            np.frombuffer(post_tfs, dtype=np.float32),
+            np.frombuffer(doc_len, dtype=np.float32).copy(),
+            k1=k1,
+            b=b,
+            epsilon=epsilon,
+            **tables,
+        )
+
+    @classmethod
+    def _from_postings(
+        cls,
+        terms: List[str],
+        term_col: np.ndarray,
+        doc_col: np.ndarray,
+        tfs: np.ndarray,
+        doc_len: np.ndarray,
+        ids: StringTable,
+        texts: StringTable,
+        metadatas: StringTable,
+        k1: float,
+        b: float,
+        epsilon: float,
+    ) -> "BM25Index":
+        """Compile unordered (term, document, tf) postings into an index.
+
+        Terms without postings are dropped from the vocabulary.
+
+        Args:
+            terms: Vocabulary, indexed by `term_col` (any order).
+            term_col: Term index of each posting.
+            doc_col: Document index of each posting.
+            tfs: Term frequency of each posting.
+            doc_len: Token count per document.
+            ids: Chunk IDs per document.
+            texts: Chunk texts per document.
+            metadatas: JSON-encoded metadata per document.
+            k1: BM25 term-frequency saturation.
+            b: BM25 length normalization.
+            epsilon: Floor for negative IDF, as a fraction of the average IDF.
+        Returns:
+            A BM25Index instance.
+        """
+        live = np.bincount(term_col, minlength=len(terms)) > 0
+        kept = [term_id for term_id in range(len(terms)) if live[term_id]]
+        kept.sort(key=lambda term_id: terms[term_id].encode("utf-8"))
+        remap = np.full(len(terms), -1, dtype=np.int64)
+        remap[np.asarray(kept, dtype=np.int64)] = np.arange(len(kept))
+        term_col = remap[term_col]
+        order = np.lexsort((doc_col, term_col))
+        doc_freq = np.bincount(term_col, minlength=len(kept))
+        indptr = np.zeros(len(kept) + 1, dtype=np.int64)
+        np.cumsum(doc_freq, out=indptr[1:])
+
+        n_docs = len(doc_len)
+        idf = (np.log(n_docs - doc_freq + 0.5) - np.log(doc_freq + 0.5)) if len(kept) else np.empty(0)
+        if len(kept):
+            idf[idf < 0] = epsilon * idf.mean()
+        avgdl = float(doc_len.sum() / n_docs) if n_docs else 0.0
+
+        return cls(
+            vocab=StringTable.from_strings(terms[term_id] for term_id in kept),
+            indptr=indptr,
+            postings=doc_col[order].astype(np.int32),
+            term_freqs=tfs[order].astype(np.float32),
+            doc_len=doc_len,
+            idf=idf.astype(np.float32),
+            ids=ids,
+            texts=texts,
+            metadatas=metadatas,
+            k1=k1,
+            b=b,
+            avgdl=avgdl,
+        )
+
+    def merge(self, segment: "BM25Index", drop: Iterable[str] = (), epsilon: float = 0.25) -> "BM25Index":
+        """Fold a segment of new documents into this index.
+
+        Documents whose IDs are in `drop` or in the segment are removed, so
+        a segment can replace updated chunks. Postings are remapped rather
+        than re-tokenized; the result scores exactly like `from_documents`
+        over the kept documents followed by the segment's.
+
+        Args:
+            segment: Index built (e.g. with `from_documents`) from the new documents.
+            drop: IDs of documents to remove.
+            epsilon: Floor for negative IDF, as a fraction of the average IDF.
+        Returns:
+            A new in-memory BM25Index.
+        """
+        removed = set(drop)
+        removed.update(segment.ids[doc] for doc in range(len(segment)))
+        keep = np.fromiter((self.ids[doc] not in removed for doc in range(len(self))), dtype=bool, count=len(self))
+        # Kept documents are renumbered in order; the segment's follow them.
+        doc_map = np.cumsum(keep, dtype=np.int64) - 1
+        n_kept = int(keep.sum())
+
+        terms = [self.vocab[term] for term in range(len(self.vocab))]
+        term_ids = {term: term_id for term_id, term in enumerate(terms)}
+        segment_remap = np.empty(len(segment.vocab), dtype=np.int64)
+        for term_id in range(len(segment.vocab)):
+            term = segment.vocab[term_id]
+            if term not in term_ids:
+                term_ids[term] = len(terms)
+                terms.append(term)
+            segment_remap[term_id] = term_ids[term]
+
+        base_docs = np.asarray(self.postings)
+        base_mask = keep[base_docs]
+        base_terms = np.repeat(np.arange(len(self.idf), dtype=np.int64), np.diff(np.asarray(self.indptr)))
+        segment_terms = np.repeat(segment_remap, np.diff(np.asarray(segment.indptr)))
+        return self._from_postings(
+            terms,
+            np.concatenate([base_terms[base_mask], segment_terms]),
+            np.concatenate([doc_map[base_docs[base_mask]], np.asarray(segment.postings, dtype=np.int64) + n_kept]),
+            np.concatenate([np.asarray(self.term_freqs)[base_mask], np.asarray(segment.term_freqs)]),
+            np.concatenate([np.asarray(self.doc_len)[keep], np.asarray(segment.doc_len)]).astype(np.float32),
+            ids=StringTable.concat(self.ids.select(keep), segment.ids),
+            texts=StringTable.concat(self.texts.select(keep), segment.texts),
+            metadatas=StringTable.concat(self._metadatas.select(keep), segment._metadatas),
+            k1=self.k1,
+            b=self.b,
+            epsilon=epsilon,
+        )
+
+    def save(self, path: str) -> None:
+        """Persist the index as memory-mappable files under `path`.
+
+        Args:
+            path: Target directory.
+        """
+        os.makedirs(path, exist_ok=True)
+        for name, array in (
+            ("indptr", self.indptr),
+            ("postings", self.postings),
+            ("term_freqs", self.term_freqs),
+            ("doc_len", self.doc_len),
+            ("idf", self.idf),
+            ("max_impact", self.max_impact),
+        ):
+            _save_array(os.path.join(path, f"{name}.npy"), np.asarray(array))
+        self.vocab.save(path, "vocab")
+        self.ids.save(path, "ids")
+        self.texts.save(path, "texts")
+        self._metadatas.save(path, "metadatas")
+        self._filter_index().save(path)
+        params = {"k1": self.k1, "b": self.b, "avgdl": self.avgdl, "n_docs": len(self.doc_len)}
+        with open(os.path.join(path, f"{_PARAMS_FILE}.tmp"), "w", encoding="utf-8") as f:
+            json.dump(params, f)
+        os.replace(os.path.join(path, f"{_PARAMS_FILE}.tmp"), os.path.join(path, _PARAMS_FILE))
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        """Load a BM25 index from disk.
+
+        Args:
+            path: Directory written by `save`, or a legacy pickled docstore
+                (`bm25.pkl`), which is tokenized on load.
+        Returns:
+            A BM25Index instance.
+        """
+        if os.path.isdir(path):
+            if not os.path.exists(os.path.join(path, _PARAMS_FILE)):
+                raise FileNotFoundError(os.path.join(path, _PARAMS_FILE))
+            with open(os.path.join(path, _PARAMS_FILE), "r", encoding="utf-8") as f:
+                params = json.load(f)
+            arrays = {
+                name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+                for name in ("indptr", "postings", "term_freqs", "doc_len", "idf")
+            }
+            max_impact_path = os.path.join(path, "max_impact.npy")
+            if os.path.exists(max_impact_path):
+                arrays["max_impact"] = np.load(max_impact_path)
+            return cls(
+                vocab=StringTable.load(path, "vocab"),
+                ids=StringTable.load(path, "ids"),
+                texts=StringTable.load(path, "texts"),
+                metadatas=StringTable.load(path, "metadatas"),
+                k1=params["k1"],
+                b=params["b"],
+                avgdl=params["avgdl"],
+                metadata_index=MetadataIndex.load(path, int(params["n_docs"])),
+                **arrays,
+            )
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+        return cls.from_documents(data["ids"], data["texts"], data["metadatas"])
+
+    def __len__(self) -> int:
+        return len(self.doc_len)
+
+    def term_id(self, term: str) -> Optional[int]:
+        """Find a term in the sorted vocabulary by binary search.
+
+        Args:
+            term: Token to look up.
+        Returns:
+            The term index, or None if the term is not in the corpus.
+        """
+        target = term.encode("utf-8")
+        lo, hi = 0, len(self.vocab)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.vocab.raw(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self.vocab) and self.vocab.raw(lo) == target:
+            return lo
+        return None
+
+    def metadata(self, doc: int) -> Dict[str, Any]:
+        """Decode the metadata of one document.
+
+        Args:
+            doc: Document index.
+        Returns:
+            The metadata dict.
+        """
+        return json.loads(self._metadatas[doc])
+
+    def _filter_index(self) -> MetadataIndex:
+        """Return the metadata index, building it from the stored metadata if missing.
+
+        Returns:
+            A MetadataIndex over the documents.
+        """
+        if self._metadata_index is None:
+            self._metadata_index = MetadataIndex.build([self.metadata(doc) for doc in range(len(self))])
+        return self._metadata_index
+
+    def metadata_vocabulary(self) -> Dict[str, List[str]]:
+        """Return the distinct filterable metadata values in the index.
+
+        Returns:
+            Values per filter field.
+        """
+        return self._filter_index().vocabulary()
+
+    def _posting_range(self, term: int) -> Tuple[int, int]:
+        """Return the slice of the postings arrays holding a term's list.
+
+        Args:
+            term: Term index.
+        Returns:
+            A (start, end) pair.
+        """
+        return int(self.indptr[term]), int(self.indptr[term + 1])
+
+    def _query_terms(self, tokens: List[str]) -> Counter:
+        """Map query tokens to term indices, counting repeats.
+
+        Args:
+            tokens: Query tokens.
+        Returns:
+            A Counter of term index to occurrence count (unknown tokens dropped).
+        """
+        counts: Counter = Counter()
+        for token in tokens:
+            term = self.term_id(token)
+            if term is not None:
+                counts[term] += 1
+        return counts
+
+    def get_scores(self, tokens: List[str]) -> np.ndarray:
+        """Score every document for a tokenized query.
+
+        Args:
+            tokens: Query tokens (duplicates count once per occurrence, as in BM25Okapi).
+        Returns:
+            A float array with one score per document.
+        """
+        scores = np.zeros(len(self), dtype=np.float64)
+        for term, count in self._query_terms(tokens).items():
+            start, end = self._posting_range(term)
+            docs = np.asarray(self.postings[start:end])
+            scores[docs] += count * self._contribution(float(self.idf[term]), self.term_freqs[start:end], docs)
+        return scores
+
+    def search(
+        self,
+        tokens: List[str],
+        top_k: int,
+        prune: bool = True,
+        allowed: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Find the top-k documents by visiting only the query terms' postings.
+
+        Terms are processed in decreasing order of their maximum contribution.
+        With `prune`, once the summed bounds of the remaining terms fall below
+        the current k-th best score, no unseen document can reach the top-k
+        (MaxScore), so the remaining lists are only probed for the surviving
+        candidates by binary search instead of being merged in full.
+
+        Args:
+            tokens: Query tokens.
+            top_k: Number of documents to return.
+            prune: Whether to apply MaxScore pruning (results are identical).
+            allowed: Optional boolean mask over documents; others are skipped.
+        Returns:
+            A tuple of (document indices, scores) sorted by descending score.
+        """
+        counts = self._query_terms(tokens)
+        empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64))
+        if not counts or top_k <= 0:
+            return empty
+
+        # Bounds are stored as float32; pad them so rounding can never prune a true top-k document.
+        bounds_by_term = {term: counts[term] * float(self.max_impact[term]) * (1 + 1e-6) for term in counts}
+        terms = sorted(counts, key=bounds_by_term.__getitem__, reverse=True)
+        bounds = np.array([bounds_by_term[term] for term in terms])
+        remaining = np.cumsum(bounds[::-1])[::-1]
+        # Bounds only hold if no contribution is negative (possible when the IDF floor is negative).
+        prune = prune and all(float(self.idf[term]) >= 0 for term in terms)
+
+        cand = np.empty(0, dtype=np.int64)
+        cand_scores = np.empty(0, dtype=np.float64)
+        for i, term in enumerate(terms):
+            if prune and cand.size >= top_k:
+                threshold = np.partition(cand_scores, cand.size - top_k)[cand.size - top_k]
+                if remaining[i] < threshold:
+                    keep = cand_scores + remaining[i] >= threshold
+                    cand, cand_scores = cand[keep], cand_scores[keep]
+                    for rest in terms[i:]:
+                        self._probe(rest, counts[rest], cand, cand_scores)
+                    break
+            start, end = self._posting_range(term)
+            docs = np.asarray(self.postings[start:end], dtype=np.int64)
+            tfs = self.term_freqs[start:end]
+            if allowed is not None:
+                keep = allowed[docs]
+                docs, tfs = docs[keep], np.asarray(tfs)[keep]
+            contributions = counts[term] * self._contribution(float(self.idf[term]), tfs, docs)
+            cand, inverse = np.unique(np.concatenate([cand, docs]), return_inverse=True)
+            cand_scores = np.bincount(inverse, weights=np.concatenate([cand_scores, contributions]))
+
+        n = min(top_k, cand.size)
+        if n == 0:
+            return empty
+        top = np.argpartition(-cand_scores, n - 1)[:n] if n < cand.size else np.arange(cand.size)
+        top = top[np.lexsort((cand[top], -cand_scores[top]))]
+        return cand[top], cand_scores[top]
+
+    def _probe(self, term: int, count: int, cand: np.ndarray, cand_scores: np.ndarray) -> None:
+        """Add a term's contributions to existing candidates only.
+
+        Args:
+            term: Term index.
+            count: Occurrences of the term in the query.
+            cand: Sorted candidate document indices.
+            cand_scores: Candidate scores, updated in place.
+        """
+        start, end = self._posting_range(term)
+        if cand.size == 0 or start == end:
+            return
+        docs = self.postings[start:end]
+        pos = np.searchsorted(docs, cand)
+        inside = pos < (end - start)
+        hit = np.zeros(cand.size, dtype=bool)
+        hit[inside] = np.asarray(docs[pos[inside]]) == cand[inside]
+        if not hit.any():
+            return
+        rows = start + pos[hit]
+        cand_scores[hit] += count * self._contribution(float(self.idf[term]), self.term_freqs[rows], cand[hit])
+
+    def query(self, query: str, top_k: int, filters: Optional[MetadataFilter] = None) -> List[RetrievedChunk]:
+        """Query the BM25 index and return top-scoring chunks.
+
+        Only documents containing at least one query term are returned.
+
+        Args:
+            query: Query string.
+            top_k: Number of results to return.
+            filters: Optional metadata filter; only matching documents are scored.
+        Returns:
+            A list of retrieved chunks sorted by BM25 score.
+        """
+        allowed = None
+        if filters is not None and not filters.is_empty():
+            rows = self._filter_index().select(filters)
+            if rows.size == 0:
+                return []
+            allowed = np.zeros(len(self), dtype=bool)
+            allowed[rows] = True
+        docs, scores = self.search(tokenize(query), top_k, allowed=allowed)
+        return [
+            RetrievedChunk(
+                id=self.ids[int(i)],
+                text=self.texts[int(i)],
+                metadata=self.metadata(int(i)),
+                score=float(score),
+            )
+            for i, score in zip(docs, scores)
+        ]
@@ -0,0 +1,414 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+from dataclasses import dataclass, replace
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.rag.preprocess import normalize_whitespace, publication_day
+
+
+FILTER_FIELDS = ("level", "location", "category")
+_INDEX_FILE = "filters.json"
+_EPOCH = date(1970, 1, 1)
+# Common shorthands mapped to the city part of indexed locations ("New York, NY" -> "new york").
+_LOCATION_ALIASES = {
+    "nyc": "new york",
+    "new york city": "new york",
+    "sf": "san francisco",
+    "bay area": "san francisco",
+    "la": "los angeles",
+    "dc": "washington",
+}
+# Level keywords in queries, matched against indexed levels containing the keyword.
+_LEVEL_PATTERNS = (
+    (re.compile(r"\b(?:entry[- ]level|entry|junior|jr|new grad|graduate)\b"), "entry"),
+    (re.compile(r"\bmid[- ]?(?:level|senior)?\b"), "mid"),
+    (re.compile(r"\b(?:senior|sr)\b"), "senior"),
+    (re.compile(r"\bintern(?:s|ships?)?\b"), "intern"),
+)
+_RECENT_RE = re.compile(r"\b(?:last|past)\s+(\d+\s+)?(day|week|month|year)s?\b")
+_SINCE_RE = re.compile(r"\bsince\s+(\d{4}(?:-\d{2}(?:-\d{2})?)?)\b")
+_UNIT_DAYS = {"day": 1, "week": 7, "month": 30, "year": 365}
+
+
+def _key(value: Any) -> str:
+    """Normalize a metadata value for matching.
+
+    Args:
+        value: Raw metadata value.
+    Returns:
+        The lowercased value with collapsed whitespace.
+    """
+    return normalize_whitespace(str(value)).lower()
+
+
+@dataclass(frozen=True)
+class MetadataFilter:
+    """Structured filter on job metadata.
+
+    Values within a field match any of them; fields must all match. Dates
+    are day numbers (days since 1970-01-01): `published_since` is inclusive
+    and `published_before` exclusive. The filter is hashable, so it can be
+    part of cache keys.
+    """
+
+    level: Tuple[str, ...] = ()
+    location: Tuple[str, ...] = ()
+    category: Tuple[str, ...] = ()
+    published_since: Optional[int] = None
+    published_before: Optional[int] = None
+
+    def is_empty(self) -> bool:
+        """Return whether the filter matches everything.
+
+        Returns:
+            True when no field is constrained.
+        """
+        return not (self.level or self.location or self.category) and self._date_range() is None
+
+    def _date_range(self) -> Optional[Tuple[Optional[int], Optional[int]]]:
+        """Return the (since, before) day range, or None when dates are unconstrained."""
+        if self.published_since is None and self.published_before is None:
+            return None
+        return self.published_since, self.published_before
+
+    def merge(self, other: "MetadataFilter") -> "MetadataFilter":
+        """Fill fields left empty here from another filter.
+
+        Args:
+            other: Filter providing defaults (e.g. one extracted from the query text).
+        Returns:
+            The merged filter.
+        """
+        return MetadataFilter(
+            level=self.level or other.level,
+            location=self.location or other.location,
+            category=self.category or other.category,
+            published_since=self.published_since if self._date_range() else other.published_since,
+            published_before=self.published_before if self._date_range() else other.published_before,
+        )
+
+    def canonical(self, vocabulary: Dict[str, List[str]]) -> "MetadataFilter":
+        """Replace values by their indexed spelling, for stores that match exactly.
+
+        Args:
+            vocabulary: Indexed values per field (see `MetadataIndex.vocabulary`).
+        Returns:
+            The filter with known values respelled; unknown values are kept.
+        """
+        updates = {}
+        for name in FILTER_FIELDS:
+            spelled = {_key(value): value for value in vocabulary.get(name, [])}
+            values = getattr(self, name)
+            updates[name] = tuple(dict.fromkeys(spelled.get(_key(value), value) for value in values))
+        return replace(self, **updates)
+
+    def to_pinecone(self) -> Dict[str, Any]:
+        """Translate the filter into a Pinecone metadata filter.
+
+        Returns:
+            A filter dict using `$in` and numeric ranges on `publication_day`.
+        """
+        clauses: Dict[str, Any] = {}
+        for name in FILTER_FIELDS:
+            values = getattr(self, name)
+            if values:
+                clauses[name] = {"$in": list(values)}
+        day_range: Dict[str, int] = {}
+        if self.published_since is not None:
+            day_range["$gte"] = self.published_since
+        if self.published_before is not None:
+            day_range["$lt"] = self.published_before
+        if day_range:
+            clauses["publication_day"] = day_range
+        return clauses
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return a JSON-serializable form, with dates as ISO strings.
+
+        Returns:
+            Non-empty fields of the filter.
+        """
+        data: Dict[str, Any] = {name: list(getattr(self, name)) for name in FILTER_FIELDS if getattr(self, name)}
+        for name in ("published_since", "published_before"):
+            day = getattr(self, name)
+            if day is not None:
+                data[name] = (_EPOCH + timedelta(days=day)).isoformat()
+        return data
+
+
+class MetadataIndex:
+    """Sorted-array indexes over the filterable metadata of a store's rows.
+
+    Each categorical field keeps, per distinct (normalized) value, the
+    sorted row numbers holding it, stored CSR-style as one row array plus
+    offsets. Publication dates are a sorted day array with the matching
+    rows, so a date range is two binary searches. `select` unions a field's
+    posting lists and intersects across fields, so the cost depends on the
+    size of the matching lists, not on the number of rows.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        values: Dict[str, List[str]],
+        offsets: Dict[str, np.ndarray],
+        rows: Dict[str, np.ndarray],
+        days: np.ndarray,
+        day_rows: np.ndarray,
+    ) -> None:
+        """Wrap built index arrays.
+
+        Args:
+            size: Number of indexed rows.
+            values: Per field, the distinct values in their first-seen spelling.
+            offsets: Per field, posting boundaries per value (length len(values) + 1).
+            rows: Per field, row numbers grouped by value, sorted within each group.
+            days: Sorted publication day numbers.
+            day_rows: Rows aligned with `days`.
+        """
+        self.size = size
+        self._values = values
+        self._offsets = offsets
+        self._rows = rows
+        self._days = days
+        self._day_rows = day_rows
+        self._positions = {name: {_key(value): idx for idx, value in enumerate(values[name])} for name in values}
+
+    @classmethod
+    def build(cls, metadatas: Sequence[Dict[str, Any]]) -> "MetadataIndex":
+        """Index the filterable fields of a metadata list.
+
+        Args:
+            metadatas: One metadata dict per row.
+        Returns:
+            A MetadataIndex over the rows.
+        """
+        values: Dict[str, List[str]] = {}
+        offsets: Dict[str, np.ndarray] = {}
+        rows: Dict[str, np.ndarray] = {}
+        for name in FILTER_FIELDS:
+            spelled: Dict[str, str] = {}
+            position: Dict[str, int] = {}
+            codes = np.empty(len(metadatas), dtype=np.int64)
+            for row, metadata in enumerate(metadatas):
+                raw = str(metadata.get(name, "") or "")
+                key = _key(raw)
+                if key not in position:
+                    position[key] = len(position)
+                    spelled[key] = raw.strip()
+                codes[row] = position[key]
+            # A stable sort keeps rows ascending within each value's posting list.
+            values[name] = list(spelled.values())
+            offsets[name] = np.zeros(len(spelled) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(codes, minlength=len(spelled)), out=offsets[name][1:])
+            rows[name] = np.argsort(codes, kind="stable").astype(np.int64)
+
+        day_list = [publication_day(str(metadata.get("publication_date", ""))) for metadata in metadatas]
+        dated = np.array([row for row, day in enumerate(day_list) if day is not None], dtype=np.int64)
+        days = np.array([day_list[row] for row in dated], dtype=np.int64)
+        order = np.argsort(days, kind="stable")
+        return cls(len(metadatas), values, offsets, rows, days[order], dated[order])
+
+    def save(self, path: str) -> None:
+        """Persist the index under `path`.
+
+        Args:
+            path: Target directory.
+        """
+        os.makedirs(path, exist_ok=True)
+        arrays = {"filter_days": self._days, "filter_day_rows": self._day_rows}
+        for name in FILTER_FIELDS:
+            arrays[f"filter_{name}_offsets"] = self._offsets[name]
+            arrays[f"filter_{name}_rows"] = self._rows[name]
+        for stem, array in arrays.items():
+            target = os.path.join(path, f"{stem}.npy")
+            with open(f"{target}.tmp", "wb") as f:
+                np.save(f, array)
+            os.replace(f"{target}.tmp", target)
+        target = os.path.join(path, _INDEX_FILE)
+        with open(f"{target}.tmp", "w", encoding="utf-8") as f:
+            json.dump({"size": self.size, "values": self._values}, f)
+        os.replace(f"{target}.tmp", target)
+
+    @classmethod
+    def load(cls, path: str, size: int) -> Optional["MetadataIndex"]:
+        """Memory-map a saved index if it covers `size` rows.
+
+        Args:
+            path: Directory holding the index.
+            size: Expected number of rows.
+        Returns:
+            The MetadataIndex, or None when missing or stale.
+        """
+        target = os.path.join(path, _INDEX_FILE)
+        if not os.path.exists(target):
+            return None
+        with open(target, "r", encoding="utf-8") as f:
+            header = json.load(f)
+        if header["size"] != size or set(header["values"]) != set(FILTER_FIELDS):
+            return None
+
+        def array(stem: str) -> np.ndarray:
+            return np.load(os.path.join(path, f"{stem}.npy"), mmap_mode="r")
+
+        return cls(
+            size,
+            header["values"],
+            {name: array(f"filter_{name}_offsets") for name in FILTER_FIELDS},
+            {name: array(f"filter_{name}_rows") for name in FILTER_FIELDS},
+            array("filter_days"),
+            array("filter_day_rows"),
+        )
+
+    def vocabulary(self) -> Dict[str, List[str]]:
+        """Return the distinct non-empty values of each categorical field.
+
+        Returns:
+            Values per field, in their indexed spelling.
+        """
+        return {name: [value for value in self._values[name] if value] for name in FILTER_FIELDS}
+
+    def select(self, metadata_filter: MetadataFilter) -> np.ndarray:
+        """Return the rows matching a filter.
+
+        Args:
+            metadata_filter: Filter to apply.
+        Returns:
+            Sorted row numbers.
+        """
+        selected: Optional[np.ndarray] = None
+        for name in FILTER_FIELDS:
+            wanted = getattr(metadata_filter, name)
+            if not wanted:
+                continue
+            lists = []
+            for value in wanted:
+                idx = self._positions[name].get(_key(value))
+                if idx is not None:
+                    lists.append(np.asarray(self._rows[name][self._offsets[name][idx] : self._offsets[name][idx + 1]]))
+            rows = np.unique(np.concatenate(lists)) if lists else np.empty(0, dtype=np.int64)
+            selected = rows if selected is None else np.intersect1d(selected, rows, assume_unique=True)
+
+        date_range = metadata_filter._date_range()
+        if date_range is not None:
+            since, before = date_range
+            lo = 0 if since is None else int(np.searchsorted(self._days, since, side="left"))
+            hi = len(self._days) if before is None else int(np.searchsorted(self._days, before, side="left"))
+            rows = np.sort(np.asarray(self._day_rows[lo:hi]))
+            selected = rows if selected is None else np.intersect1d(selected, rows, assume_unique=True)
+        return selected if selected is not None else np.arange(self.size, dtype=np.int64)
+
+
+class FilterExtractor:
+    """Rule-based extraction of metadata filters from query text.
+
+    Locations and categories are recognized by their indexed values (and,
+    for locations, the city part and a few common shorthands); levels by
+    keywords such as "junior" or "senior" matched to indexed levels; and
+    recency phrases ("past 2 weeks", "since 2024-03") become date ranges.
+    Fields without indexed values are never extracted.
+    """
+
+    def __init__(self, vocabulary: Dict[str, List[str]]) -> None:
+        """Compile matchers for the indexed values.
+
+        Args:
+            vocabulary: Indexed values per field (see `MetadataIndex.vocabulary`).
+        """
+        self.vocabulary = vocabulary
+        self._phrases: Dict[str, List[Tuple[re.Pattern, str]]] = {}
+        for name in ("location", "category"):
+            aliases: Dict[str, set] = {}
+            for value in vocabulary.get(name, []):
+                key = _key(value)
+                aliases.setdefault(key, set()).add(value)
+                if name == "location" and "," in key:
+                    aliases.setdefault(key.split(",")[0].strip(), set()).add(value)
+            if name == "location":
+                for alias, city in _LOCATION_ALIASES.items():
+                    if city in aliases:
+                        aliases.setdefault(alias, set()).update(aliases[city])
+            # Longest phrases first, so "new york city" wins over "new york".
+            self._phrases[name] = [
+                (re.compile(rf"(?<!\w){re.escape(alias)}(?!\w)"), value)
+                for alias in sorted(aliases, key=len, reverse=True)
+                for value in sorted(aliases[alias])
+            ]
+        levels = vocabulary.get("level", [])
+        self._levels = [
+            (pattern, tuple(level for level in levels if keyword in _key(level)))
+            for pattern, keyword in _LEVEL_PATTERNS
+        ]
+
+    def extract(self, query: str, today: Optional[date] = None) -> MetadataFilter:
+        """Extract a filter from query text.
+
+        Args:
+            query: User query string.
+            today: Reference date for recency phrases (defaults to today).
+        Returns:
+            The extracted filter (empty when nothing is recognized).
+        """
+        text = _key(query)
+        found: Dict[str, Tuple[str, ...]] = {}
+        for name, phrases in self._phrases.items():
+            values: List[str] = []
+            for pattern, value in phrases:
+                if value not in values and pattern.search(text):
+                    values.append(value)
+            found[name] = tuple(values)
+        levels: List[str] = []
+        for pattern, matches in self._levels:
+            if matches and pattern.search(text):
+                levels.extend(level for level in matches if level not in levels)
+        found["level"] = tuple(levels)
+
+        since: Optional[int] = None
+        today = today or date.today()
+        recent = _RECENT_RE.search(text)
+        if recent:
+            count = int(recent.group(1) or 1)
+            since = (today - timedelta(days=count * _UNIT_DAYS[recent.group(2)]) - _EPOCH).days
+        else:
+            explicit = _SINCE_RE.search(text)
+            if explicit:
+                since = publication_day(_pad_date(explicit.group(1)))
+        return MetadataFilter(
+            level=found["level"],
+            location=found["location"],
+            category=found["category"],
+            published_since=since,
+        )
+
+
+def _pad_date(value: str) -> str:
+    """Complete "YYYY" or "YYYY-MM" to the first day of that period.
+
+    Args:
+        value: Partial ISO date.
+    Returns:
+        A full ISO date string.
+    """
+    return value + "-01-01"[len(value) - 4 :] if len(value) < 10 else value
+
+
+def merge_vocabularies(vocabularies: Iterable[Dict[str, List[str]]]) -> Dict[str, List[str]]:
+    """Combine the indexed values of several indexes.
+
+    Args:
+        vocabularies: Values per field from each index.
+    Returns:
+        The union per field, keeping the first spelling seen.
+    """
+    merged: Dict[str, Dict[str, str]] = {name: {} for name in FILTER_FIELDS}
+    for vocabulary in vocabularies:
+        for name in FILTER_FIELDS:
+            for value in vocabulary.get(name, []):
+                merged[name].setdefault(_key(value), value)
+    return {name: list(values.values()) for name, values in merged.items()}
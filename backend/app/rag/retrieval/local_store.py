@@ -0,0 +1,608 @@
+from __future__ import annotations
+
+import os
+import pickle
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.rag.retrieval.ann import IVFIndex
+from app.rag.retrieval.filters import MetadataFilter, MetadataIndex
+from app.rag.retrieval.quantization import BinaryQuantizer, ScalarQuantizer
+
+
+_VECTORS_FILE = "vectors.npy"
+_DOCSTORE_FILE = "docstore.pkl"
+_CODES_FILE = "codes_{}.npy"
+_SUPPORTED_DTYPES = ("float32", "float16", "int8", "binary")
+_QUANTIZERS = {"int8": ScalarQuantizer, "binary": BinaryQuantizer}
+_SUPPORTED_INDEX_TYPES = ("flat", "ivf")
+_SCAN_BLOCK_ROWS = 8192
+# Share of rows that may change (upserts plus deletes) before `flush` retrains
+# the IVF centroids and quantizer instead of reusing them.
+_RETRAIN_FRACTION = 0.2
+
+
+def _atomic_save_array(path: str, array: np.ndarray) -> None:
+    """Write a NumPy array to disk via a temporary file and rename.
+
+    Args:
+        path: Destination `.npy` path.
+        array: Array to persist.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def _atomic_save_pickle(path: str, payload: Any) -> None:
+    """Pickle an object to disk via a temporary file and rename.
+
+    Args:
+        path: Destination path.
+        payload: Object to pickle.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize each row so dot products equal cosine similarity.
+
+    Args:
+        vectors: A 2D float array.
+    Returns:
+        A float32 array with unit-length rows (zero rows stay zero).
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Return the indices of the k highest scores, sorted by descending score.
+
+    Args:
+        scores: 1D score array.
+        k: Number of indices to keep.
+    Returns:
+        An index array of length min(k, len(scores)).
+    """
+    if k < scores.shape[0]:
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(scores.shape[0])
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+class LocalVectorStore:
+    """In-process vector store backed by a memory-mapped NumPy matrix.
+
+    Vectors are stored L2-normalized so exact cosine search is a single
+    matrix-vector product. Upserts are buffered in memory until `flush`
+    writes them to `path`; a fresh instance memory-maps the saved matrix so
+    worker processes share pages instead of copying the index.
+
+    With `index_type="ivf"`, `flush` also trains an IVF index and queries
+    only rescan the `nprobe` closest lists. Until the next flush, pending
+    upserts fall back to exact search so results never miss new rows.
+    Later flushes reuse the trained centroids (and quantizer) and only
+    assign or encode new and overwritten rows, until more than
+    `_RETRAIN_FRACTION` of the rows changed since training.
+
+    With `dtype="int8"` or `"binary"`, `flush` also writes a quantized copy
+    of the matrix (`codes_<dtype>.npy`) that queries scan instead of the
+    float32 vectors: per-dimension int8 codes (4x smaller) or packed sign
+    bits scored by Hamming distance (32x smaller). The best
+    `rescore_candidates` rows are then rescored exactly against the
+    memory-mapped float32 matrix, of which only those rows are read.
+
+    `flush` also writes a `MetadataIndex` over the level, location, category
+    and publication date of every row. Filtered queries first select the
+    matching rows from it and then score only those rows (or, with IVF,
+    the probed candidates among them), so narrower filters scan less.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        dimension: Optional[int] = None,
+        dtype: str = "float32",
+        index_type: str = "flat",
+        nlist: int = 0,
+        nprobe: int = 8,
+        rescore_candidates: int = 100,
+    ) -> None:
+        """Open (or prepare) a local vector store.
+
+        Args:
+            path: Directory holding the vector matrix and docstore.
+            dimension: Expected embedding dimension, if known.
+            dtype: Storage dtype for vectors ("float32", "float16", "int8" or "binary").
+            index_type: "flat" for exact search or "ivf" for approximate search.
+            nlist: IVF list count; 0 sizes it from the corpus at flush time.
+            nprobe: Default number of IVF lists visited per query.
+            rescore_candidates: Shortlist rescored at full precision for quantized
+                dtypes (at least `n_results`); 0 returns the quantized scores.
+        """
+        if dtype not in _SUPPORTED_DTYPES:
+            raise RuntimeError(
+                f"Unsupported LOCAL_VECTOR_DTYPE '{dtype}'; expected one of {_SUPPORTED_DTYPES}"
+            )
+        if index_type not in _SUPPORTED_INDEX_TYPES:
+            raise RuntimeError(
+                f"Unsupported LOCAL_INDEX_TYPE '{index_type}'; expected one of {_SUPPORTED_INDEX_TYPES}"
+            )
+        self.path = path
+        self.index_type = index_type
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.rescore_candidates = rescore_candidates
+        self.quantization = dtype if dtype in _QUANTIZERS else None
+        # Quantized stores keep float32 vectors for building and rescoring.
+        self._dtype = np.dtype("float32" if self.quantization else dtype)
+        self._dimension = dimension
+        self._ivf: Optional[IVFIndex] = None
+        self._quantizer: Optional[Any] = None
+        self._codes: Optional[np.ndarray] = None
+        self._metadata_index: Optional[MetadataIndex] = None
+        # State of the last flush that edits are applied against: the IVF index, quantizer and
+        # codes it wrote, each current row's row in it (-1 for new or overwritten rows), and the
+        # rows changed since the centroids and quantizer were trained.
+        self._trained_ivf: Optional[IVFIndex] = None
+        self._trained_quantizer: Optional[Any] = None
+        self._trained_codes: Optional[np.ndarray] = None
+        self._source_rows: Optional[np.ndarray] = None
+        self._changed_rows = 0
+        self._write_lock = threading.Lock()
+        self._ids: List[str] = []
+        self._documents: List[str] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._id_to_row: Dict[str, int] = {}
+        self._vectors: Optional[np.ndarray] = None
+        self._size = 0
+        self._writable = False
+        self._load()
+
+    def _load(self) -> None:
+        """Memory-map a previously flushed index from `path`, if present."""
+        vectors_path = os.path.join(self.path, _VECTORS_FILE)
+        docstore_path = os.path.join(self.path, _DOCSTORE_FILE)
+        if not (os.path.exists(vectors_path) and os.path.exists(docstore_path)):
+            return
+        with open(docstore_path, "rb") as f:
+            data = pickle.load(f)
+        vectors = np.load(vectors_path, mmap_mode="r")
+        if vectors.dtype != self._dtype and not self.quantization:
+            vectors = vectors.astype(self._dtype)
+        if self._dimension is not None and vectors.shape[1] != self._dimension:
+            raise RuntimeError(
+                f"Local index dimension {vectors.shape[1]} does not match embedding dimension "
+                f"{self._dimension}; rebuild the index."
+            )
+        self._ids = list(data["ids"])
+        self._documents = list(data["documents"])
+        self._metadatas = list(data["metadatas"])
+        self._id_to_row = {vector_id: row for row, vector_id in enumerate(self._ids)}
+        self._vectors = vectors
+        self._size = len(self._ids)
+        self._dimension = int(vectors.shape[1])
+        if self.index_type == "ivf":
+            ivf = IVFIndex.load(self.path)
+            self._ivf = ivf if ivf is not None and ivf.size == self._size else None
+        self._metadata_index = MetadataIndex.load(self.path, self._size)
+        if self.quantization:
+            self._load_codes()
+        self._trained_ivf = self._ivf
+        self._trained_quantizer = self._quantizer
+        self._trained_codes = self._codes
+        self._source_rows = np.arange(self._size, dtype=np.int64)
+        self._changed_rows = int(data.get("changed_rows", 0))
+
+    def _load_codes(self) -> None:
+        """Memory-map the quantized codes, quantizing in memory when none match the index."""
+        quantizer_cls = _QUANTIZERS[self.quantization]
+        codes_path = os.path.join(self.path, _CODES_FILE.format(self.quantization))
+        quantizer = quantizer_cls.load(self.path, self._dimension)
+        codes = np.load(codes_path, mmap_mode="r") if quantizer is not None and os.path.exists(codes_path) else None
+        if codes is None or codes.shape[0] != self._size:
+            # Index built with another dtype (or before quantization): derive the codes now.
+            quantizer = quantizer_cls.train(self._matrix())
+            codes = quantizer.encode(self._matrix())
+        self._quantizer = quantizer
+        self._codes = codes
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Normalized vector matrix (one row per stored ID)."""
+        return self._matrix()
+
+    def _matrix(self) -> np.ndarray:
+        """Return the populated slice of the vector matrix."""
+        if self._vectors is None:
+            return np.empty((0, self._dimension or 0), dtype=self._dtype)
+        return self._vectors[: self._size]
+
+    def _reserve(self, rows: int) -> None:
+        """Ensure the in-memory buffer can hold `rows` vectors.
+
+        The memory-mapped matrix is read-only, so the first write copies it
+        into a growable in-memory buffer.
+
+        Args:
+            rows: Required number of rows.
+        """
+        capacity = 0 if self._vectors is None else self._vectors.shape[0]
+        if self._writable and rows <= capacity:
+            return
+        new_capacity = max(rows, capacity * 2 if self._writable else rows, 1024)
+        buffer = np.empty((new_capacity, self._dimension), dtype=self._dtype)
+        if self._size:
+            buffer[: self._size] = self._matrix()
+        self._vectors = buffer
+        self._writable = True
+
+    def upsert(
+        self,
+        ids: List[str],
+        embeddings: Sequence[Sequence[float]],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+    ) -> None:
+        """Insert or overwrite embeddings and metadata.
+
+        Args:
+            ids: Vector IDs.
+            embeddings: Embedding vectors.
+            documents: Raw document text associated with embeddings.
+            metadatas: Metadata dicts aligned with the documents.
+        """
+        if not ids:
+            return
+        with self._write_lock:
+            self._upsert(ids, embeddings, documents, metadatas)
+
+    def _upsert(
+        self,
+        ids: List[str],
+        embeddings: Sequence[Sequence[float]],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+    ) -> None:
+        """Apply an upsert; callers must hold the write lock."""
+        vectors = _normalize_rows(np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1))
+        if self._dimension is None:
+            self._dimension = int(vectors.shape[1])
+        elif vectors.shape[1] != self._dimension:
+            raise ValueError(
+                f"Embedding dimension {vectors.shape[1]} does not match index dimension {self._dimension}"
+            )
+
+        unique_ids = dict.fromkeys(ids)
+        new_rows = sum(1 for vector_id in unique_ids if vector_id not in self._id_to_row)
+        self._reserve(self._size + new_rows)
+        self._ivf = None
+        self._quantizer = None
+        self._metadata_index = None
+        self._changed_rows += len(unique_ids)
+        if self._source_rows is not None:
+            overwritten = [self._id_to_row[vector_id] for vector_id in unique_ids if vector_id in self._id_to_row]
+            self._source_rows[np.asarray(overwritten, dtype=np.int64)] = -1
+            self._source_rows = np.concatenate([self._source_rows, np.full(new_rows, -1, dtype=np.int64)])
+        for idx, vector_id in enumerate(ids):
+            metadata = dict(metadatas[idx]) if idx < len(metadatas) else {}
+            document = documents[idx] if idx < len(documents) else ""
+            row = self._id_to_row.get(vector_id)
+            if row is None:
+                row = self._size
+                self._size += 1
+                self._id_to_row[vector_id] = row
+                self._ids.append(vector_id)
+                self._documents.append(document)
+                self._metadatas.append(metadata)
+            else:
+                self._documents[row] = document
+                self._metadatas[row] = metadata
+            self._vectors[row] = vectors[idx]
+
+    def delete(self, ids: List[str]) -> None:
+        """Remove vectors by ID, compacting the matrix in memory.
+
+        Args:
+            ids: Vector IDs to delete; unknown IDs are ignored.
+        """
+        with self._write_lock:
+            self._delete(ids)
+
+    def _delete(self, ids: List[str]) -> None:
+        """Apply a delete; callers must hold the write lock."""
+        drop = {self._id_to_row[vector_id] for vector_id in ids if vector_id in self._id_to_row}
+        if not drop:
+            return
+        keep = [row for row in range(self._size) if row not in drop]
+        self._vectors = np.array(self._matrix()[np.asarray(keep, dtype=np.int64)], dtype=self._dtype)
+        self._writable = True
+        self._ivf = None
+        self._quantizer = None
+        self._metadata_index = None
+        self._changed_rows += len(drop)
+        if self._source_rows is not None:
+            self._source_rows = self._source_rows[np.asarray(keep, dtype=np.int64)]
+        self._ids = [self._ids[row] for row in keep]
+        self._documents = [self._documents[row] for row in keep]
+        self._metadatas = [self._metadatas[row] for row in keep]
+        self._id_to_row = {vector_id: row for row, vector_id in enumerate(self._ids)}
+        self._size = len(self._ids)
+
+    def flush(self) -> None:
+        """Persist buffered vectors, the docstore and (if enabled) the IVF index to `path`."""
+        with self._write_lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        """Write the store to disk; callers must hold the write lock.
+
+        The vector matrix and docstore are rewritten in full. The IVF index
+        and quantized codes are patched for the changed rows unless enough
+        rows changed since training to warrant retraining.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        matrix = np.ascontiguousarray(self._matrix())
+        source_rows = self._source_rows
+        if source_rows is None or self._changed_rows > _RETRAIN_FRACTION * self._size:
+            source_rows = None
+            self._changed_rows = 0
+        _atomic_save_array(os.path.join(self.path, _VECTORS_FILE), matrix)
+        _atomic_save_pickle(
+            os.path.join(self.path, _DOCSTORE_FILE),
+            {
+                "ids": self._ids,
+                "documents": self._documents,
+                "metadatas": self._metadatas,
+                "changed_rows": self._changed_rows,
+            },
+        )
+        if self.index_type == "ivf" and self._size:
+            ivf = self._trained_ivf
+            if source_rows is None or ivf is None or (self.nlist and self.nlist != ivf.nlist):
+                ivf = IVFIndex.train(matrix, nlist=self.nlist)
+            else:
+                ivf = ivf.reassign(matrix, source_rows)
+            ivf.save(self.path)
+        else:
+            IVFIndex.remove(self.path)
+        MetadataIndex.build(self._metadatas).save(self.path)
+        if self.quantization:
+            quantizer = self._trained_quantizer
+            if source_rows is None or quantizer is None or self._trained_codes is None:
+                quantizer = _QUANTIZERS[self.quantization].train(matrix)
+                codes = quantizer.encode(matrix)
+            else:
+                codes = self._patch_codes(matrix, source_rows)
+            _atomic_save_array(os.path.join(self.path, _CODES_FILE.format(self.quantization)), codes)
+            quantizer.save(self.path)
+        self._vectors = None
+        self._writable = False
+        self._load()
+
+    def _patch_codes(self, matrix: np.ndarray, source_rows: np.ndarray) -> np.ndarray:
+        """Carry quantized codes over from the last flush, encoding only changed rows.
+
+        Args:
+            matrix: The current vector matrix.
+            source_rows: Each row's row in the last flush, or -1 if new or overwritten.
+        Returns:
+            The code matrix for `matrix`.
+        """
+        codes = np.empty((matrix.shape[0],) + self._trained_codes.shape[1:], dtype=self._trained_codes.dtype)
+        reused = source_rows >= 0
+        codes[reused] = self._trained_codes[source_rows[reused]]
+        fresh = np.flatnonzero(~reused)
+        if fresh.size:
+            codes[fresh] = self._trained_quantizer.encode(matrix[fresh])
+        return codes
+
+    def _exact_search(self, queries: np.ndarray, k: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Score every stored vector against each query and keep the top k.
+
+        Args:
+            queries: Normalized query matrix of shape (m, d).
+            k: Number of neighbours per query.
+        Returns:
+            Per query, a tuple of (row indices, scores) sorted by descending score.
+        """
+        matrix = self._matrix()
+        if matrix.dtype == np.float32:
+            scores = queries @ matrix.T
+        else:
+            scores = np.empty((queries.shape[0], matrix.shape[0]), dtype=np.float32)
+            for start in range(0, matrix.shape[0], _SCAN_BLOCK_ROWS):
+                block = np.asarray(matrix[start : start + _SCAN_BLOCK_ROWS], dtype=np.float32)
+                scores[:, start : start + block.shape[0]] = queries @ block.T
+
+        results: List[Tuple[np.ndarray, np.ndarray]] = []
+        for row_scores in scores:
+            top = _top_k(row_scores, k)
+            results.append((top, row_scores[top]))
+        return results
+
+    def _quantized_search(self, queries: np.ndarray, k: int, nprobe: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Scan the quantized codes, then rescore a shortlist at full precision.
+
+        Args:
+            queries: Normalized query matrix of shape (m, d).
+            k: Number of neighbours per query.
+            nprobe: IVF lists to visit when an IVF index is loaded.
+        Returns:
+            Per query, a tuple of (row indices, scores) sorted by descending score.
+        """
+        shortlist = max(k, self.rescore_candidates) if self.rescore_candidates else k
+        if self._ivf is None:
+            approx = self._quantizer.score(self._codes, queries)
+            candidate_rows = [None] * queries.shape[0]
+        else:
+            candidate_rows = [self._ivf.candidates(query, nprobe) for query in queries]
+            approx = [self._quantizer.score(self._codes, query[None, :], rows)[0] for query, rows in zip(queries, candidate_rows)]
+
+        return [
+            self._rescore(query, row_scores, rows, k, shortlist)
+            for query, row_scores, rows in zip(queries, approx, candidate_rows)
+        ]
+
+    def _rescore(
+        self,
+        query: np.ndarray,
+        approx: np.ndarray,
+        rows: Optional[np.ndarray],
+        k: int,
+        shortlist: int,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Rescore the best quantized matches of one query at full precision.
+
+        Args:
+            query: Normalized query vector.
+            approx: Quantized scores of the scanned rows.
+            rows: Rows behind `approx`, or None when every row was scanned.
+            k: Number of neighbours.
+            shortlist: Rows kept from the quantized scan.
+        Returns:
+            A tuple of (row indices, scores) sorted by descending score.
+        """
+        top = _top_k(approx, shortlist)
+        candidates = top if rows is None else rows[top]
+        if not self.rescore_candidates:
+            return candidates, approx[top]
+        # Sorted rows turn the memory-mapped reads into a forward scan.
+        candidates = np.sort(candidates)
+        exact = np.asarray(self._matrix()[candidates], dtype=np.float32) @ query
+        best = _top_k(exact, k)
+        return candidates[best], exact[best]
+
+    def _filtered_search(
+        self,
+        queries: np.ndarray,
+        allowed: np.ndarray,
+        k: int,
+        nprobe: int,
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Search only the rows passing a metadata filter.
+
+        Without IVF, or when the filter keeps fewer rows than the probed
+        lists hold, the allowed rows are scanned directly (exact). Otherwise
+        the probed candidates are restricted to the allowed rows, falling
+        back to the direct scan if that leaves fewer than k.
+
+        Args:
+            queries: Normalized query matrix of shape (m, d).
+            allowed: Sorted rows matching the filter.
+            k: Number of neighbours per query.
+            nprobe: IVF lists to visit when an IVF index is loaded.
+        Returns:
+            Per query, a tuple of (row indices, scores) sorted by descending score.
+        """
+        shortlist = max(k, self.rescore_candidates) if self.rescore_candidates else k
+        results: List[Tuple[np.ndarray, np.ndarray]] = []
+        for query in queries:
+            rows = allowed
+            if self._ivf is not None:
+                candidates = self._ivf.candidates(query, nprobe)
+                if candidates.size < allowed.size:
+                    probed = candidates[np.isin(candidates, allowed, assume_unique=True)]
+                    rows = probed if probed.size >= k else allowed
+            if self._quantizer is not None:
+                approx = self._quantizer.score(self._codes, query[None, :], rows)[0]
+                results.append(self._rescore(query, approx, rows, k, shortlist))
+                continue
+            scores = np.asarray(self._matrix()[rows], dtype=np.float32) @ query
+            top = _top_k(scores, k)
+            results.append((rows[top], scores[top]))
+        return results
+
+    def _filter_index(self) -> MetadataIndex:
+        """Return the metadata index, building it in memory if missing or stale.
+
+        Returns:
+            A MetadataIndex over the current rows.
+        """
+        index = self._metadata_index
+        if index is None or index.size != self._size:
+            index = MetadataIndex.build(self._metadatas)
+            self._metadata_index = index
+        return index
+
+    def metadata_vocabulary(self) -> Dict[str, List[str]]:
+        """Return the distinct filterable metadata values in the store.
+
+        Returns:
+            Values per filter field.
+        """
+        return self._filter_index().vocabulary()
+
+    def query(
+        self,
+        query_embeddings: Sequence[Sequence[float]],
+        n_results: int,
+        nprobe: Optional[int] = None,
+        filters: Optional[MetadataFilter] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """Query the store for nearest neighbors by cosine similarity.
+
+        Args:
+            query_embeddings: Query vectors.
+            n_results: Number of results per query.
+            nprobe: IVF lists to visit; defaults to the store setting. Ignored for flat search.
+            filters: Optional metadata filter; only matching rows are searched.
+        Returns:
+            A list of result lists with id, document, metadata, and score.
+        """
+        if len(query_embeddings) == 0:
+            return []
+        allowed = self._filter_index().select(filters) if filters is not None and not filters.is_empty() else None
+        if self._size == 0 or n_results <= 0 or (allowed is not None and allowed.size == 0):
+            return [[] for _ in range(len(query_embeddings))]
+        queries = _normalize_rows(np.asarray(query_embeddings, dtype=np.float32).reshape(len(query_embeddings), -1))
+        k = min(n_results, self._size if allowed is None else allowed.size)
+        if allowed is not None:
+            ranked = self._filtered_search(queries, allowed, k, nprobe or self.nprobe)
+        elif self._quantizer is not None:
+            ranked = self._quantized_search(queries, k, nprobe or self.nprobe)
+        elif self._ivf is not None:
+            ranked = self._ivf.search(self._matrix(), queries, k, nprobe or self.nprobe)
+        else:
+            ranked = self._exact_search(queries, k)
+
+        return [
+            [
+                {
+                    "id": self._ids[i],
+                    "document": self._documents[i],
+                    "metadata": self._metadatas[i],
+                    "score": float(score),
+                }
+                for i, score in zip(rows, scores)
+            ]
+            for rows, scores in ranked
+        ]
+
+    def count(self) -> int:
+        """Return the number of vectors in the store.
+
+        Returns:
+            Total vector count.
+        """
+        return self._size
+
+    def bytes_per_vector(self) -> float:
+        """Return the bytes per vector of the matrix that queries scan.
+
+        Returns:
+            Code bytes for quantized dtypes, otherwise the in-memory vector row size.
+        """
+        if self._codes is not None and self._quantizer is not None:
+            return self._codes.nbytes / max(1, self._codes.shape[0])
+        return float(self._dtype.itemsize * (self._dimension or self._matrix().shape[1]))
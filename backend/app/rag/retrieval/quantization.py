@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import os
+from typing import Optional
+
+import numpy as np
+
+
+_SCAN_BLOCK_ROWS = 8192
+_SCALAR_PARAMS_FILE = "int8_params.npy"
+# Population count of every 16-bit value, for Hamming distances over packed bits.
+_POPCOUNT16 = np.unpackbits(np.arange(1 << 16, dtype=np.uint16).view(np.uint8)).reshape(-1, 16).sum(axis=1).astype(np.uint8)
+
+
+def _rows(codes: np.ndarray, rows: Optional[np.ndarray], start: int, stop: int) -> np.ndarray:
+    """Read a block of code rows, either a contiguous slice or a slice of `rows`.
+
+    Args:
+        codes: Code matrix (possibly memory-mapped).
+        rows: Optional row indices to read instead of the whole matrix.
+        start: First block position.
+        stop: End block position.
+    Returns:
+        The block of codes.
+    """
+    return codes[start:stop] if rows is None else codes[rows[start:stop]]
+
+
+class ScalarQuantizer:
+    """Per-dimension int8 scalar quantizer.
+
+    Each dimension is mapped linearly from its [min, max] range onto
+    [-127, 127], so a vector takes one byte per dimension (4x smaller than
+    float32). Scores are asymmetric: the float query is dotted with the
+    dequantized codes, folded into `q·center + (q*scale)·codes`.
+    """
+
+    name = "int8"
+
+    def __init__(self, center: np.ndarray, scale: np.ndarray) -> None:
+        """Wrap trained quantization parameters.
+
+        Args:
+            center: Per-dimension midpoint of the value range.
+            scale: Per-dimension step between adjacent codes.
+        """
+        self.center = np.asarray(center, dtype=np.float32)
+        self.scale = np.asarray(scale, dtype=np.float32)
+
+    @classmethod
+    def train(cls, vectors: np.ndarray) -> "ScalarQuantizer":
+        """Fit per-dimension ranges to a vector matrix.
+
+        Args:
+            vectors: Matrix to quantize (float16 or float32, possibly memory-mapped).
+        Returns:
+            A trained ScalarQuantizer.
+        """
+        low = np.full(vectors.shape[1], np.inf, dtype=np.float32)
+        high = np.full(vectors.shape[1], -np.inf, dtype=np.float32)
+        for start in range(0, vectors.shape[0], _SCAN_BLOCK_ROWS):
+            block = np.asarray(vectors[start : start + _SCAN_BLOCK_ROWS], dtype=np.float32)
+            np.minimum(low, block.min(axis=0), out=low)
+            np.maximum(high, block.max(axis=0), out=high)
+        if not vectors.shape[0]:
+            low[:], high[:] = -1.0, 1.0
+        scale = (high - low) / 254.0
+        scale[scale == 0] = 1.0
+        return cls((high + low) / 2.0, scale)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """Quantize vectors to int8 codes.
+
+        Args:
+            vectors: Matrix to quantize.
+        Returns:
+            An int8 matrix of the same shape.
+        """
+        codes = np.empty(vectors.shape, dtype=np.int8)
+        for start in range(0, vectors.shape[0], _SCAN_BLOCK_ROWS):
+            block = np.asarray(vectors[start : start + _SCAN_BLOCK_ROWS], dtype=np.float32)
+            codes[start : start + block.shape[0]] = np.clip(np.rint((block - self.center) / self.scale), -127, 127)
+        return codes
+
+    def score(self, codes: np.ndarray, queries: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Estimate dot products between queries and quantized vectors.
+
+        Args:
+            codes: int8 code matrix.
+            queries: Query matrix of shape (m, d).
+            rows: Optional subset of code rows to score.
+        Returns:
+            A float32 matrix of shape (m, n) for the n scored rows.
+        """
+        n_rows = codes.shape[0] if rows is None else rows.shape[0]
+        scaled = (queries * self.scale).astype(np.float32)
+        scores = np.empty((queries.shape[0], n_rows), dtype=np.float32)
+        for start in range(0, n_rows, _SCAN_BLOCK_ROWS):
+            block = np.asarray(_rows(codes, rows, start, start + _SCAN_BLOCK_ROWS), dtype=np.float32)
+            scores[:, start : start + block.shape[0]] = scaled @ block.T
+        scores += (queries @ self.center)[:, None]
+        return scores
+
+    def save(self, path: str) -> None:
+        """Persist the quantization parameters under `path`.
+
+        Args:
+            path: Directory to write into.
+        """
+        target = os.path.join(path, _SCALAR_PARAMS_FILE)
+        with open(f"{target}.tmp", "wb") as f:
+            np.save(f, np.stack([self.center, self.scale]))
+        os.replace(f"{target}.tmp", target)
+
+    @classmethod
+    def load(cls, path: str, dimension: int) -> Optional["ScalarQuantizer"]:
+        """Load saved quantization parameters, if any.
+
+        Args:
+            path: Directory holding the parameters.
+            dimension: Vector dimension the parameters must match.
+        Returns:
+            A ScalarQuantizer, or None if none was saved.
+        """
+        target = os.path.join(path, _SCALAR_PARAMS_FILE)
+        if not os.path.exists(target):
+            return None
+        center, scale = np.load(target)
+        return cls(center, scale) if center.shape[0] == dimension else None
+
+
+class BinaryQuantizer:
+    """1-bit sign quantizer with Hamming-distance scoring.
+
+    Each dimension keeps only its sign, packed 8 per byte (32x smaller than
+    float32). Scores are `1 - 2 * hamming / d`, the fraction of agreeing
+    signs mapped to [-1, 1]; they only rank a shortlist for rescoring.
+    """
+
+    name = "binary"
+
+    def __init__(self, dimension: int) -> None:
+        """Configure the quantizer.
+
+        Args:
+            dimension: Vector dimension.
+        """
+        self.dimension = dimension
+
+    @classmethod
+    def train(cls, vectors: np.ndarray) -> "BinaryQuantizer":
+        """Build a quantizer for a vector matrix (no parameters to fit).
+
+        Args:
+            vectors: Matrix to quantize.
+        Returns:
+            A BinaryQuantizer.
+        """
+        return cls(int(vectors.shape[1]))
+
+    def _pack(self, vectors: np.ndarray) -> np.ndarray:
+        """Pack sign bits, padded to a whole number of 16-bit words.
+
+        Args:
+            vectors: Matrix of vectors.
+        Returns:
+            A uint8 matrix of packed bits.
+        """
+        packed = np.packbits(np.asarray(vectors) > 0, axis=1)
+        if packed.shape[1] % 2:
+            packed = np.pad(packed, ((0, 0), (0, 1)))
+        return packed
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """Quantize vectors to packed sign bits.
+
+        Args:
+            vectors: Matrix to quantize.
+        Returns:
+            A uint8 matrix with ceil(d / 16) * 2 bytes per row.
+        """
+        width = (self.dimension + 15) // 16 * 2
+        codes = np.empty((vectors.shape[0], width), dtype=np.uint8)
+        for start in range(0, vectors.shape[0], _SCAN_BLOCK_ROWS):
+            block = vectors[start : start + _SCAN_BLOCK_ROWS]
+            codes[start : start + block.shape[0]] = self._pack(block)
+        return codes
+
+    def score(self, codes: np.ndarray, queries: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Estimate similarities from Hamming distances.
+
+        Args:
+            codes: Packed bit matrix.
+            queries: Query matrix of shape (m, d).
+            rows: Optional subset of code rows to score.
+        Returns:
+            A float32 matrix of shape (m, n) for the n scored rows.
+        """
+        n_rows = codes.shape[0] if rows is None else rows.shape[0]
+        query_words = self._pack(queries).view(np.uint16)
+        distances = np.empty((queries.shape[0], n_rows), dtype=np.int32)
+        for start in range(0, n_rows, _SCAN_BLOCK_ROWS):
+            block = np.ascontiguousarray(_rows(codes, rows, start, start + _SCAN_BLOCK_ROWS)).view(np.uint16)
+            for idx, words in enumerate(query_words):
+                distances[idx, start : start + block.shape[0]] = _POPCOUNT16[block ^ words].sum(axis=1, dtype=np.int32)
+        return 1.0 - 2.0 * distances.astype(np.float32) / self.dimension
+
+    def save(self, path: str) -> None:
+        """No-op: the binary quantizer has no parameters beyond the dimension.
+
+        Args:
+            path: Directory to write into.
+        """
+
+    @classmethod
+    def load(cls, path: str, dimension: int) -> Optional["BinaryQuantizer"]:
+        """Return a quantizer for the stored dimension.
+
+        Args:
+            path: Directory holding the index (unused).
+            dimension: Vector dimension.
+        Returns:
+            A BinaryQuantizer.
+        """
+        return cls(dimension)
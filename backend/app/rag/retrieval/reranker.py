@@ -1,23 +1,157 @@
 from __future__ import annotations
 
-from typing import List, Optional
+import os
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+import numpy as np
 from sentence_transformers import CrossEncoder
 
+from app.core.cache import TTLCache
+from app.rag.preprocess import normalize_whitespace
 from app.rag.retrieval.retriever import RetrievedChunk
 
 
+RERANK_BACKENDS = ("torch", "int8", "onnx", "onnx-int8")
+_SLUG_RE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def onnx_export_dir(vector_dir: str, model_name: str) -> str:
+    """Return the directory where a model's ONNX exports are kept.
+
+    Args:
+        vector_dir: Storage directory.
+        model_name: Model name or path.
+    Returns:
+        `<vector_dir>/onnx/<model slug>`.
+    """
+    return os.path.join(vector_dir, "onnx", _SLUG_RE.sub("_", model_name))
+
+
+class OnnxCrossEncoder:
+    """Cross-encoder run with ONNX Runtime, exposing `CrossEncoder.predict`.
+
+    The model is exported once to `export_dir` (and, for int8, dynamically
+    quantized there) and loaded from it on later starts. Requires the
+    `onnx` extra (`optimum[onnxruntime]`).
+    """
+
+    def __init__(self, model_name: str, export_dir: str, quantize: bool = False, max_length: Optional[int] = None) -> None:
+        """Export (if needed) and load the ONNX model.
+
+        Args:
+            model_name: Name or path of the cross-encoder model.
+            export_dir: Directory holding the exported fp32 and int8 models.
+            quantize: Whether to run the int8 dynamically quantized export.
+            max_length: Maximum tokens per (query, passage) pair; defaults to the model limit.
+        """
+        try:
+            from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+            from optimum.onnxruntime.configuration import AutoQuantizationConfig
+            from transformers import AutoTokenizer
+        except ImportError as exc:
+            raise RuntimeError("RERANK_BACKEND=onnx requires the onnx extra (pip install 'optimum[onnxruntime]')") from exc
+
+        fp32_dir = os.path.join(export_dir, "fp32")
+        if not os.path.exists(os.path.join(fp32_dir, "model.onnx")):
+            ORTModelForSequenceClassification.from_pretrained(model_name, export=True).save_pretrained(fp32_dir)
+            AutoTokenizer.from_pretrained(model_name).save_pretrained(fp32_dir)
+        model_dir, file_name = fp32_dir, "model.onnx"
+        if quantize:
+            model_dir, file_name = os.path.join(export_dir, "int8"), "model_quantized.onnx"
+            if not os.path.exists(os.path.join(model_dir, file_name)):
+                # avx2 kernels run on any x86-64 CPU this service targets; per-tensor keeps export fast.
+                config = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+                ORTQuantizer.from_pretrained(fp32_dir).quantize(save_dir=model_dir, quantization_config=config)
+
+        self._model = ORTModelForSequenceClassification.from_pretrained(model_dir, file_name=file_name)
+        self._tokenizer = AutoTokenizer.from_pretrained(fp32_dir)
+        self.max_length = max_length or min(self._tokenizer.model_max_length, 512)
+        # Mirror CrossEncoder's default activation: sigmoid for single-logit models.
+        self._sigmoid = self._model.config.num_labels == 1
+
+    def predict(self, pairs: Sequence[Tuple[str, str]], batch_size: int = 32, **_: Any) -> np.ndarray:
+        """Score (query, passage) pairs.
+
+        Args:
+            pairs: Pairs to score.
+            batch_size: Pairs per ONNX Runtime call.
+        Returns:
+            One score per pair.
+        """
+        scores: List[np.ndarray] = []
+        for start in range(0, len(pairs), batch_size):
+            batch = pairs[start : start + batch_size]
+            features = self._tokenizer(
+                [query for query, _ in batch],
+                [passage for _, passage in batch],
+                padding=True,
+                truncation="longest_first",
+                max_length=self.max_length,
+                return_tensors="np",
+            )
+            logits = np.asarray(self._model(**features).logits, dtype=np.float32)
+            if self._sigmoid:
+                logits = 1.0 / (1.0 + np.exp(-logits[:, 0]))
+            scores.append(logits)
+        return np.concatenate(scores) if scores else np.zeros(0, dtype=np.float32)
+
+
+def _load_cross_encoder(model_name: str, backend: str, max_length: Optional[int], export_dir: Optional[str]) -> Any:
+    """Load a cross-encoder for the requested inference backend.
+
+    Args:
+        model_name: Name or path of the cross-encoder model.
+        backend: One of `RERANK_BACKENDS`.
+        max_length: Maximum tokens per pair, or None for the model default.
+        export_dir: Directory for ONNX exports (ONNX backends only).
+    Returns:
+        An object with a CrossEncoder-compatible `predict`.
+    """
+    if backend == "torch":
+        return CrossEncoder(model_name, max_length=max_length)
+    if backend == "int8":
+        import torch
+
+        # Dynamic int8 quantization replaces the Linear layers, which dominate CPU time; CPU only.
+        model = CrossEncoder(model_name, max_length=max_length, device="cpu")
+        model.model = torch.quantization.quantize_dynamic(model.model, {torch.nn.Linear}, dtype=torch.qint8)
+        return model
+    if backend in ("onnx", "onnx-int8"):
+        if not export_dir:
+            raise RuntimeError("RERANK_BACKEND=onnx requires an export directory")
+        return OnnxCrossEncoder(model_name, export_dir, quantize=backend == "onnx-int8", max_length=max_length)
+    raise RuntimeError(f"Unsupported RERANK_BACKEND '{backend}'")
+
+
 class CrossEncoderReranker:
     """Rerank retrieved chunks using a cross-encoder model."""
 
-    def __init__(self, model_name: str) -> None:
+    def __init__(
+        self,
+        model_name: str,
+        score_cache: Optional[TTLCache] = None,
+        backend: str = "torch",
+        batch_size: int = 32,
+        max_length: Optional[int] = None,
+        export_dir: Optional[str] = None,
+    ) -> None:
         """Initialize the cross-encoder reranker.
 
         Args:
             model_name: Name or path of the cross-encoder model.
+            score_cache: Optional cache of scores keyed by (query, chunk id).
+            backend: Inference backend: torch (fp32), int8 (dynamic quantization),
+                onnx or onnx-int8 (ONNX Runtime).
+            batch_size: Pairs per forward pass.
+            max_length: Maximum tokens per (query, passage) pair; None keeps the model default.
+            export_dir: Where ONNX exports are written and reused.
         """
         self.model_name = model_name
-        self._model = CrossEncoder(model_name)
+        self.backend = backend
+        self.batch_size = batch_size
+        self._model = _load_cross_encoder(model_name, backend, max_length, export_dir)
+        self._score_cache = score_cache
 
     def rerank(self, query: str, chunks: List[RetrievedChunk]) -> List[RetrievedChunk]:
         """Score and rerank chunks by relevance to the query.
@@ -28,30 +162,98 @@ class CrossEncoderReranker:
         Returns:
             A list of chunks sorted by descending relevance.
         """
-        if not chunks:
-            return []
-        pairs = [(query, chunk.text) for chunk in chunks]
-        scores = self._model.predict(pairs)
-        reranked = [
-            RetrievedChunk(
-                id=chunk.id,
-                text=chunk.text,
-                metadata=chunk.metadata,
-                score=float(score),
+        return self.rerank_many([query], [chunks])[0]
+
+    def rerank_many(self, queries: List[str], chunk_lists: List[List[RetrievedChunk]]) -> List[List[RetrievedChunk]]:
+        """Rerank the chunks of many queries with a single model call.
+
+        Every (query, chunk) pair is scored in one `predict` batch, so the
+        cross-encoder runs at full batch efficiency. Pairs already in the
+        score cache, or repeated within the batch, are not scored again, and
+        the rest are ordered by passage length so each forward pass pads
+        similar-length inputs.
+
+        Args:
+            queries: Query texts.
+            chunk_lists: Retrieved chunks for each query.
+        Returns:
+            One list of chunks per query, sorted by descending relevance.
+        """
+        queries = [normalize_whitespace(query) for query in queries]
+        scores: Dict[Tuple[str, str], float] = {}
+        pending: Dict[Tuple[str, str], str] = {}
+        for query, chunks in zip(queries, chunk_lists):
+            for chunk in chunks:
+                key = (query, chunk.id)
+                if key in scores or key in pending:
+                    continue
+                cached = self._score_cache.get(key) if self._score_cache is not None else None
+                if cached is not None:
+                    scores[key] = cached
+                else:
+                    pending[key] = chunk.text
+        if pending:
+            ordered = sorted(pending, key=lambda key: len(pending[key]))
+            predicted = self._model.predict(
+                [(key[0], pending[key]) for key in ordered],
+                batch_size=self.batch_size,
+                show_progress_bar=False,
             )
-            for chunk, score in zip(chunks, scores)
-        ]
-        return sorted(reranked, key=lambda c: c.score, reverse=True)
+            for key, score in zip(ordered, predicted):
+                scores[key] = float(score)
+                if self._score_cache is not None:
+                    self._score_cache.set(key, scores[key])
+
+        results: List[List[RetrievedChunk]] = []
+        for query, chunks in zip(queries, chunk_lists):
+            reranked = [
+                RetrievedChunk(
+                    id=chunk.id,
+                    text=chunk.text,
+                    metadata=chunk.metadata,
+                    score=scores[(query, chunk.id)],
+                )
+                for chunk in chunks
+            ]
+            results.append(sorted(reranked, key=lambda c: c.score, reverse=True))
+        return results
+
+    def score_cache_stats(self) -> Dict[str, float]:
+        """Return hit/miss counters for the score cache.
+
+        Returns:
+            The score cache stats, or an empty dict when caching is disabled.
+        """
+        return self._score_cache.stats() if self._score_cache is not None else {}
 
 
-def build_reranker(model_name: Optional[str]) -> Optional[CrossEncoderReranker]:
+def build_reranker(
+    model_name: Optional[str],
+    score_cache: Optional[TTLCache] = None,
+    backend: str = "torch",
+    batch_size: int = 32,
+    max_length: Optional[int] = None,
+    export_dir: Optional[str] = None,
+) -> Optional[CrossEncoderReranker]:
     """Build a reranker when a model name is configured.
 
     Args:
         model_name: Reranker model name or None.
+        score_cache: Optional cache of scores keyed by (query, chunk id).
+        backend: Inference backend (see `RERANK_BACKENDS`).
+        batch_size: Pairs per forward pass.
+        max_length: Maximum tokens per pair, or None for the model default.
+        export_dir: Where ONNX exports are written and reused.
     Returns:
         A CrossEncoderReranker instance, or None if not configured.
     """
     if not model_name:
         return None
-    return CrossEncoderReranker(model_name)
+    return CrossEncoderReranker(
+        model_name,
+        score_cache=score_cache,
+        backend=backend,
+        batch_size=batch_size,
+        max_length=max_length,
+        export_dir=export_dir,
+    )
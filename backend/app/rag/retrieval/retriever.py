@@ -1,149 +1,376 @@
 from __future__ import annotations
 
-import pickle
-import re
-from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Optional
-
-import numpy as np
-from rank_bm25 import BM25Okapi
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
 from app.rag.embeddings import EmbeddingModel
-from app.rag.retrieval.vector_store import PineconeVectorStore
-
-
-_TOKEN_RE = re.compile(r"\b\w+\b")
+from app.rag.retrieval.bm25 import BM25Index
+from app.rag.retrieval.filters import MetadataFilter, merge_vocabularies
+from app.rag.retrieval.types import RetrievedChunk
+from app.rag.retrieval.vector_store import VectorStore
 
 
-def tokenize(text: str) -> List[str]:
-    """Tokenize text into lowercase word tokens.
-
-    Args:
-        text: Input text.
-    Returns:
-        A list of word tokens.
-    """
-    return _TOKEN_RE.findall(text.lower())
+logger = logging.getLogger(__name__)
 
+FUSION_METHODS = ("minmax", "rrf")
+JOB_COLLAPSE_MODES = ("none", "max", "sum")
 
-@dataclass
-class RetrievedChunk:
-    """Represents a retrieved document chunk with metadata and score."""
 
-    id: str
-    text: str
-    metadata: Dict[str, Any]
-    score: float
+class _Leg:
+    """A retrieval leg submitted to the thread pool.
 
+    Its deadline counts from when a worker starts running it, not from
+    submission, so time spent queued behind other requests' legs never
+    times it out. A leg that no worker has picked up when its result is
+    needed (or within its timeout, if it has one) is cancelled and run on
+    the calling thread instead.
+    """
 
-class BM25Index:
-    """BM25 index wrapper for lexical retrieval."""
-
-    def __init__(self, ids: List[str], texts: List[str], metadatas: List[Dict[str, Any]]):
-        """Initialize a BM25 index from documents and metadata.
+    def __init__(
+        self,
+        executor: ThreadPoolExecutor,
+        name: str,
+        fn: Callable[..., Any],
+        *args: Any,
+        **kwargs: Any,
+    ) -> None:
+        """Submit the leg.
 
         Args:
-            ids: Document IDs.
-            texts: Document texts.
-            metadatas: Document metadata entries.
+            executor: Pool running the leg.
+            name: Leg name, for timings and logging.
+            fn: Function computing the leg's results.
+            *args: Positional arguments for `fn`.
+            **kwargs: Keyword arguments for `fn`.
         """
-        self.ids = ids
-        self.texts = texts
-        self.metadatas = metadatas
-        self._tokens = [tokenize(text) for text in texts]
-        self._bm25 = BM25Okapi(self._tokens)
-
-    @classmethod
-    def load(cls, path: str) -> "BM25Index":
-        """Load a serialized BM25 index from disk.
+        self.name = name
+        self._fn = fn
+        self._args = args
+        self._kwargs = kwargs
+        self._started: Optional[float] = None
+        self._duration_ms: Optional[float] = None
+        self._picked = threading.Event()
+        self._future: Future = executor.submit(self._run)
+
+    def _run(self) -> Any:
+        """Run the leg, recording when it started and how long it took."""
+        self._started = time.monotonic()
+        self._picked.set()
+        result = self._fn(*self._args, **self._kwargs)
+        self._duration_ms = (time.monotonic() - self._started) * 1000
+        return result
+
+    def result(self, timeout: float, legs: Optional[Dict[str, float]] = None) -> Any:
+        """Wait for the leg until its deadline.
 
         Args:
-            path: Path to the pickled BM25 index.
+            timeout: Seconds allowed once the leg is running; 0 waits indefinitely.
+            legs: Optional dict receiving the leg's duration in milliseconds
+                under its name, when it completes in time.
         Returns:
-            A BM25Index instance.
+            The leg's results, or None if it missed its deadline.
         """
-        with open(path, "rb") as f:
-            data = pickle.load(f)
-        return cls(data["ids"], data["texts"], data["metadatas"])
-
-    def query(self, query: str, top_k: int) -> List[RetrievedChunk]:
-        """Query the BM25 index and return top-scoring chunks.
-
-        Args:
-            query: Query string.
-            top_k: Number of results to return.
-        Returns:
-            A list of retrieved chunks sorted by BM25 score.
-        """
-        tokens = tokenize(query)
-        scores = self._bm25.get_scores(tokens)
-        ranked = np.argsort(scores)[::-1][:top_k]
-        return [
-            RetrievedChunk(
-                id=self.ids[i],
-                text=self.texts[i],
-                metadata=self.metadatas[i],
-                score=float(scores[i]),
-            )
-            for i in ranked
-        ]
+        if timeout:
+            # A worker may not have taken a just-submitted leg yet; only a saturated pool leaves it queued this long.
+            self._picked.wait(timeout)
+        if self._future.cancel():
+            # No worker picked it up: run it here instead of waiting in the queue.
+            result = self._run()
+        elif not timeout:
+            result = self._future.result()
+        else:
+            # `_run` may not have stored its start time yet if a worker has only just taken it.
+            started = self._started if self._started is not None else time.monotonic()
+            try:
+                result = self._future.result(timeout=max(0.0, started + timeout - time.monotonic()))
+            except TimeoutError:
+                logger.warning("%s retrieval exceeded %.2fs; answering from the other leg", self.name, timeout)
+                return None
+        if legs is not None:
+            legs[self.name] = self._duration_ms
+        return result
 
 
 class Retriever:
-    """Hybrid retriever combining vector and BM25 search."""
+    """Hybrid retriever combining vector and BM25 search.
+
+    In hybrid mode each leg over-fetches `fetch_k` results, which are fused
+    (min-max score blend or reciprocal rank fusion) into the `top_k`
+    candidates passed on to reranking. The vector leg (query encoding plus
+    the vector store call) and the BM25 leg run concurrently on a shared
+    thread pool, or one of them on the calling thread when it has no
+    timeout, so latency is the slower leg rather than the sum. A leg's
+    timeout counts from when it starts running; a leg that exceeds it is
+    abandoned and the request is answered from the other leg. Metadata
+    filters are applied inside both legs, so the fused candidates all
+    satisfy them.
+
+    With job collapsing, chunks are grouped by posting (`job_id`) after
+    fusion and each job is represented by its best chunk, scored by the max
+    or sum of its chunk scores. Legs over-fetch `collapse_overfetch` times
+    their depth so the `top_k` candidates are distinct postings, and
+    reranking and generation are not spent on near-duplicate chunks.
+    """
 
     def __init__(
         self,
-        vector_store: PineconeVectorStore,
+        vector_store: VectorStore,
         embedding_model: EmbeddingModel,
         top_k: int = 5,
         bm25_index: Optional[BM25Index] = None,
         hybrid_alpha: float = 0.35,
+        max_workers: int = 0,
+        vector_timeout: float = 0.0,
+        bm25_timeout: float = 0.0,
+        fetch_k: int = 0,
+        fusion: str = "minmax",
+        rrf_k: int = 60,
+        collapse: str = "none",
+        collapse_overfetch: int = 3,
     ) -> None:
         """Initialize the retriever.
 
         Args:
             vector_store: Vector store used for semantic search.
             embedding_model: Embedding model for query encoding.
-            top_k: Default number of results to return.
+            top_k: Number of (fused) candidates returned.
             bm25_index: Optional BM25 index for hybrid retrieval.
             hybrid_alpha: Weight for BM25 scores in hybrid mode.
+            max_workers: Threads running pooled legs; size it to the expected number
+                of concurrent requests. 0 matches asyncio's default thread pool,
+                which bounds how many API requests retrieve at once.
+            vector_timeout: Seconds to wait for the running vector leg when BM25
+                returned results to fall back on; 0 waits indefinitely.
+            bm25_timeout: Seconds to wait for the running BM25 leg; 0 waits indefinitely.
+            fetch_k: Results fetched per leg in hybrid mode; 0 uses `top_k`.
+            fusion: Hybrid fusion method: "minmax" (blend of normalized scores)
+                or "rrf" (reciprocal rank fusion).
+            rrf_k: Rank offset for reciprocal rank fusion.
+            collapse: Job-level collapsing: "none", "max" (best chunk score per
+                job) or "sum" (summed chunk scores per job).
+            collapse_overfetch: Factor by which legs over-fetch chunks when
+                collapsing, to fill `top_k` distinct jobs.
         """
+        if fusion not in FUSION_METHODS:
+            raise RuntimeError(f"Unsupported HYBRID_FUSION '{fusion}'; expected one of {FUSION_METHODS}")
+        if collapse not in JOB_COLLAPSE_MODES:
+            raise RuntimeError(f"Unsupported JOB_COLLAPSE '{collapse}'; expected one of {JOB_COLLAPSE_MODES}")
         self.vector_store = vector_store
         self.embedding_model = embedding_model
         self.top_k = top_k
         self.bm25_index = bm25_index
         self.hybrid_alpha = hybrid_alpha
-
-    def retrieve(self, query: str, use_hybrid: bool = False) -> List[RetrievedChunk]:
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.vector_timeout = vector_timeout
+        self.bm25_timeout = bm25_timeout
+        self.fetch_k = max(fetch_k, top_k)
+        self.fusion = fusion
+        self.rrf_k = rrf_k
+        self.collapse = collapse
+        self.collapse_overfetch = max(1, collapse_overfetch) if collapse != "none" else 1
+        # Long-lived so an abandoned leg never blocks the request that gave up on it; it keeps its
+        # worker until done, which is why the pool is sized by request concurrency.
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="retrieval")
+
+    def retrieve(
+        self,
+        query: str,
+        use_hybrid: bool = False,
+        nprobe: Optional[int] = None,
+        timings: Optional[Dict[str, float]] = None,
+        filters: Optional[MetadataFilter] = None,
+    ) -> List[RetrievedChunk]:
         """Retrieve relevant chunks for a query.
 
+        Hybrid queries run both legs concurrently. Legs with a timeout go to
+        the pool; a leg without one runs on the calling thread (the vector
+        leg, when neither has a timeout). A timed-out BM25 leg leaves
+        vector-only results; the vector leg is only timed out when BM25
+        returned something to fall back on.
+
         Args:
             query: Query string.
             use_hybrid: Whether to combine vector and BM25 results.
+            nprobe: Optional ANN search breadth passed to the vector store.
+            timings: Optional dict receiving the duration in milliseconds of
+                each completed leg ("vector", "bm25").
+            filters: Optional metadata filter applied by both legs.
         Returns:
             A list of retrieved chunks.
         """
-        vector_results = self._vector_search(query, self.top_k)
+        legs: Dict[str, float] = {}
         if not use_hybrid or not self.bm25_index:
-            return vector_results
+            results = self._timed(
+                legs, "vector", self._vector_search, query, self.top_k * self.collapse_overfetch, nprobe, filters
+            )
+            if timings is not None:
+                timings.update(legs)
+            return self._collapse(results)
+
+        depth = self.fetch_k * self.collapse_overfetch
+        if self.vector_timeout and self.bm25_timeout:
+            vector_leg = _Leg(self._executor, "vector", self._vector_search, query, depth, nprobe, filters)
+            bm25_leg = _Leg(self._executor, "bm25", self.bm25_index.query, query, depth, filters)
+            # Each deadline counts from its own leg's start, so waiting on BM25 first costs the vector leg nothing.
+            bm25_results = bm25_leg.result(self.bm25_timeout, legs)
+            vector_results = vector_leg.result(self.vector_timeout if bm25_results else 0.0, legs)
+        elif self.vector_timeout:
+            vector_leg = _Leg(self._executor, "vector", self._vector_search, query, depth, nprobe, filters)
+            bm25_results = self._timed(legs, "bm25", self.bm25_index.query, query, depth, filters)
+            vector_results = vector_leg.result(self.vector_timeout if bm25_results else 0.0, legs)
+        else:
+            bm25_leg = _Leg(self._executor, "bm25", self.bm25_index.query, query, depth, filters)
+            vector_results = self._timed(legs, "vector", self._vector_search, query, depth, nprobe, filters)
+            bm25_results = bm25_leg.result(self.bm25_timeout, legs)
+        if timings is not None:
+            timings.update(legs)
+        if vector_results is None:
+            return self._collapse(self._merge_results([], bm25_results))
+        if bm25_results is None:
+            return self._collapse(vector_results)
+        return self._collapse(self._merge_results(vector_results, bm25_results))
+
+    @staticmethod
+    def _timed(legs: Dict[str, float], leg: str, fn: Callable[..., Any], *args: Any) -> Any:
+        """Call `fn` and record its duration.
 
-        bm25_results = self.bm25_index.query(query, self.top_k)
-        return self._merge_results(vector_results, bm25_results)
+        Args:
+            legs: Dict receiving the duration in milliseconds under `leg`.
+            leg: Leg name.
+            fn: Function to call.
+            *args: Positional arguments for `fn`.
+        Returns:
+            The result of `fn`.
+        """
+        start = time.perf_counter()
+        result = fn(*args)
+        legs[leg] = (time.perf_counter() - start) * 1000
+        return result
 
-    def _vector_search(self, query: str, top_k: int) -> List[RetrievedChunk]:
+    def _vector_search(
+        self,
+        query: str,
+        top_k: int,
+        nprobe: Optional[int] = None,
+        filters: Optional[MetadataFilter] = None,
+    ) -> List[RetrievedChunk]:
         """Run vector search against the vector store.
 
         Args:
             query: Query string.
             top_k: Number of results to return.
+            nprobe: Optional ANN search breadth passed to the vector store.
+            filters: Optional metadata filter passed to the vector store.
         Returns:
             A list of retrieved chunks from vector search.
         """
         query_embedding = self.embedding_model.embed_query([query])
-        results = self.vector_store.query(query_embedding, n_results=top_k)
+        results = self.vector_store.query(query_embedding, n_results=top_k, nprobe=nprobe, filters=filters)
         if not results:
             return []
+        return self._to_chunks(results[0])
+
+    def retrieve_many(
+        self,
+        queries: List[str],
+        use_hybrid: Optional[Sequence[bool]] = None,
+        nprobe: Optional[Sequence[Optional[int]]] = None,
+        filters: Optional[Sequence[Optional[MetadataFilter]]] = None,
+    ) -> List[List[RetrievedChunk]]:
+        """Retrieve chunks for many queries at once.
+
+        All queries are encoded in one `embed_query` call. BM25 lookups start
+        on the thread pool before encoding, and vector searches are issued as
+        one multi-query call per distinct (`nprobe`, filter) pair alongside
+        them. Legs still queued when their results are needed run on the
+        calling thread. BM25 legs are awaited first; a vector call is shared
+        by every query in its group, so it is only timed out when all of them
+        have BM25 results to fall back on.
+
+        Args:
+            queries: Query strings.
+            use_hybrid: Per-query flags for BM25 blending (default: all False).
+            nprobe: Per-query ANN search breadth (default: store setting).
+            filters: Per-query metadata filters (default: none).
+        Returns:
+            One result list per query, in input order.
+        """
+        if not queries:
+            return []
+        use_hybrid = list(use_hybrid) if use_hybrid is not None else [False] * len(queries)
+        nprobe = list(nprobe) if nprobe is not None else [None] * len(queries)
+        filters = list(filters) if filters is not None else [None] * len(queries)
+        hybrid_idx = [idx for idx, flag in enumerate(use_hybrid) if flag and self.bm25_index]
+        hybrid_depth = self.fetch_k * self.collapse_overfetch
+        vector_depth = self.top_k * self.collapse_overfetch
+        bm25_legs = {
+            idx: _Leg(self._executor, "bm25", self.bm25_index.query, queries[idx], hybrid_depth, filters[idx])
+            for idx in hybrid_idx
+        }
+        embeddings = self.embedding_model.embed_query(queries)
+
+        groups: Dict[Tuple[Optional[int], Optional[MetadataFilter]], List[int]] = {}
+        for idx, group in enumerate(zip(nprobe, filters)):
+            groups.setdefault(group, []).append(idx)
+        hybrid_set = set(hybrid_idx)
+        vector_legs = {
+            group: _Leg(
+                self._executor,
+                "vector",
+                self.vector_store.query,
+                [embeddings[idx] for idx in rows],
+                n_results=hybrid_depth if hybrid_set.intersection(rows) else vector_depth,
+                nprobe=group[0],
+                filters=group[1],
+            )
+            for group, rows in groups.items()
+        }
+        bm25_results: Dict[int, List[RetrievedChunk]] = {}
+        for idx, leg in bm25_legs.items():
+            results = leg.result(self.bm25_timeout)
+            if results is not None:
+                bm25_results[idx] = results
+        vector_results: List[List[RetrievedChunk]] = [[] for _ in queries]
+        for group, leg in vector_legs.items():
+            rows_idx = groups[group]
+            fallback = all(bm25_results.get(idx) for idx in rows_idx)
+            group_rows = leg.result(self.vector_timeout if fallback else 0.0)
+            if group_rows is None:
+                continue
+            for idx, rows in zip(rows_idx, group_rows):
+                vector_results[idx] = self._to_chunks(rows if idx in hybrid_set else rows[:vector_depth])
+
+        return [
+            self._collapse(
+                self._merge_results(vector_results[idx], bm25_results[idx]) if idx in bm25_results else vector_results[idx]
+            )
+            for idx in range(len(queries))
+        ]
+
+    def filter_vocabulary(self) -> Dict[str, List[str]]:
+        """Return the filterable metadata values of the vector store and BM25 index.
+
+        Returns:
+            Indexed values per filter field.
+        """
+        sources = [self.vector_store.metadata_vocabulary()]
+        if self.bm25_index:
+            sources.append(self.bm25_index.metadata_vocabulary())
+        return merge_vocabularies(sources)
+
+    @staticmethod
+    def _to_chunks(rows: List[Dict[str, Any]]) -> List[RetrievedChunk]:
+        """Convert vector store result rows into retrieved chunks.
+
+        Args:
+            rows: Result dicts with id, document, metadata, and score.
+        Returns:
+            A list of retrieved chunks.
+        """
         return [
             RetrievedChunk(
                 id=item["id"],
@@ -151,7 +378,7 @@ class Retriever:
                 metadata=item["metadata"],
                 score=float(item["score"]),
             )
-            for item in results[0]
+            for item in rows
         ]
 
     def _merge_results(
@@ -159,16 +386,24 @@ class Retriever:
         vector_results: List[RetrievedChunk],
         bm25_results: List[RetrievedChunk],
     ) -> List[RetrievedChunk]:
-        """Merge vector and BM25 results using normalized scores.
+        """Fuse vector and BM25 results, weighting BM25 by `hybrid_alpha`.
+
+        "minmax" blends min-max normalized scores. "rrf" uses reciprocal rank
+        fusion, `1 / (rrf_k + rank)` per leg, which ignores score scales and
+        so is robust to outliers in either leg.
 
         Args:
             vector_results: Results from vector search.
             bm25_results: Results from BM25 search.
         Returns:
-            A combined, score-normalized result list.
+            All fused results, best first.
         """
-        vector_scores = self._normalize([r.score for r in vector_results])
-        bm25_scores = self._normalize([r.score for r in bm25_results])
+        if self.fusion == "rrf":
+            vector_scores = self._reciprocal_ranks(len(vector_results))
+            bm25_scores = self._reciprocal_ranks(len(bm25_results))
+        else:
+            vector_scores = self._normalize([r.score for r in vector_results])
+            bm25_scores = self._normalize([r.score for r in bm25_results])
 
         combined: Dict[str, RetrievedChunk] = {}
         for idx, result in enumerate(vector_results):
@@ -191,9 +426,41 @@ class Retriever:
                     score=score,
                 )
 
-        ranked = sorted(combined.values(), key=lambda r: r.score, reverse=True)
+        return sorted(combined.values(), key=lambda r: r.score, reverse=True)
+
+    def _collapse(self, results: List[RetrievedChunk]) -> List[RetrievedChunk]:
+        """Keep the best chunk per job and cut the list to `top_k`.
+
+        Args:
+            results: Chunks sorted by descending score.
+        Returns:
+            Up to `top_k` results; one per job, scored by the collapse mode,
+            when collapsing is enabled.
+        """
+        if self.collapse == "none":
+            return results[: self.top_k]
+        jobs: Dict[str, RetrievedChunk] = {}
+        for result in results:
+            job_id = str(result.metadata.get("job_id") or result.id.rsplit("-", 1)[0])
+            best = jobs.get(job_id)
+            if best is None:
+                # A copy, since results may be shared with the candidate cache.
+                jobs[job_id] = RetrievedChunk(id=result.id, text=result.text, metadata=result.metadata, score=result.score)
+            elif self.collapse == "sum":
+                best.score += result.score
+        ranked = sorted(jobs.values(), key=lambda r: r.score, reverse=True)
         return ranked[: self.top_k]
 
+    def _reciprocal_ranks(self, count: int) -> List[float]:
+        """Return reciprocal rank fusion scores for a ranked list.
+
+        Args:
+            count: Length of the ranked list.
+        Returns:
+            `1 / (rrf_k + rank)` for ranks 1..count.
+        """
+        return [1.0 / (self.rrf_k + rank) for rank in range(1, count + 1)]
+
     @staticmethod
     def _normalize(scores: Iterable[float]) -> List[float]:
         """Normalize a list of scores to the [0, 1] range.
@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict
+
+
+@dataclass
+class RetrievedChunk:
+    """Represents a retrieved document chunk with metadata and score."""
+
+    id: str
+    text: str
+    metadata: Dict[str, Any]
+    score: float
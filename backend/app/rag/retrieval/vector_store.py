@@ -1,9 +1,16 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Union
 
+import numpy as np
 from pinecone import Pinecone, ServerlessSpec
 
+from app.core.config import Settings
+from app.rag.retrieval.filters import MetadataFilter
+from app.rag.retrieval.local_store import LocalVectorStore
+
 
 class PineconeVectorStore:
     """Pinecone-backed vector store abstraction."""
@@ -16,6 +23,7 @@ class PineconeVectorStore:
         region: str,
         metric: str = "cosine",
         dimension: Optional[int] = None,
+        query_concurrency: int = 8,
     ) -> None:
         """Initialize the Pinecone vector store.
 
@@ -26,6 +34,7 @@ class PineconeVectorStore:
             region: Pinecone region.
             metric: Similarity metric (e.g., "cosine").
             dimension: Embedding dimension (required if creating the index).
+            query_concurrency: Parallel requests used when querying many vectors at once.
         """
         if not api_key:
             raise RuntimeError("PINECONE_API_KEY is not configured")
@@ -34,6 +43,7 @@ class PineconeVectorStore:
         self._pc = Pinecone(api_key=api_key)
         self._index_name = index_name
         self._metric = metric
+        self._query_concurrency = max(1, query_concurrency)
         self._ensure_index(index_name, cloud, region, dimension)
         self._index = self._pc.Index(index_name)
 
@@ -110,46 +120,102 @@ class PineconeVectorStore:
         for idx, vector_id in enumerate(ids):
             metadata = dict(metadatas[idx]) if idx < len(metadatas) else {}
             metadata["document"] = documents[idx] if idx < len(documents) else ""
-            vectors.append((vector_id, embeddings[idx], metadata))
+            vectors.append((vector_id, np.asarray(embeddings[idx], dtype=float).tolist(), metadata))
         self._index.upsert(vectors=vectors)
 
-    def query(self, query_embeddings: List[List[float]], n_results: int) -> List[List[Dict[str, Any]]]:
+    def delete(self, ids: List[str], batch_size: int = 1000) -> None:
+        """Delete vectors by ID.
+
+        Args:
+            ids: Vector IDs to delete.
+            batch_size: Maximum IDs per delete request.
+        """
+        for start in range(0, len(ids), batch_size):
+            self._index.delete(ids=ids[start : start + batch_size])
+
+    def flush(self) -> None:
+        """No-op: Pinecone persists upserts server-side."""
+
+    def query(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int,
+        nprobe: Optional[int] = None,
+        filters: Optional[MetadataFilter] = None,
+    ) -> List[List[Dict[str, Any]]]:
         """Query the index for nearest neighbors.
 
         Args:
             query_embeddings: Query vectors.
             n_results: Number of results per query.
+            nprobe: Ignored; Pinecone tunes its own ANN search.
+            filters: Optional metadata filter, applied server-side by Pinecone.
         Returns:
             A list of result lists with id, document, metadata, and score.
         """
-        if not query_embeddings:
+        if len(query_embeddings) == 0:
             return []
-        hits: List[List[Dict[str, Any]]] = []
-        for embedding in query_embeddings:
-            response = self._index.query(
-                vector=embedding,
-                top_k=n_results,
-                include_metadata=True,
+        metadata_filter = filters.to_pinecone() if filters is not None and not filters.is_empty() else None
+        if len(query_embeddings) == 1 or self._query_concurrency == 1:
+            return [self._query_one(embedding, n_results, metadata_filter) for embedding in query_embeddings]
+        # Pinecone takes one vector per request, so batches fan out over a small thread pool.
+        workers = min(self._query_concurrency, len(query_embeddings))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(
+                executor.map(lambda embedding: self._query_one(embedding, n_results, metadata_filter), query_embeddings)
             )
-            row: List[Dict[str, Any]] = []
-            if isinstance(response, dict):
-                matches = response.get("matches", [])
-            else:
-                matches = getattr(response, "matches", [])
-            for match in matches:
-                if not isinstance(match, dict):
-                    match = match.to_dict() if hasattr(match, "to_dict") else {"id": getattr(match, "id", "")}
-                metadata = match.get("metadata") or {}
-                row.append(
-                    {
-                        "id": match.get("id", ""),
-                        "document": metadata.get("document", ""),
-                        "metadata": metadata,
-                        "score": float(match.get("score", 0.0)),
-                    }
-                )
-            hits.append(row)
-        return hits
+
+    def _query_one(
+        self,
+        embedding: List[float],
+        n_results: int,
+        metadata_filter: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Query the index with a single vector.
+
+        Args:
+            embedding: Query vector.
+            n_results: Number of results.
+            metadata_filter: Optional Pinecone metadata filter.
+        Returns:
+            Result dicts with id, document, metadata, and score.
+        """
+        kwargs: Dict[str, Any] = {"filter": metadata_filter} if metadata_filter else {}
+        response = self._index.query(
+            vector=np.asarray(embedding, dtype=float).tolist(),
+            top_k=n_results,
+            include_metadata=True,
+            **kwargs,
+        )
+        row: List[Dict[str, Any]] = []
+        if isinstance(response, dict):
+            matches = response.get("matches", [])
+        else:
+            matches = getattr(response, "matches", [])
+        for match in matches:
+            if not isinstance(match, dict):
+                match = match.to_dict() if hasattr(match, "to_dict") else {"id": getattr(match, "id", "")}
+            metadata = match.get("metadata") or {}
+            row.append(
+                {
+                    "id": match.get("id", ""),
+                    "document": metadata.get("document", ""),
+                    "metadata": metadata,
+                    "score": float(match.get("score", 0.0)),
+                }
+            )
+        return row
+
+    def metadata_vocabulary(self) -> Dict[str, List[str]]:
+        """Return the filterable metadata values known to the store.
+
+        Pinecone cannot enumerate metadata values, so this is always empty;
+        filter extraction then relies on the BM25 index vocabulary.
+
+        Returns:
+            An empty mapping.
+        """
+        return {}
 
     def count(self) -> int:
         """Return the number of vectors in the index.
@@ -161,3 +227,44 @@ class PineconeVectorStore:
         if isinstance(stats, dict):
             return int(stats.get("total_vector_count", 0))
         return int(getattr(stats, "total_vector_count", 0))
+
+
+VectorStore = Union[PineconeVectorStore, LocalVectorStore]
+
+
+def build_vector_store(
+    settings: Settings,
+    dimension: Optional[int] = None,
+    index_name: Optional[str] = None,
+) -> VectorStore:
+    """Build the vector store backend selected by `VECTOR_BACKEND`.
+
+    Args:
+        settings: Application settings.
+        dimension: Embedding dimension (required to create a Pinecone index).
+        index_name: Optional Pinecone index name overriding the settings.
+    Returns:
+        A PineconeVectorStore or LocalVectorStore instance.
+    """
+    backend = settings.vector_backend.lower()
+    if backend == "local":
+        return LocalVectorStore(
+            path=os.path.join(settings.vector_dir, "local_index"),
+            dimension=dimension,
+            dtype=settings.local_vector_dtype,
+            index_type=settings.local_index_type,
+            nlist=settings.ivf_nlist,
+            nprobe=settings.ivf_nprobe,
+            rescore_candidates=settings.local_rescore_candidates,
+        )
+    if backend != "pinecone":
+        raise RuntimeError(f"Unsupported VECTOR_BACKEND '{settings.vector_backend}'")
+    return PineconeVectorStore(
+        api_key=settings.pinecone_api_key,
+        index_name=index_name or settings.pinecone_index,
+        cloud=settings.pinecone_cloud,
+        region=settings.pinecone_region,
+        metric=settings.pinecone_metric,
+        dimension=dimension,
+        query_concurrency=settings.vector_query_concurrency,
+    )
@@ -1,10 +1,21 @@
 from __future__ import annotations
 
+from datetime import date
 from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
 
+class JobFilters(BaseModel):
+    """Metadata filters restricting which postings a query searches."""
+
+    level: List[str] = Field(default_factory=list)
+    location: List[str] = Field(default_factory=list)
+    category: List[str] = Field(default_factory=list)
+    published_since: Optional[date] = Field(default=None)
+    published_before: Optional[date] = Field(default=None)
+
+
 class QueryRequest(BaseModel):
     """Request payload for job search queries."""
 
@@ -12,6 +23,10 @@ class QueryRequest(BaseModel):
     top_k: Optional[int] = Field(default=None, ge=1, le=20)
     use_hybrid: Optional[bool] = Field(default=None)
     use_rerank: Optional[bool] = Field(default=None)
+    nprobe: Optional[int] = Field(default=None, ge=1, le=4096)
+    latency_budget_ms: Optional[int] = Field(default=None, ge=1, le=60000)
+    filters: Optional[JobFilters] = Field(default=None)
+    extract_filters: Optional[bool] = Field(default=None)
 
 
 class JobHit(BaseModel):
@@ -31,3 +46,16 @@ class QueryResponse(BaseModel):
 
     answer: str
     hits: List[JobHit]
+
+
+class BatchQueryRequest(BaseModel):
+    """Request payload for running many job search queries at once."""
+
+    queries: List[QueryRequest] = Field(..., min_length=1)
+    generate: bool = Field(default=False)
+
+
+class BatchQueryResponse(BaseModel):
+    """Response payload with one result per query in the batch."""
+
+    results: List[QueryResponse]
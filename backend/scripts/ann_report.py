@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from typing import List
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.rag.retrieval import LocalVectorStore
+from app.rag.retrieval.ann import IVFIndex
+
+
+def _load_queries(store: LocalVectorStore, queries_path: str | None, n_queries: int, seed: int) -> np.ndarray:
+    """Build the query matrix for the report.
+
+    Args:
+        store: Local vector store whose vectors are searched.
+        queries_path: Optional text file with one query per line to embed.
+        n_queries: Number of stored vectors to sample when no file is given.
+        seed: Random seed for sampling.
+    Returns:
+        A float32 matrix of unit-length query vectors.
+    """
+    if queries_path:
+        from app.rag.embeddings import EmbeddingModel
+
+        settings = get_settings()
+        with open(queries_path, "r", encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+        embedder = EmbeddingModel(settings.embedding_model, settings.embedding_batch_size)
+        queries = np.asarray(embedder.embed_query(texts), dtype=np.float32)
+    else:
+        rng = np.random.default_rng(seed)
+        rows = np.sort(rng.choice(store.count(), size=min(n_queries, store.count()), replace=False))
+        queries = np.asarray(store.vectors[rows], dtype=np.float32)
+    norms = np.linalg.norm(queries, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return queries / norms
+
+
+def _exact_top_k(matrix: np.ndarray, query: np.ndarray, k: int) -> np.ndarray:
+    """Return the exact top-k rows for a query.
+
+    Args:
+        matrix: Vector matrix.
+        query: Unit-length query vector.
+        k: Number of neighbours.
+    Returns:
+        Row indices of the exact nearest neighbours.
+    """
+    scores = np.asarray(matrix, dtype=np.float32) @ query
+    k = min(k, scores.shape[0])
+    return np.argpartition(-scores, k - 1)[:k]
+
+
+def run_report(vector_dir: str, k: int, nprobes: List[int], nlist: int, queries_path: str | None, n_queries: int) -> None:
+    """Print recall@k and latency for a range of `nprobe` values.
+
+    Args:
+        vector_dir: Directory holding `local_index/`.
+        k: Neighbours per query.
+        nprobes: `nprobe` values to evaluate.
+        nlist: Train a fresh IVF with this many lists; 0 uses the saved index.
+        queries_path: Optional text file of queries to embed.
+        n_queries: Number of sampled queries when no file is given.
+    """
+    path = os.path.join(vector_dir, "local_index")
+    store = LocalVectorStore(path)
+    if store.count() == 0:
+        raise SystemExit(f"No local index found at {path}; run build_index.py with VECTOR_BACKEND=local.")
+    matrix = store.vectors
+
+    ivf = None if nlist else IVFIndex.load(path)
+    if ivf is None or ivf.size != store.count():
+        start = time.perf_counter()
+        ivf = IVFIndex.train(matrix, nlist=nlist)
+        print(f"Trained IVF with nlist={ivf.nlist} in {time.perf_counter() - start:.1f}s")
+
+    queries = _load_queries(store, queries_path, n_queries, seed=0)
+    truth = [set(_exact_top_k(matrix, q, k).tolist()) for q in queries]
+
+    exact_latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        _exact_top_k(matrix, query, k)
+        exact_latencies.append(time.perf_counter() - start)
+
+    print(f"{store.count()} vectors, {len(queries)} queries, nlist={ivf.nlist}, k={k}")
+    print(f"exact     recall@{k}=1.000  p50={np.percentile(exact_latencies, 50) * 1e3:.3f}ms  "
+          f"p99={np.percentile(exact_latencies, 99) * 1e3:.3f}ms")
+    for nprobe in nprobes:
+        latencies = []
+        hits = 0
+        for query, expected in zip(queries, truth):
+            start = time.perf_counter()
+            rows, _ = ivf.search(matrix, query[None, :], k, nprobe)[0]
+            latencies.append(time.perf_counter() - start)
+            hits += len(expected.intersection(rows.tolist()))
+        recall = hits / max(1, sum(len(t) for t in truth))
+        print(f"nprobe={nprobe:<4} recall@{k}={recall:.3f}  p50={np.percentile(latencies, 50) * 1e3:.3f}ms  "
+              f"p99={np.percentile(latencies, 99) * 1e3:.3f}ms")
+
+
+def main() -> None:
+    """CLI entry point for the ANN recall/latency report."""
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Report IVF recall@k and latency against exact search.")
+    parser.add_argument("--vector-dir", default=settings.vector_dir, help="Vector store directory")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per query")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64], help="nprobe values")
+    parser.add_argument("--nlist", type=int, default=0, help="Train a fresh IVF with this many lists (0 = saved index)")
+    parser.add_argument("--queries", default=None, help="Optional text file with one query per line")
+    parser.add_argument("--n-queries", type=int, default=200, help="Sampled stored vectors used as queries")
+    args = parser.parse_args()
+
+    run_report(args.vector_dir, args.k, args.nprobe, args.nlist, args.queries, args.n_queries)
+
+
+if __name__ == "__main__":
+    main()
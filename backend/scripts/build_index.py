@@ -3,81 +3,140 @@ from __future__ import annotations
 import argparse
 import os
 import pickle
-from dataclasses import dataclass
-from typing import Dict, List
+import tempfile
+import time
+from typing import BinaryIO, Dict, Iterator, List, Optional
 
-import pandas as pd
 from tqdm import tqdm
 
-from app.core.config import get_settings
-from app.rag.embeddings import EmbeddingModel
-from app.rag.preprocess import chunk_text, clean_html
-from app.rag.retrieval import PineconeVectorStore
+from app.core.config import Settings, get_settings
+from app.rag.embeddings import EmbeddingModel, PassageEmbeddingCache
+from app.rag.ingest import (
+    METADATA_VERSION,
+    BuildManifest,
+    ChunkBatch,
+    IncrementalChunker,
+    PipelinedWriter,
+    StageStats,
+    iter_prepared_jobs,
+    iter_raw_jobs,
+    prefetch,
+    timed,
+)
+from app.rag.retrieval import BM25Index, build_vector_store
 
 
-@dataclass
-class JobRecord:
-    """Structured job record parsed from the CSV dataset."""
+CHUNK_MAX_CHARS = 1200
+CHUNK_OVERLAP = 200
 
-    job_id: str
-    job_category: str
-    job_title: str
-    company: str
-    publication_date: str
-    location: str
-    level: str
-    tags: str
-    description: str
 
-
-def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
-    """Strip whitespace from column names.
+def _build_fingerprint(settings: Settings, index_name: str) -> str:
+    """Describe the build configuration that all indexed vectors depend on.
 
     Args:
-        df: Input dataframe.
+        settings: Application settings.
+        index_name: Pinecone index name.
     Returns:
-        A copy of the dataframe with normalized column names.
+        A fingerprint string stored in the manifest.
+    """
+    backend = settings.vector_backend.lower()
+    target = index_name if backend == "pinecone" else os.path.abspath(settings.vector_dir)
+    return (
+        f"{settings.embedding_model}|{backend}:{target}|chunks:{CHUNK_MAX_CHARS}/{CHUNK_OVERLAP}"
+        f"|metadata:v{METADATA_VERSION}"
+    )
+
+
+def _read_spool(spool: BinaryIO) -> Iterator[ChunkBatch]:
+    """Replay chunk batches pickled into a spool file.
+
+    Args:
+        spool: File object the batches were pickled into.
+    Yields:
+        ChunkBatch instances in write order.
     """
-    df = df.copy()
-    df.columns = [col.strip() for col in df.columns]
-    return df
+    spool.seek(0)
+    while True:
+        try:
+            yield pickle.load(spool)
+        except EOFError:
+            return
+
+
+def _spooled_records(spool: BinaryIO) -> Iterator[tuple]:
+    """Replay spooled chunks one at a time, keeping the last copy of each ID.
+
+    A first pass over the spool reads only the IDs, so chunk texts are never
+    all held in memory.
+
+    Args:
+        spool: File object the chunk batches were pickled into.
+    Yields:
+        (id, text, metadata) tuples in write order.
+    """
+    last: Dict[str, int] = {}
+    position = 0
+    for batch in _read_spool(spool):
+        for chunk_id in batch.ids:
+            last[chunk_id] = position
+            position += 1
+    position = 0
+    for batch in _read_spool(spool):
+        for record in zip(batch.ids, batch.documents, batch.metadatas):
+            if last[record[0]] == position:
+                yield record
+            position += 1
+
 
+def _update_bm25_index(index_dir: str, legacy_path: str, stale_ids: List[str], spool: BinaryIO) -> BM25Index:
+    """Apply a build diff to the compiled BM25 index.
 
-def load_jobs(path: str) -> List[JobRecord]:
-    """Load job records from a CSV file.
+    Only the upserted chunks are tokenized, streamed from the spool into a
+    segment that is merged into the saved index (or a legacy `bm25.pkl`
+    docstore, on the first run after upgrading); unchanged chunks are
+    carried over without re-tokenizing.
 
     Args:
-        path: Path to the CSV dataset.
+        index_dir: Directory of the compiled index (`bm25/`).
+        legacy_path: Path to a pickled docstore written by older builds.
+        stale_ids: Chunk IDs to remove.
+        spool: File object the upserted chunk batches were pickled into.
     Returns:
-        A list of JobRecord entries.
+        The updated index, saved to `index_dir`.
     """
-    df = _normalize_columns(pd.read_csv(path))
-    records: List[JobRecord] = []
-    for _, row in df.iterrows():
-        description = clean_html(str(row.get("Job Description", "")))
-        records.append(
-            JobRecord(
-                job_id=str(row.get("ID", "")),
-                job_category=str(row.get("Job Category", "")),
-                job_title=str(row.get("Job Title", "")),
-                company=str(row.get("Company Name", "")),
-                publication_date=str(row.get("Publication Date", "")),
-                location=str(row.get("Job Location", "")),
-                level=str(row.get("Job Level", "")),
-                tags=str(row.get("Tags", "")),
-                description=description,
-            )
-        )
-    return records
+    segment = BM25Index.from_records(_spooled_records(spool))
+    if os.path.isdir(index_dir):
+        index = BM25Index.load(index_dir).merge(segment, stale_ids)
+    elif os.path.exists(legacy_path):
+        index = BM25Index.load(legacy_path).merge(segment, stale_ids)
+    else:
+        index = segment
+    index.save(index_dir)
+    return index
+
 
+def build_index(
+    data_path: str,
+    vector_dir: str,
+    index_name: str,
+    use_embedding_cache: bool = True,
+    full_rebuild: bool = False,
+    workers: Optional[int] = None,
+) -> None:
+    """Build or incrementally update vector and BM25 indexes from job data.
 
-def build_index(data_path: str, vector_dir: str, index_name: str) -> None:
-    """Build Pinecone and BM25 indexes from job data.
+    The CSV is streamed in chunks and embedding starts on the first changed
+    rows. Jobs whose content hash matches the build manifest are skipped;
+    added or modified jobs are re-chunked and upserted, and chunk IDs that no
+    longer exist (removed jobs, shrunken descriptions) are deleted.
 
     Args:
         data_path: Path to the CSV dataset.
         vector_dir: Directory for vector/BM25 artifacts.
-        index_name: Name of the Pinecone index to use.
+        index_name: Name of the Pinecone index to use (ignored by the local backend).
+        use_embedding_cache: Reuse passage embeddings cached by previous runs.
+        full_rebuild: Ignore the manifest and re-index every job.
+        workers: Processes used for HTML cleaning and chunking (defaults to `INGEST_WORKERS`).
     """
     os.makedirs(vector_dir, exist_ok=True)
     settings = get_settings()
@@ -85,54 +144,100 @@ def build_index(data_path: str, vector_dir: str, index_name: str) -> None:
         settings.embedding_model,
         settings.embedding_batch_size,
     )
-    vector_store = PineconeVectorStore(
-        api_key=settings.pinecone_api_key,
-        index_name=index_name,
-        cloud=settings.pinecone_cloud,
-        region=settings.pinecone_region,
-        metric=settings.pinecone_metric,
-        dimension=embedder.dimension(),
+    settings = settings.model_copy(update={"vector_dir": vector_dir})
+    dimension = embedder.dimension()
+    vector_store = build_vector_store(settings, dimension=dimension, index_name=index_name)
+    embedding_cache = (
+        PassageEmbeddingCache(os.path.join(vector_dir, "embedding_cache"), settings.embedding_model, dimension)
+        if use_embedding_cache
+        else None
     )
 
-    ids: List[str] = []
-    documents: List[str] = []
-    metadatas: List[Dict[str, str]] = []
-
-    jobs = load_jobs(data_path)
-    for job in tqdm(jobs, desc="Chunking jobs"):
-        if not job.description:
-            continue
-        chunks = chunk_text(job.description)
-        for idx, chunk in enumerate(chunks):
-            chunk_id = f"{job.job_id}-{idx}"
-            ids.append(chunk_id)
-            documents.append(chunk)
-            metadatas.append(
-                {
-                    "job_id": job.job_id,
-                    "job_title": job.job_title,
-                    "company": job.company,
-                    "location": job.location,
-                    "level": job.level,
-                    "category": job.job_category,
-                    "tags": job.tags,
-                    "publication_date": job.publication_date,
-                }
-            )
+    manifest_path = os.path.join(vector_dir, "manifest.json")
+    fingerprint = _build_fingerprint(settings, index_name)
+    manifest = BuildManifest.load(manifest_path, fingerprint)
+    if full_rebuild:
+        # Keep the old chunk IDs so stale ones are still deleted, but force every job to re-index
+        # (as a fingerprint mismatch does).
+        for entry in manifest.jobs.values():
+            entry.content_hash = ""
+
+    # Stages: CSV chunks -> clean/chunk (optionally a process pool) -> diff/batch (background
+    # thread) -> embed -> upsert (writer threads). Bounded queues between stages keep memory flat.
+    chunker = IncrementalChunker(manifest)
+    prepared = iter_prepared_jobs(
+        iter_raw_jobs(data_path, chunksize=settings.ingest_csv_chunksize),
+        max_chars=CHUNK_MAX_CHARS,
+        overlap=CHUNK_OVERLAP,
+        workers=workers if workers is not None else settings.ingest_workers,
+        chunksize=settings.ingest_pool_chunksize,
+    )
+    chunk_stats = StageStats("clean+chunk")
+    embed_stats = StageStats("embed")
+    batches = prefetch(
+        timed(chunker.batches(prepared, settings.embedding_batch_size), chunk_stats),
+        maxsize=settings.ingest_queue_size,
+        name="chunk-stage",
+    )
+    # Upserts run on their own threads with their own batch size, overlapping with encoding.
+    writer = PipelinedWriter(
+        vector_store,
+        batch_size=settings.upsert_batch_size,
+        concurrency=settings.upsert_concurrency,
+    )
 
-    for i in tqdm(range(0, len(documents), settings.embedding_batch_size), desc="Embedding"):
-        batch_docs = documents[i : i + settings.embedding_batch_size]
-        batch_ids = ids[i : i + settings.embedding_batch_size]
-        batch_meta = metadatas[i : i + settings.embedding_batch_size]
-        embeddings = embedder.embed(batch_docs)
-        vector_store.upsert(batch_ids, embeddings, batch_docs, batch_meta)
+    # Upserted chunks are spooled to disk for the BM25 update rather than kept in memory.
+    bm25_spool = tempfile.TemporaryFile(dir=vector_dir)
+    upserted = 0
+    started = time.perf_counter()
+    try:
+        for batch in tqdm(batches, desc="Embedding", unit="batch"):
+            embed_start = time.perf_counter()
+            if embedding_cache is not None:
+                embeddings = embedding_cache.embed(embedder, batch.documents)
+            else:
+                embeddings = embedder.embed(batch.documents)
+            embed_stats.record(len(batch), time.perf_counter() - embed_start)
+            writer.write(batch.ids, embeddings, batch.documents, batch.metadatas)
+            pickle.dump(batch, bm25_spool, protocol=pickle.HIGHEST_PROTOCOL)
+            upserted += len(batch)
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - started
 
-    bm25_path = os.path.join(vector_dir, "bm25.pkl")
-    with open(bm25_path, "wb") as f:
-        pickle.dump({"ids": ids, "texts": documents, "metadatas": metadatas}, f)
+    diff = chunker.diff
+    if diff.stale_chunk_ids:
+        vector_store.delete(diff.stale_chunk_ids)
+    if upserted or diff.stale_chunk_ids:
+        vector_store.flush()
+    if embedding_cache is not None:
+        embedding_cache.flush()
+        print(f"Embedding cache: {embedding_cache.hits} reused, {embedding_cache.misses} encoded.")
 
-    print(f"Indexed {len(ids)} chunks into {index_name}.")
-    print(f"BM25 index saved to {bm25_path}.")
+    # The compiled, memory-mapped index in bm25/ is both what the API serves and the docstore
+    # later builds merge into.
+    bm25_index_dir = os.path.join(vector_dir, "bm25")
+    with bm25_spool:
+        if upserted or diff.stale_chunk_ids or not os.path.isdir(bm25_index_dir):
+            bm25_index = _update_bm25_index(
+                bm25_index_dir,
+                os.path.join(vector_dir, "bm25.pkl"),
+                diff.stale_chunk_ids,
+                bm25_spool,
+            )
+            print(f"BM25 index saved to {bm25_index_dir} ({len(bm25_index)} chunks).")
+        else:
+            print(f"BM25 index at {bm25_index_dir} is up to date.")
+    BuildManifest(fingerprint, chunker.current).save(manifest_path)
+
+    target = index_name if settings.vector_backend.lower() == "pinecone" else vector_store.path
+    print(
+        f"Jobs: {len(diff.changed)} added/modified, {diff.unchanged} unchanged, {diff.removed} removed."
+    )
+    print(f"Upserted {upserted} chunks and deleted {len(diff.stale_chunk_ids)} stale chunks in {target}.")
+    for stats in (chunk_stats, embed_stats, writer.stats):
+        print(f"  {stats.summary()}")
+    print(f"  overall: {upserted / elapsed if elapsed > 0 else 0.0:.1f} chunks/s over {elapsed:.1f}s wall")
 
 
 def main() -> None:
@@ -142,9 +247,32 @@ def main() -> None:
     parser.add_argument("--data", default=settings.data_path, help="Path to CSV dataset")
     parser.add_argument("--vector-dir", default=settings.vector_dir, help="Vector store directory")
     parser.add_argument("--index", default=settings.pinecone_index, help="Pinecone index name")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Ignore the build manifest and re-index every job",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.ingest_workers,
+        help="Processes used for HTML cleaning and chunking (1 = in-process)",
+    )
+    parser.add_argument(
+        "--no-embedding-cache",
+        action="store_true",
+        help="Re-encode every chunk instead of reusing cached passage embeddings",
+    )
     args = parser.parse_args()
 
-    build_index(args.data, args.vector_dir, args.index)
+    build_index(
+        args.data,
+        args.vector_dir,
+        args.index,
+        use_embedding_cache=not args.no_embedding_cache,
+        full_rebuild=args.full,
+        workers=args.workers,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import List
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.rag.embeddings import EmbeddingModel
+from app.rag.embeddings.backends import QUERY_BACKENDS
+from app.rag.ingest.loader import iter_raw_jobs
+from app.rag.retrieval import build_vector_store
+from app.rag.retrieval.reranker import onnx_export_dir
+
+
+def _load_queries(queries_path: str | None, data_path: str, n_queries: int, seed: int) -> List[str]:
+    """Build the query list for the report.
+
+    Args:
+        queries_path: Optional text file with one query per line.
+        data_path: Dataset CSV whose job titles and locations are sampled when no file is given.
+        n_queries: Number of sampled queries when no file is given.
+        seed: Random seed for sampling.
+    Returns:
+        Query strings.
+    """
+    if queries_path:
+        with open(queries_path, "r", encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip()]
+    titles = sorted({f"{job.job_title} {job.location}".strip() for job in iter_raw_jobs(data_path) if job.job_title})
+    random.Random(seed).shuffle(titles)
+    return titles[:n_queries]
+
+
+def _encode_one_by_one(model: EmbeddingModel, queries: List[str]) -> tuple[np.ndarray, List[float]]:
+    """Embed queries one at a time, as the API does, timing every call.
+
+    Args:
+        model: Embedding model under test (built without a query cache).
+        queries: Query strings.
+    Returns:
+        A tuple of (embedding matrix, per-query latency in seconds).
+    """
+    model.embed_query(queries[:1])  # warm-up
+    vectors: List[List[float]] = []
+    latencies: List[float] = []
+    for query in queries:
+        start = time.perf_counter()
+        vectors.extend(model.embed_query([query]))
+        latencies.append(time.perf_counter() - start)
+    return np.asarray(vectors, dtype=np.float32), latencies
+
+
+def _search_ids(vector_store, embeddings: np.ndarray, k: int) -> List[set]:
+    """Return the top-k chunk ids for each query embedding.
+
+    Args:
+        vector_store: Vector store holding the indexed passages.
+        embeddings: Query embeddings.
+        k: Results per query.
+    Returns:
+        One set of chunk ids per query.
+    """
+    results = vector_store.query(embeddings.tolist(), n_results=k)
+    return [{row["id"] for row in rows} for rows in results]
+
+
+def run_report(backends: List[str], queries_path: str | None, n_queries: int, k: int, threads: int) -> None:
+    """Print query-encoding latency and parity of each backend against fp32 torch.
+
+    Parity is the cosine similarity between the fp32 and backend embedding
+    of each query, and recall@k of the backend's vector search results
+    against the fp32 results on the configured index.
+
+    Args:
+        backends: Query backends to compare with the fp32 baseline.
+        queries_path: Optional text file of queries.
+        n_queries: Number of sampled queries when no file is given.
+        k: Results per query for recall@k.
+        threads: Intra-op threads for every backend; 0 keeps the runtime default.
+    """
+    settings = get_settings()
+    queries = _load_queries(queries_path, settings.data_path, n_queries, seed=0)
+    export_dir = onnx_export_dir(settings.vector_dir, settings.embedding_model)
+
+    def build(backend: str) -> EmbeddingModel:
+        return EmbeddingModel(
+            settings.embedding_model,
+            settings.embedding_batch_size,
+            query_backend=backend,
+            query_threads=threads,
+            export_dir=export_dir,
+        )
+
+    reference, reference_latencies = _encode_one_by_one(build("torch"), queries)
+    vector_store = build_vector_store(settings, dimension=reference.shape[1])
+    expected = _search_ids(vector_store, reference, k)
+    baseline_p50 = np.percentile(reference_latencies, 50)
+    print(f"{settings.embedding_model}: {len(queries)} queries, threads={threads or 'default'}, k={k}")
+    print(f"{'torch':<10} p50={baseline_p50 * 1e3:8.2f}ms  p99={np.percentile(reference_latencies, 99) * 1e3:8.2f}ms  "
+          f"speedup=1.00x  cosine mean=1.0000 min=1.0000  recall@{k}=1.000")
+
+    for backend in backends:
+        embeddings, latencies = _encode_one_by_one(build(backend), queries)
+        cosine = (embeddings * reference).sum(axis=1)
+        found = _search_ids(vector_store, embeddings, k)
+        recall = sum(len(a & b) for a, b in zip(expected, found)) / max(1, sum(len(a) for a in expected))
+        p50 = np.percentile(latencies, 50)
+        print(f"{backend:<10} p50={p50 * 1e3:8.2f}ms  p99={np.percentile(latencies, 99) * 1e3:8.2f}ms  "
+              f"speedup={baseline_p50 / p50:.2f}x  cosine mean={cosine.mean():.4f} min={cosine.min():.4f}  "
+              f"recall@{k}={recall:.3f}")
+
+
+def main() -> None:
+    """CLI entry point for the query encoder parity report."""
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Compare query encoder backends against the fp32 torch model.")
+    parser.add_argument("--backend", nargs="+", default=[b for b in QUERY_BACKENDS if b != "torch"],
+                        choices=QUERY_BACKENDS, help="Backends to compare with fp32 torch")
+    parser.add_argument("--queries", default=None, help="Optional text file with one query per line")
+    parser.add_argument("--n-queries", type=int, default=200, help="Job titles sampled as queries when no file is given")
+    parser.add_argument("--k", type=int, default=10, help="Results per query for recall@k")
+    parser.add_argument("--threads", type=int, default=settings.embedding_query_threads, help="Intra-op threads")
+    args = parser.parse_args()
+
+    run_report(args.backend, args.queries, args.n_queries, args.k, args.threads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from typing import List
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.rag.retrieval import LocalVectorStore
+
+
+_MODES = ("float32", "float16", "int8", "binary")
+
+
+def run_report(vector_dir: str, modes: List[str], rescore: List[int], k: int, n_queries: int) -> None:
+    """Print footprint, recall@k and latency of each storage mode against exact fp32 search.
+
+    Stored vectors are sampled as queries. The index is opened once per
+    mode; int8 and binary codes are derived in memory when the index was
+    flushed with another dtype, so no rebuild is needed.
+
+    Args:
+        vector_dir: Directory holding `local_index/`.
+        modes: Storage modes to evaluate.
+        rescore: Rescoring shortlist sizes for the quantized modes (0 = none).
+        k: Neighbours per query.
+        n_queries: Number of stored vectors sampled as queries.
+    """
+    path = os.path.join(vector_dir, "local_index")
+    reference = LocalVectorStore(path, dtype="float32")
+    if reference.count() == 0:
+        raise SystemExit(f"No local index found at {path}; run build_index.py with VECTOR_BACKEND=local.")
+    rng = np.random.default_rng(0)
+    rows = np.sort(rng.choice(reference.count(), size=min(n_queries, reference.count()), replace=False))
+    queries = np.asarray(reference.vectors[rows], dtype=np.float32)
+    truth = [{row["id"] for row in result} for result in reference.query(queries, n_results=k)]
+
+    print(f"{reference.count()} vectors, dimension {queries.shape[1]}, {len(queries)} queries, k={k}")
+    for mode in modes:
+        for candidates in rescore if mode in ("int8", "binary") else [0]:
+            store = LocalVectorStore(path, dtype=mode, rescore_candidates=candidates)
+            store.query(queries[:1], n_results=k)  # warm-up
+            latencies, hits = [], 0
+            for query, expected in zip(queries, truth):
+                start = time.perf_counter()
+                result = store.query(query[None, :], n_results=k)[0]
+                latencies.append(time.perf_counter() - start)
+                hits += len(expected.intersection(row["id"] for row in result))
+            label = f"{mode}+rescore{candidates}" if candidates else mode
+            recall = hits / max(1, sum(len(t) for t in truth))
+            print(f"{label:<18} bytes/vector={store.bytes_per_vector():7.0f}  recall@{k}={recall:.3f}  "
+                  f"p50={np.percentile(latencies, 50) * 1e3:.3f}ms  p99={np.percentile(latencies, 99) * 1e3:.3f}ms")
+
+
+def main() -> None:
+    """CLI entry point for the vector quantization report."""
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Report footprint, recall@k and latency of local storage dtypes.")
+    parser.add_argument("--vector-dir", default=settings.vector_dir, help="Vector store directory")
+    parser.add_argument("--dtype", nargs="+", default=list(_MODES), choices=_MODES, help="Storage modes")
+    parser.add_argument("--rescore", type=int, nargs="+", default=[0, settings.local_rescore_candidates],
+                        help="Rescoring shortlist sizes for int8/binary (0 = quantized scores only)")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per query")
+    parser.add_argument("--n-queries", type=int, default=200, help="Sampled stored vectors used as queries")
+    args = parser.parse_args()
+
+    run_report(args.vector_dir, args.dtype, args.rescore, args.k, args.n_queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.rag.ingest.loader import iter_raw_jobs
+from app.rag.pipeline import build_pipeline
+from app.rag.retrieval import CrossEncoderReranker, RetrievedChunk
+from app.rag.retrieval.reranker import RERANK_BACKENDS, onnx_export_dir
+
+
+def _load_queries(queries_path: str | None, data_path: str, n_queries: int, seed: int) -> List[str]:
+    """Build the query list for the report.
+
+    Args:
+        queries_path: Optional text file with one query per line.
+        data_path: Dataset CSV whose job titles and locations are sampled when no file is given.
+        n_queries: Number of sampled queries when no file is given.
+        seed: Random seed for sampling.
+    Returns:
+        Query strings.
+    """
+    if queries_path:
+        with open(queries_path, "r", encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip()]
+    titles = sorted({f"{job.job_title} {job.location}".strip() for job in iter_raw_jobs(data_path) if job.job_title})
+    random.Random(seed).shuffle(titles)
+    return titles[:n_queries]
+
+
+def _kendall_tau(reference: Sequence[float], candidate: Sequence[float]) -> float:
+    """Return Kendall's tau-b between two score vectors over the same items.
+
+    Args:
+        reference: Reference scores.
+        candidate: Scores to compare.
+    Returns:
+        Tau-b in [-1, 1]; 1.0 when there are fewer than two items.
+    """
+    reference = np.asarray(reference, dtype=np.float64)
+    candidate = np.asarray(candidate, dtype=np.float64)
+    rows, cols = np.triu_indices(len(reference), 1)
+    ref_sign = np.sign(reference[rows] - reference[cols])
+    cand_sign = np.sign(candidate[rows] - candidate[cols])
+    denom = np.sqrt(np.count_nonzero(ref_sign) * np.count_nonzero(cand_sign))
+    return float((ref_sign * cand_sign).sum() / denom) if denom else 1.0
+
+
+def _ndcg(reference_order: List[str], candidate_order: List[str], k: int) -> float:
+    """Return NDCG@k of a ranking, using the reference ranking as graded relevance.
+
+    The reference top-k items get gains k, k-1, ..., 1; all others get 0.
+
+    Args:
+        reference_order: Chunk ids ranked by the reference model.
+        candidate_order: Chunk ids ranked by the model under test.
+        k: Cutoff.
+    Returns:
+        NDCG@k in [0, 1].
+    """
+    gains = {chunk_id: k - rank for rank, chunk_id in enumerate(reference_order[:k])}
+    discounts = 1.0 / np.log2(np.arange(2, k + 2))
+    dcg = sum(gains.get(chunk_id, 0) * discounts[rank] for rank, chunk_id in enumerate(candidate_order[:k]))
+    ideal = sum(gains[chunk_id] * discounts[rank] for rank, chunk_id in enumerate(reference_order[:k]))
+    return dcg / ideal if ideal else 1.0
+
+
+def _time_rerank(
+    reranker: CrossEncoderReranker,
+    queries: List[str],
+    candidates: List[List[RetrievedChunk]],
+) -> tuple[List[List[RetrievedChunk]], List[float]]:
+    """Rerank each query's candidates, timing every call.
+
+    Args:
+        reranker: Reranker under test (built without a score cache).
+        queries: Query strings.
+        candidates: Candidate chunks per query.
+    Returns:
+        A tuple of (reranked chunks per query, per-query latency in seconds).
+    """
+    reranker.rerank(queries[0], candidates[0])  # warm-up
+    results: List[List[RetrievedChunk]] = []
+    latencies: List[float] = []
+    for query, chunks in zip(queries, candidates):
+        start = time.perf_counter()
+        results.append(reranker.rerank(query, chunks))
+        latencies.append(time.perf_counter() - start)
+    return results, latencies
+
+
+def run_report(
+    backends: List[str],
+    queries_path: str | None,
+    n_queries: int,
+    k: int,
+    batch_size: int,
+    max_length: int | None,
+) -> None:
+    """Print rerank latency and ranking agreement of each backend against fp32 torch.
+
+    Candidates come from the configured retriever at `RETRIEVAL_CANDIDATE_K`
+    depth, so the comparison uses the same inputs as the API.
+
+    Args:
+        backends: Backends to compare with the fp32 baseline.
+        queries_path: Optional text file of queries.
+        n_queries: Number of sampled queries when no file is given.
+        k: Cutoff for NDCG and top-k overlap.
+        batch_size: Pairs per forward pass.
+        max_length: Maximum tokens per pair, or None for the model default.
+    """
+    settings = get_settings()
+    if not settings.rerank_model:
+        raise SystemExit("RERANK_MODEL is not configured.")
+    pipeline = build_pipeline(settings.model_copy(update={"rerank_model": None}))
+    queries = _load_queries(queries_path, settings.data_path, n_queries, seed=0)
+    candidates = [pipeline.retriever.retrieve(query, use_hybrid=settings.use_hybrid) for query in queries]
+    pairs = [(query, chunks) for query, chunks in zip(queries, candidates) if chunks]
+    if not pairs:
+        raise SystemExit("No candidates retrieved; build the index first.")
+    queries, candidates = [query for query, _ in pairs], [chunks for _, chunks in pairs]
+    export_dir = onnx_export_dir(settings.vector_dir, settings.rerank_model)
+
+    def build(backend: str) -> CrossEncoderReranker:
+        return CrossEncoderReranker(
+            settings.rerank_model,
+            backend=backend,
+            batch_size=batch_size,
+            max_length=max_length,
+            export_dir=export_dir,
+        )
+
+    reference, reference_latencies = _time_rerank(build("torch"), queries, candidates)
+    baseline_p50 = np.percentile(reference_latencies, 50)
+    depth = np.mean([len(chunks) for chunks in candidates])
+    print(f"{settings.rerank_model}: {len(queries)} queries, {depth:.1f} candidates/query, batch={batch_size}, "
+          f"max_length={max_length or 'model default'}")
+    print(f"{'torch':<10} p50={baseline_p50 * 1e3:8.2f}ms  p99={np.percentile(reference_latencies, 99) * 1e3:8.2f}ms  "
+          f"speedup=1.00x  tau=1.000  ndcg@{k}=1.000  top1=1.000")
+
+    for backend in backends:
+        results, latencies = _time_rerank(build(backend), queries, candidates)
+        taus, ndcgs, top1 = [], [], 0
+        for expected, actual in zip(reference, results):
+            scores: Dict[str, float] = {chunk.id: chunk.score for chunk in actual}
+            taus.append(_kendall_tau([chunk.score for chunk in expected], [scores[chunk.id] for chunk in expected]))
+            ndcgs.append(_ndcg([chunk.id for chunk in expected], [chunk.id for chunk in actual], k))
+            top1 += int(expected[0].id == actual[0].id)
+        p50 = np.percentile(latencies, 50)
+        print(f"{backend:<10} p50={p50 * 1e3:8.2f}ms  p99={np.percentile(latencies, 99) * 1e3:8.2f}ms  "
+              f"speedup={baseline_p50 / p50:.2f}x  tau={np.mean(taus):.3f}  ndcg@{k}={np.mean(ndcgs):.3f}  "
+              f"top1={top1 / len(queries):.3f}")
+
+
+def main() -> None:
+    """CLI entry point for the reranker backend report."""
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Compare reranker backends against the fp32 torch model.")
+    parser.add_argument("--backend", nargs="+", default=[b for b in RERANK_BACKENDS if b != "torch"],
+                        choices=RERANK_BACKENDS, help="Backends to compare with fp32 torch")
+    parser.add_argument("--queries", default=None, help="Optional text file with one query per line")
+    parser.add_argument("--n-queries", type=int, default=100, help="Job titles sampled as queries when no file is given")
+    parser.add_argument("--k", type=int, default=5, help="Cutoff for NDCG@k")
+    parser.add_argument("--batch-size", type=int, default=settings.rerank_batch_size, help="Pairs per forward pass")
+    parser.add_argument("--max-length", type=int, default=settings.rerank_max_length, help="Maximum tokens per pair")
+    args = parser.parse_args()
+
+    run_report(args.backend, args.queries, args.n_queries, args.k, args.batch_size, args.max_length)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import random
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pytest
+
+from app.rag.retrieval.bm25 import BM25Index, tokenize
+from app.rag.retrieval.filters import MetadataFilter
+
+
+_LEVELS = ("Entry Level", "Mid Level", "Senior Level")
+_QUERIES = (
+    "python data engineer",
+    "senior spark pipelines",
+    "w7 w7 w150",
+    "w0 w1 w2 w3 w4 w5",
+    "unknowntoken",
+    "w199",
+)
+
+
+def _corpus(n_docs: int, seed: int = 0) -> Tuple[List[str], List[str], List[Dict[str, Any]]]:
+    """Generate documents with a Zipf-like word distribution (common and rare terms).
+
+    Args:
+        n_docs: Number of documents.
+        seed: Random seed.
+    Returns:
+        A tuple of (ids, texts, metadatas).
+    """
+    rng = random.Random(seed)
+    vocab = [f"w{idx}" for idx in range(200)] + ["python", "data", "engineer", "senior", "spark", "pipelines"]
+    weights = [1.0 / (rank + 1) for rank in range(len(vocab))]
+    ids, texts, metadatas = [], [], []
+    for doc in range(n_docs):
+        ids.append(f"job{doc // 3}-{doc % 3}")
+        texts.append(" ".join(rng.choices(vocab, weights=weights, k=rng.randint(5, 60))))
+        metadatas.append({"level": _LEVELS[doc % 3], "location": "Remote" if doc % 2 else "Austin, TX"})
+    return ids, texts, metadatas
+
+
+@pytest.fixture(scope="module")
+def corpus() -> Tuple[List[str], List[str], List[Dict[str, Any]]]:
+    return _corpus(300)
+
+
+def test_scores_match_rank_bm25(corpus):
+    rank_bm25 = pytest.importorskip("rank_bm25")
+    ids, texts, metadatas = corpus
+    index = BM25Index.from_documents(ids, texts, metadatas)
+    reference = rank_bm25.BM25Okapi([tokenize(text) for text in texts])
+    for query in _QUERIES:
+        tokens = tokenize(query)
+        np.testing.assert_allclose(index.get_scores(tokens), reference.get_scores(tokens), rtol=1e-5, atol=1e-6)
+
+
+@pytest.mark.parametrize("prune", [True, False])
+def test_search_returns_exact_top_k(corpus, prune):
+    ids, texts, metadatas = corpus
+    index = BM25Index.from_documents(ids, texts, metadatas)
+    for query in _QUERIES:
+        tokens = tokenize(query)
+        scores = index.get_scores(tokens)
+        docs, found = index.search(tokens, 10, prune=prune)
+        matching = np.flatnonzero(scores != 0)
+        expected = sorted(matching, key=lambda doc: (-scores[doc], doc))[:10]
+        # Documents tied with the k-th score may be swapped for one another.
+        assert len(docs) == len(expected)
+        np.testing.assert_allclose(found, scores[expected], rtol=1e-6)
+        np.testing.assert_allclose(scores[docs], found, rtol=1e-6)
+
+
+def test_query_applies_metadata_filter(corpus):
+    ids, texts, metadatas = corpus
+    index = BM25Index.from_documents(ids, texts, metadatas)
+    results = index.query("python data engineer", 20, MetadataFilter(level=("senior level",), location=("Remote",)))
+    assert results
+    assert all(chunk.metadata == {"level": "Senior Level", "location": "Remote"} for chunk in results)
+    assert index.query("python", 5, MetadataFilter(level=("Intern",))) == []
+
+
+def test_save_and_load_round_trip(corpus, tmp_path):
+    ids, texts, metadatas = corpus
+    index = BM25Index.from_documents(ids, texts, metadatas)
+    index.save(str(tmp_path))
+    loaded = BM25Index.load(str(tmp_path))
+    assert len(loaded) == len(index)
+    for query in _QUERIES:
+        tokens = tokenize(query)
+        np.testing.assert_array_equal(loaded.get_scores(tokens), index.get_scores(tokens))
+    assert [chunk.id for chunk in loaded.query("senior spark", 5)] == [chunk.id for chunk in index.query("senior spark", 5)]
+
+
+def test_merge_matches_rebuild(corpus, tmp_path):
+    ids, texts, metadatas = corpus
+    BM25Index.from_documents(ids, texts, metadatas).save(str(tmp_path))
+    base = BM25Index.load(str(tmp_path))
+
+    new_ids, new_texts, new_metadatas = _corpus(40, seed=1)
+    # Overlapping IDs replace existing chunks; the rest are added.
+    new_ids = ids[:20] + [f"new{idx}-0" for idx in range(20)]
+    dropped = set(ids[100:130])
+    merged = base.merge(BM25Index.from_documents(new_ids, new_texts, new_metadatas), dropped)
+
+    kept = [doc for doc, chunk_id in enumerate(ids) if chunk_id not in dropped and chunk_id not in set(new_ids)]
+    rebuilt = BM25Index.from_documents(
+        [ids[doc] for doc in kept] + new_ids,
+        [texts[doc] for doc in kept] + new_texts,
+        [metadatas[doc] for doc in kept] + new_metadatas,
+    )
+    for name in ("indptr", "postings", "term_freqs", "doc_len", "idf", "max_impact"):
+        np.testing.assert_array_equal(np.asarray(getattr(merged, name)), np.asarray(getattr(rebuilt, name)))
+    assert [merged.vocab[term] for term in range(len(merged.vocab))] == [
+        rebuilt.vocab[term] for term in range(len(rebuilt.vocab))
+    ]
+    assert [merged.ids[doc] for doc in range(len(merged))] == [rebuilt.ids[doc] for doc in range(len(rebuilt))]
+    assert merged.metadata(len(merged) - 1) == new_metadatas[-1]
+
+
+def test_merge_drops_terms_of_removed_documents():
+    index = BM25Index.from_documents(["a-0", "b-0"], ["shared zebra", "shared lion"], [{}, {}])
+    merged = index.merge(BM25Index.from_documents([], [], []), ["a-0"])
+    assert len(merged) == 1
+    assert merged.term_id("zebra") is None
+    assert merged.term_id("lion") is not None
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import pytest
+
+from app.core.cache import TieredCache, TTLCache
+
+
+class _Pipeline:
+    def __init__(self, redis: "_Redis") -> None:
+        self._redis = redis
+        self._ops: List[Tuple[str, tuple]] = []
+
+    def get(self, key: str) -> None:
+        self._ops.append(("get", (key,)))
+
+    def pttl(self, key: str) -> None:
+        self._ops.append(("pttl", (key,)))
+
+    def setex(self, key: str, ttl: int, value: str) -> None:
+        self._ops.append(("setex", (key, ttl, value)))
+
+    def execute(self) -> List[Any]:
+        self._redis.round_trips += 1
+        if self._redis.down:
+            raise ConnectionError("redis is down")
+        replies = []
+        for op, args in self._ops:
+            if op == "get":
+                replies.append(self._redis.values.get(args[0]))
+            elif op == "pttl":
+                replies.append(60_000 if args[0] in self._redis.values else -2)
+            else:
+                self._redis.values[args[0]] = args[2]
+                replies.append(True)
+        return replies
+
+
+class _Redis:
+    def __init__(self) -> None:
+        self.values: Dict[str, str] = {}
+        self.round_trips = 0
+        self.down = False
+
+    def pipeline(self, transaction: bool = True) -> _Pipeline:
+        return _Pipeline(self)
+
+
+class _Factory:
+    """Stands in for `get_cache`: counts connection attempts (each one a PING)."""
+
+    def __init__(self, redis: Optional[_Redis]) -> None:
+        self.redis = redis
+        self.calls = 0
+
+    def __call__(self) -> Optional[_Redis]:
+        self.calls += 1
+        return self.redis
+
+
+def _cache(factory: _Factory, ttl: float = 60, stale: float = 60, **kwargs: Any) -> TieredCache:
+    return TieredCache(
+        factory,
+        ttl_seconds=60,
+        encode=str,
+        decode=str,
+        l1=TTLCache(16, ttl, stale_seconds=stale),
+        **kwargs,
+    )
+
+
+def test_ttl_cache_serves_expired_entries_as_stale_within_the_window():
+    cache = TTLCache(4, ttl_seconds=0.01, stale_seconds=60)
+    cache.set("k", "v")
+    time.sleep(0.02)
+    assert cache.lookup("k") == ("v", True)
+    assert cache.get("k") is None
+    assert cache.stats()["stale_hits"] == 2
+
+
+def test_ttl_cache_evicts_least_recently_used_and_oversized_entries():
+    cache = TTLCache(2, ttl_seconds=0, max_bytes=10)
+    cache.set("a", 1, size=4)
+    cache.set("b", 2, size=4)
+    cache.get("a")
+    cache.set("c", 3, size=4)
+    assert cache.get("b") is None and cache.get("a") == 1 and cache.get("c") == 3
+    cache.set("huge", 4, size=11)
+    assert cache.get("huge") is None
+
+
+def test_l1_miss_reads_redis_and_fills_l1():
+    redis = _Redis()
+    redis.values["k"] = "shared"
+    cache = _cache(_Factory(redis))
+
+    async def scenario() -> None:
+        assert await cache.get("k") == ("shared", False)
+        assert await cache.get("k") == ("shared", False)
+
+    asyncio.run(scenario())
+    assert redis.round_trips == 1
+    assert cache.redis_hits == 1
+
+
+def test_stale_l1_entry_is_returned_without_touching_redis():
+    redis = _Redis()
+    factory = _Factory(redis)
+    cache = _cache(factory, ttl=0.01)
+
+    async def scenario() -> None:
+        cache.l1.set("k", "old")
+        await asyncio.sleep(0.02)
+        assert await cache.get("k") == ("old", True)
+
+    asyncio.run(scenario())
+    assert factory.calls == 0
+    assert redis.round_trips == 0
+
+
+def test_refresh_takes_a_newer_copy_from_redis_without_recomputing():
+    redis = _Redis()
+    cache = _cache(_Factory(redis), ttl=0.01)
+    computed: List[str] = []
+
+    async def compute() -> None:
+        computed.append("k")
+
+    async def scenario() -> None:
+        cache.l1.set("k", "old")
+        await asyncio.sleep(0.02)
+        redis.values["k"] = "refreshed elsewhere"
+        cache.refresh("k", compute)
+        await asyncio.gather(*cache._tasks)
+        assert cache.l1.lookup("k") == ("refreshed elsewhere", False)
+
+    asyncio.run(scenario())
+    assert computed == []
+
+
+def test_refresh_recomputes_once_when_redis_has_nothing():
+    cache = _cache(_Factory(_Redis()), ttl=0.01)
+
+    async def scenario() -> None:
+        release = asyncio.Event()
+        calls: List[int] = []
+
+        async def compute() -> None:
+            calls.append(1)
+            await release.wait()
+            await cache.set("k", "new")
+
+        cache.l1.set("k", "old")
+        await asyncio.sleep(0.02)
+        cache.refresh("k", compute)
+        cache.refresh("k", compute)
+        # The running refresh is held by the cache, not just by the event loop's weak reference.
+        assert len(cache._tasks) == 1
+        await asyncio.sleep(0.01)
+        release.set()
+        await asyncio.gather(*cache._tasks)
+        assert calls == [1]
+        assert await cache.get("k") == ("new", False)
+        assert cache._tasks == set()
+
+    asyncio.run(scenario())
+
+
+def test_refresh_swallows_compute_errors():
+    cache = _cache(_Factory(None))
+
+    async def compute() -> None:
+        raise RuntimeError("llm down")
+
+    async def scenario() -> None:
+        cache.refresh("k", compute)
+        await asyncio.gather(*cache._tasks)
+        assert cache.stats()["refreshing"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_reachable_client_is_memoized():
+    factory = _Factory(_Redis())
+    cache = _cache(factory)
+
+    async def scenario() -> None:
+        for idx in range(5):
+            await cache.get(f"missing{idx}")
+        await cache.set("k", "v")
+
+    asyncio.run(scenario())
+    assert factory.calls == 1
+
+
+def test_unreachable_redis_is_retried_after_a_delay():
+    factory = _Factory(None)
+    cache = _cache(factory, retry_seconds=0.05)
+
+    async def scenario() -> None:
+        await cache.get("a")
+        await cache.get("b")
+        assert factory.calls == 1
+        await asyncio.sleep(0.06)
+        await cache.get("c")
+        assert factory.calls == 2
+
+    asyncio.run(scenario())
+
+
+def test_failed_round_trip_reconnects_on_next_use():
+    redis = _Redis()
+    factory = _Factory(redis)
+    cache = _cache(factory)
+
+    async def scenario() -> None:
+        redis.down = True
+        assert await cache.get("a") == (None, False)
+        redis.down = False
+        redis.values["b"] = "v"
+        assert await cache.get("b") == ("v", False)
+
+    asyncio.run(scenario())
+    assert factory.calls == 2
+
+
+@pytest.mark.parametrize("use_l1", [True, False])
+def test_use_l1_false_reads_redis_only(use_l1):
+    redis = _Redis()
+    redis.values["k"] = "shared"
+    cache = _cache(_Factory(redis))
+    cache.l1.set("k", "local")
+    value, _ = asyncio.run(cache.get("k", use_l1=use_l1))
+    assert value == ("local" if use_l1 else "shared")
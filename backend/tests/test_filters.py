@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import random
+from datetime import date
+from typing import Any, Dict, List
+
+import numpy as np
+import pytest
+
+from app.rag.retrieval.filters import FilterExtractor, MetadataFilter, MetadataIndex, merge_vocabularies
+
+
+_EPOCH = date(1970, 1, 1)
+_LEVELS = ["Entry Level", "Mid Level", "Senior Level", "Internship", ""]
+_LOCATIONS = ["New York, NY", "San Francisco, CA", "Remote", "Austin, TX"]
+_CATEGORIES = ["Data Science", "Software Engineering", "Design"]
+
+
+def _day(value: str) -> int:
+    return (date.fromisoformat(value) - _EPOCH).days
+
+
+@pytest.fixture(scope="module")
+def metadatas() -> List[Dict[str, Any]]:
+    rng = random.Random(0)
+    rows = []
+    for _ in range(500):
+        published = date(2024, 1, 1).toordinal() + rng.randint(0, 365)
+        rows.append(
+            {
+                "level": rng.choice(_LEVELS),
+                "location": rng.choice(_LOCATIONS),
+                "category": rng.choice(_CATEGORIES),
+                # Some rows have no usable date and must never match a date range.
+                "publication_date": "" if rng.random() < 0.05 else f"{date.fromordinal(published).isoformat()}T00:00:00Z",
+            }
+        )
+    return rows
+
+
+def _matches(metadata: Dict[str, Any], metadata_filter: MetadataFilter) -> bool:
+    """Reference implementation of a filter: a linear scan over one row."""
+    for name in ("level", "location", "category"):
+        wanted = {value.lower() for value in getattr(metadata_filter, name)}
+        if wanted and metadata[name].lower() not in wanted:
+            return False
+    if metadata_filter.published_since is None and metadata_filter.published_before is None:
+        return True
+    if not metadata["publication_date"]:
+        return False
+    day = _day(metadata["publication_date"][:10])
+    if metadata_filter.published_since is not None and day < metadata_filter.published_since:
+        return False
+    return metadata_filter.published_before is None or day < metadata_filter.published_before
+
+
+_FILTERS = [
+    MetadataFilter(),
+    MetadataFilter(level=("Senior Level",)),
+    MetadataFilter(level=("senior level", "ENTRY LEVEL")),
+    MetadataFilter(location=("Remote",), category=("Data Science",)),
+    MetadataFilter(level=("Mid Level",), location=("Austin, TX", "New York, NY"), category=("Design",)),
+    MetadataFilter(published_since=_day("2024-06-01")),
+    MetadataFilter(published_before=_day("2024-03-01")),
+    MetadataFilter(location=("Remote",), published_since=_day("2024-05-01"), published_before=_day("2024-07-01")),
+    MetadataFilter(location=("Mars",)),
+    MetadataFilter(level=("Senior Level",), category=("Unknown",)),
+]
+
+
+@pytest.mark.parametrize("metadata_filter", _FILTERS)
+def test_select_matches_linear_scan(metadatas, metadata_filter):
+    expected = [row for row, metadata in enumerate(metadatas) if _matches(metadata, metadata_filter)]
+    selected = MetadataIndex.build(metadatas).select(metadata_filter)
+    assert selected.tolist() == expected
+
+
+def test_saved_index_selects_the_same_rows(metadatas, tmp_path):
+    index = MetadataIndex.build(metadatas)
+    index.save(str(tmp_path))
+    loaded = MetadataIndex.load(str(tmp_path), len(metadatas))
+    assert loaded is not None
+    for metadata_filter in _FILTERS:
+        np.testing.assert_array_equal(loaded.select(metadata_filter), index.select(metadata_filter))
+    assert MetadataIndex.load(str(tmp_path), len(metadatas) + 1) is None
+
+
+def test_vocabulary_skips_empty_values(metadatas):
+    vocabulary = MetadataIndex.build(metadatas).vocabulary()
+    assert sorted(vocabulary["level"]) == sorted(level for level in _LEVELS if level)
+    assert sorted(vocabulary["location"]) == sorted(_LOCATIONS)
+
+
+@pytest.fixture
+def extractor() -> FilterExtractor:
+    return FilterExtractor({"level": _LEVELS[:4], "location": _LOCATIONS, "category": _CATEGORIES})
+
+
+def test_extracts_level_location_category_and_recency(extractor):
+    extracted = extractor.extract("senior data science jobs in NYC from the last 30 days", today=date(2024, 7, 31))
+    assert extracted == MetadataFilter(
+        level=("Senior Level",),
+        location=("New York, NY",),
+        category=("Data Science",),
+        published_since=_day("2024-07-01"),
+    )
+
+
+@pytest.mark.parametrize(
+    ("query", "expected"),
+    [
+        ("junior designer roles", MetadataFilter(level=("Entry Level",))),
+        ("internships in san francisco", MetadataFilter(level=("Internship",), location=("San Francisco, CA",))),
+        (
+            "remote software engineering since 2024-03",
+            MetadataFilter(location=("Remote",), category=("Software Engineering",), published_since=_day("2024-03-01")),
+        ),
+        ("jobs posted in the past week", MetadataFilter(published_since=_day("2024-07-24"))),
+        ("python developer", MetadataFilter()),
+        ("remoteness of austinite teams", MetadataFilter()),
+    ],
+)
+def test_extraction_cases(extractor, query, expected):
+    assert extractor.extract(query, today=date(2024, 7, 31)) == expected
+
+
+def test_fields_without_indexed_values_are_not_extracted():
+    extractor = FilterExtractor({"location": ["Remote"]})
+    assert extractor.extract("senior data science in nyc") == MetadataFilter()
+
+
+def test_explicit_filters_win_per_field_and_are_respelled(extractor):
+    explicit = MetadataFilter(location=("remote",))
+    merged = explicit.merge(extractor.extract("senior jobs in NYC", today=date(2024, 7, 31)))
+    assert merged.canonical(extractor.vocabulary) == MetadataFilter(level=("Senior Level",), location=("Remote",))
+
+
+def test_merge_vocabularies_keeps_first_spelling():
+    merged = merge_vocabularies([{"location": ["Remote"]}, {"location": ["REMOTE", "Austin, TX"], "level": ["Senior"]}])
+    assert merged == {"level": ["Senior"], "location": ["Remote", "Austin, TX"], "category": []}
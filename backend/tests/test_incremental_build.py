@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from typing import Dict, List
+
+import pytest
+
+from app.rag.ingest import BuildManifest, IncrementalChunker, JobRecord, ManifestDiff, prepare_job
+
+
+_SENTENCE = "Design and operate batch and streaming pipelines for analytics. "
+
+
+def _job(job_id: str, description: str, title: str = "Data Engineer") -> JobRecord:
+    return JobRecord(
+        job_id=job_id,
+        job_category="Data Science",
+        job_title=title,
+        company="Acme",
+        publication_date="2024-05-01T00:00:00Z",
+        location="Remote",
+        level="Senior Level",
+        tags="python",
+        description=description,
+    )
+
+
+def _run(manifest: BuildManifest, jobs: List[JobRecord]) -> tuple[IncrementalChunker, Dict[str, str]]:
+    """Run the chunker over jobs as build_index does.
+
+    Args:
+        manifest: Manifest of the previous build.
+        jobs: Current dataset.
+    Returns:
+        The exhausted chunker and the yielded chunks by ID.
+    """
+    chunker = IncrementalChunker(manifest)
+    prepared = (prepare_job(job, max_chars=200, overlap=20, clean=False) for job in jobs)
+    chunks = {}
+    for batch in chunker.batches(prepared, batch_size=3):
+        assert len(batch) <= 3
+        chunks.update(zip(batch.ids, batch.documents))
+    return chunker, chunks
+
+
+@pytest.fixture
+def dataset() -> List[JobRecord]:
+    return [
+        _job("A", _SENTENCE * 6),
+        _job("B", _SENTENCE * 2),
+        _job("C", _SENTENCE),
+    ]
+
+
+@pytest.fixture
+def previous(dataset) -> BuildManifest:
+    chunker, _ = _run(BuildManifest("fp"), dataset)
+    return BuildManifest("fp", chunker.current)
+
+
+def test_first_build_indexes_everything(dataset):
+    chunker, chunks = _run(BuildManifest("fp"), dataset)
+    assert chunker.diff == ManifestDiff(changed=["A", "B", "C"], stale_chunk_ids=[], unchanged=0, removed=0)
+    assert set(chunks) == {chunk_id for entry in chunker.current.values() for chunk_id in entry.chunk_ids}
+    assert len(chunker.current["A"].chunk_ids) > 1
+
+
+def test_unchanged_dataset_yields_nothing(dataset, previous):
+    chunker, chunks = _run(previous, dataset)
+    assert chunks == {}
+    assert chunker.diff == ManifestDiff(changed=[], stale_chunk_ids=[], unchanged=3, removed=0)
+
+
+def test_added_modified_and_removed_jobs(dataset, previous):
+    current = [
+        _job("A", _SENTENCE * 2),  # shrunk: its trailing chunks become stale
+        _job("B", _SENTENCE * 2, title="Staff Data Engineer"),  # metadata-only change
+        _job("D", _SENTENCE),  # added; C was removed
+    ]
+    chunker, chunks = _run(previous, current)
+
+    diff = chunker.diff
+    assert diff.changed == ["A", "B", "D"]
+    assert diff.unchanged == 0
+    assert diff.removed == 1
+    kept_a = set(chunker.current["A"].chunk_ids)
+    stale_a = [chunk_id for chunk_id in previous.jobs["A"].chunk_ids if chunk_id not in kept_a]
+    assert stale_a
+    assert diff.stale_chunk_ids == stale_a + previous.jobs["C"].chunk_ids
+    assert set(chunks) == kept_a | set(chunker.current["B"].chunk_ids) | set(chunker.current["D"].chunk_ids)
+    assert "C" not in chunker.current
+
+
+def test_manifest_round_trip(previous, tmp_path):
+    path = str(tmp_path / "manifest.json")
+    previous.save(path)
+    loaded = BuildManifest.load(path, "fp")
+    assert {job_id: entry.chunk_ids for job_id, entry in loaded.jobs.items()} == {
+        job_id: entry.chunk_ids for job_id, entry in previous.jobs.items()
+    }
+    assert BuildManifest.load(str(tmp_path / "missing.json"), "fp").jobs == {}
+
+
+def test_fingerprint_mismatch_keeps_chunk_ids_and_blanks_hashes(previous, tmp_path):
+    path = str(tmp_path / "manifest.json")
+    previous.save(path)
+    loaded = BuildManifest.load(path, "other-fingerprint")
+    assert loaded.fingerprint == "other-fingerprint"
+    assert {job_id: entry.chunk_ids for job_id, entry in loaded.jobs.items()} == {
+        job_id: entry.chunk_ids for job_id, entry in previous.jobs.items()
+    }
+    assert all(entry.content_hash == "" for entry in loaded.jobs.values())
+
+
+def test_jobs_removed_across_a_fingerprint_change_are_stale(dataset, previous, tmp_path):
+    path = str(tmp_path / "manifest.json")
+    previous.save(path)
+    chunker, chunks = _run(BuildManifest.load(path, "other-fingerprint"), dataset[:2])
+
+    diff = chunker.diff
+    assert diff.changed == ["A", "B"]
+    assert diff.unchanged == 0
+    assert diff.removed == 1
+    assert diff.stale_chunk_ids == previous.jobs["C"].chunk_ids
+    assert set(chunks) == set(previous.jobs["A"].chunk_ids) | set(previous.jobs["B"].chunk_ids)
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from typing import List
+
+import numpy as np
+import pytest
+
+from app.rag.retrieval.local_store import LocalVectorStore
+
+
+_DIM = 32
+_K = 10
+
+
+def _clustered(n_vectors: int, n_clusters: int, seed: int) -> np.ndarray:
+    """Generate unit vectors grouped around random centers, like embeddings of related texts.
+
+    Args:
+        n_vectors: Number of vectors.
+        n_clusters: Number of centers.
+        seed: Random seed.
+    Returns:
+        A float32 matrix of shape (n_vectors, _DIM).
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, _DIM))
+    vectors = centers[rng.integers(n_clusters, size=n_vectors)] + 0.4 * rng.normal(size=(n_vectors, _DIM))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+@pytest.fixture(scope="module")
+def data():
+    vectors = _clustered(3000, 30, seed=0)
+    queries = vectors[np.random.default_rng(1).choice(len(vectors), 50, replace=False)]
+    queries = queries + 0.05 * np.random.default_rng(2).normal(size=queries.shape).astype(np.float32)
+    exact = np.argsort(-(queries @ vectors.T), axis=1, kind="stable")[:, :_K]
+    return vectors, queries, exact
+
+
+def _store(path, vectors: np.ndarray, **kwargs) -> LocalVectorStore:
+    store = LocalVectorStore(str(path), **kwargs)
+    ids = [f"job{row}-0" for row in range(len(vectors))]
+    store.upsert(ids, vectors, ["text"] * len(ids), [{"row": row} for row in range(len(ids))])
+    store.flush()
+    return LocalVectorStore(str(path), **kwargs)
+
+
+def _recall(store: LocalVectorStore, queries: np.ndarray, exact: np.ndarray, nprobe: int = 8) -> float:
+    found: List[set] = [
+        {hit["metadata"]["row"] for hit in hits} for hits in store.query(queries, _K, nprobe=nprobe)
+    ]
+    return float(np.mean([len(hits & set(truth)) / _K for hits, truth in zip(found, exact)]))
+
+
+def test_flat_search_is_exact(tmp_path, data):
+    vectors, queries, exact = data
+    store = _store(tmp_path, vectors)
+    for hits, truth in zip(store.query(queries, _K), exact):
+        assert [hit["metadata"]["row"] for hit in hits] == list(truth)
+
+
+@pytest.mark.parametrize(
+    ("dtype", "index_type", "min_recall"),
+    [
+        ("float32", "ivf", 0.9),
+        ("int8", "flat", 0.98),
+        ("int8", "ivf", 0.9),
+        ("binary", "flat", 0.9),
+        ("binary", "ivf", 0.85),
+    ],
+)
+def test_approximate_search_recall(tmp_path, data, dtype, index_type, min_recall):
+    vectors, queries, exact = data
+    store = _store(tmp_path, vectors, dtype=dtype, index_type=index_type)
+    assert _recall(store, queries, exact) >= min_recall
+
+
+def test_quantized_codes_are_smaller(tmp_path, data):
+    vectors, _, _ = data
+    assert _store(tmp_path / "int8", vectors, dtype="int8").bytes_per_vector() == _DIM
+    assert _store(tmp_path / "binary", vectors, dtype="binary").bytes_per_vector() == _DIM // 8
+
+
+def test_incremental_flush_indexes_new_rows_without_retraining(tmp_path, data):
+    vectors, queries, exact = data
+    store = _store(tmp_path, vectors, dtype="int8", index_type="ivf")
+    centroids = np.array(store._ivf.centroids)
+
+    added = _clustered(100, 30, seed=3)
+    store.upsert([f"new{row}-0" for row in range(len(added))], added, ["text"] * len(added), [{}] * len(added))
+    store.delete([f"job{row}-0" for row in range(50)])
+    store.flush()
+    reopened = LocalVectorStore(str(tmp_path), dtype="int8", index_type="ivf")
+
+    np.testing.assert_array_equal(reopened._ivf.centroids, centroids)
+    assert reopened.count() == len(vectors) + len(added) - 50
+    for row in range(0, len(added), 10):
+        assert reopened.query(added[row : row + 1], 1, nprobe=8)[0][0]["id"] == f"new{row}-0"
+    remaining = exact[(exact >= 50).all(axis=1)]
+    assert _recall(reopened, queries[(exact >= 50).all(axis=1)], remaining) >= 0.9
+
+
+def test_flush_retrains_after_large_changes(tmp_path, data):
+    vectors, _, _ = data
+    store = _store(tmp_path, vectors, index_type="ivf")
+    centroids = np.array(store._ivf.centroids)
+    replaced = _clustered(len(vectors) // 2, 30, seed=4)
+    store.upsert([f"job{row}-0" for row in range(len(replaced))], replaced, ["text"] * len(replaced), [{}] * len(replaced))
+    store.flush()
+    assert not np.array_equal(LocalVectorStore(str(tmp_path), index_type="ivf")._ivf.centroids, centroids)
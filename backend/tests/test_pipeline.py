@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import pytest
+
+from app.core.cache import TTLCache
+from app.rag.pipeline import RagPipeline
+from app.rag.retrieval.types import RetrievedChunk
+
+
+class _Retriever:
+    def __init__(self, n_results: int) -> None:
+        self.n_results = n_results
+
+    def filter_vocabulary(self) -> Dict[str, List[str]]:
+        return {}
+
+    def retrieve(self, query: str, **_: Any) -> List[RetrievedChunk]:
+        return [RetrievedChunk(id=f"job{idx}-0", text="text", metadata={}, score=1.0) for idx in range(self.n_results)]
+
+
+class _Reranker:
+    """Costs `pair_seconds` per pair, plus `cold_seconds` on its first call (model loading)."""
+
+    def __init__(self, pair_seconds: float, cold_seconds: float = 0.0) -> None:
+        self.pair_seconds = pair_seconds
+        self.cold_seconds = cold_seconds
+        self.queries: List[str] = []
+
+    def rerank(self, query: str, chunks: List[RetrievedChunk]) -> List[RetrievedChunk]:
+        time.sleep(len(chunks) * self.pair_seconds + (self.cold_seconds if not self.queries else 0.0))
+        self.queries.append(query)
+        return list(reversed(chunks))
+
+
+def _pipeline(reranker: _Reranker, **kwargs: Any) -> RagPipeline:
+    return RagPipeline(retriever=_Retriever(10), llm=None, reranker=reranker, rerank_k=10, **kwargs)
+
+
+def test_seeded_pair_cost_bounds_the_first_budgeted_request():
+    pipeline = _pipeline(_Reranker(0.0), rerank_pair_ms=10)
+    timings: Dict[str, float] = {}
+    pipeline.retrieve("q", 2, use_hybrid=False, use_rerank=True, budget_ms=45, timings=timings)
+    assert 2 <= timings["rerank_k"] <= 4
+
+
+def test_first_request_without_an_estimate_reranks_at_full_depth():
+    pipeline = _pipeline(_Reranker(0.0))
+    timings: Dict[str, float] = {}
+    pipeline.retrieve("q", 2, use_hybrid=False, use_rerank=True, budget_ms=45, timings=timings)
+    assert timings["rerank_k"] == 10
+
+
+def test_warm_up_measures_the_warm_model():
+    reranker = _Reranker(0.002, cold_seconds=0.2)
+    pipeline = _pipeline(reranker)
+    pipeline.warm_up_reranker()
+    assert len(reranker.queries) == 2 and reranker.queries[0] != reranker.queries[1]
+    # The cold first call alone would put the estimate above 25ms per pair.
+    assert pipeline._rerank_pair_seconds == pytest.approx(0.002, abs=0.005)
+
+    timings: Dict[str, float] = {}
+    pipeline.retrieve("q", 2, use_hybrid=False, use_rerank=True, budget_ms=5, timings=timings)
+    assert timings["rerank_k"] < 10
+
+
+def test_warm_up_without_reranker_is_a_no_op():
+    pipeline = _pipeline(None)
+    pipeline.warm_up_reranker()
+    assert pipeline._rerank_pair_seconds is None
+
+
+class _StreamingLLM:
+    def __init__(self, deltas: List[str], fail_after: Optional[int] = None) -> None:
+        self.deltas = deltas
+        self.fail_after = fail_after
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        for idx, delta in enumerate(self.deltas):
+            if idx == self.fail_after:
+                raise RuntimeError("connection reset")
+            yield delta
+
+
+def _stream(pipeline: RagPipeline) -> tuple[List[str], Optional[Exception]]:
+    parts: List[str] = []
+
+    async def consume() -> None:
+        async for delta in pipeline.astream_answer("q", _Retriever(2).retrieve("q")):
+            parts.append(delta)
+
+    try:
+        asyncio.run(consume())
+    except Exception as exc:
+        return parts, exc
+    return parts, None
+
+
+@pytest.mark.parametrize(
+    ("fail_after", "expected", "raises"),
+    [
+        (None, ["Two ", "jobs."], False),
+        (0, None, False),
+        (1, ["Two "], True),
+    ],
+)
+def test_astream_answer_failures(fail_after, expected, raises):
+    answer_cache = TTLCache(8, 60)
+    pipeline = RagPipeline(
+        retriever=_Retriever(2), llm=_StreamingLLM(["Two ", "jobs."], fail_after), answer_cache=answer_cache
+    )
+    parts, error = _stream(pipeline)
+    assert (error is not None) == raises
+    if expected is None:
+        # Nothing streamed yet: the retrieval-only fallback message is the whole answer.
+        assert len(parts) == 1 and "LLM not configured" in parts[0]
+    else:
+        assert parts == expected
+    assert answer_cache.stats()["entries"] == (1 if fail_after is None else 0)
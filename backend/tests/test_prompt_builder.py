@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from typing import Dict, List
+
+import pytest
+
+from app.rag.prompts.builder import build_prompt
+from app.rag.prompts.tokens import TokenCounter
+from app.rag.retrieval.types import RetrievedChunk
+
+
+_SENTENCES = [
+    "We build streaming data pipelines in Python and Spark.",
+    "You will own ingestion from dozens of partner systems.",
+    "The team values code review, testing and clear documentation.",
+    "Experience with SQL warehouses and orchestration tools is required.",
+    "Compensation includes equity and a generous learning budget.",
+]
+
+
+def _chunk(chunk_id: str, text: str, title: str = "Data Engineer") -> RetrievedChunk:
+    metadata = {"job_title": title, "company": "Acme", "location": "Remote", "level": "Senior Level"}
+    return RetrievedChunk(id=chunk_id, text=text, metadata=metadata, score=1.0)
+
+
+@pytest.fixture
+def counter() -> TokenCounter:
+    return TokenCounter()
+
+
+@pytest.fixture
+def chunks() -> List[RetrievedChunk]:
+    return [_chunk(f"job{idx}-0", " ".join(_SENTENCES * 2), title=f"Role {idx}") for idx in range(6)]
+
+
+def test_without_budget_every_chunk_is_included_in_rank_order(chunks, counter):
+    usage: Dict[str, int] = {}
+    prompt = build_prompt("data engineer", chunks, counter=counter, usage=usage)
+    positions = [prompt.index(f"[{idx}] Role {idx - 1} at Acme") for idx in range(1, len(chunks) + 1)]
+    assert positions == sorted(positions)
+    assert usage["prompt_tokens"] == counter.count(prompt)
+
+
+@pytest.mark.parametrize("max_tokens", [250, 400, 700])
+def test_prompt_fits_budget(chunks, counter, max_tokens):
+    usage: Dict[str, int] = {}
+    prompt = build_prompt("data engineer", chunks, max_tokens=max_tokens, counter=counter, usage=usage)
+    assert usage["prompt_tokens"] == counter.count(prompt)
+    assert usage["prompt_tokens"] <= max_tokens
+
+
+def test_higher_ranks_keep_more_text(chunks, counter):
+    full = build_prompt("data engineer", chunks, counter=counter)
+    budget = counter.count(full) // 2
+    prompt = build_prompt("data engineer", chunks, max_tokens=budget, counter=counter)
+    context = prompt.split("Context:\n", 1)[1].split("\n\nRespond ONLY", 1)[0]
+    bodies = [block.split("\n", 1)[1] for block in context.split("\n\n")]
+    # The top chunk survives whole; later ones are trimmed or dropped, never longer than an earlier one.
+    assert bodies[0] == chunks[0].text
+    assert len(bodies) < len(chunks) or bodies[-1] != chunks[-1].text
+    assert all(len(earlier) >= len(later) for earlier, later in zip(bodies, bodies[1:]))
+
+
+def test_trimmed_chunks_end_at_sentence_boundaries(chunks, counter):
+    prompt = build_prompt("data engineer", chunks, max_tokens=300, counter=counter)
+    context = prompt.split("Context:\n", 1)[1].split("\n\nRespond ONLY", 1)[0]
+    for block in context.split("\n\n"):
+        header, body = block.split("\n", 1)
+        assert body.endswith("."), header
+        assert body in chunks[0].text
+
+
+def test_budget_below_template_keeps_no_context(chunks, counter):
+    prompt = build_prompt("data engineer", chunks, max_tokens=10, counter=counter)
+    assert "No context found." in prompt
+
+
+@pytest.mark.parametrize("max_tokens", [200, 260, 320, 450])
+def test_kept_blocks_are_numbered_consecutively(counter, max_tokens):
+    chunks = [
+        _chunk("job0-0", " ".join(_SENTENCES)),
+        _chunk("job1-0", "word " * 400, title="Huge"),
+        _chunk("job2-0", _SENTENCES[0], title="Small"),
+    ]
+    prompt = build_prompt("q", chunks, max_tokens=max_tokens, counter=counter)
+    context = prompt.split("Context:\n", 1)[1].split("\n\nRespond ONLY", 1)[0]
+    numbers = [int(block[1 : block.index("]")]) for block in context.split("\n\n")]
+    assert numbers == list(range(1, len(numbers) + 1))
+
+
+def test_overlap_between_adjacent_chunks_is_included_once(counter):
+    shared = "Experience with SQL warehouses and orchestration tools is required."
+    first = " ".join(_SENTENCES[:2]) + " " + shared
+    second = shared + " " + " ".join(_SENTENCES[4:])
+    prompt = build_prompt("q", [_chunk("job7-0", first), _chunk("job7-1", second)], counter=counter)
+    assert prompt.count(shared) == 1
+    assert _SENTENCES[4] in prompt
+
+
+def test_overlap_is_kept_in_the_higher_ranked_chunk(counter):
+    shared = "Experience with SQL warehouses and orchestration tools is required."
+    first = " ".join(_SENTENCES[:2]) + " " + shared
+    second = shared + " " + " ".join(_SENTENCES[4:])
+    prompt = build_prompt("q", [_chunk("job7-1", second), _chunk("job7-0", first)], counter=counter)
+    assert prompt.count(shared) == 1
+    assert f"\n{second}" in prompt
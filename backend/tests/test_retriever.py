@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from app.rag.retrieval.retriever import Retriever
+from app.rag.retrieval.types import RetrievedChunk
+
+
+_TIMEOUT = 0.05
+
+
+class _Gate:
+    """Blocks a leg until released, so timeouts don't depend on sleep lengths."""
+
+    def __init__(self, blocked: bool) -> None:
+        self._event = threading.Event()
+        if not blocked:
+            self._event.set()
+
+    def wait(self) -> None:
+        assert self._event.wait(5.0), "leg was never released"
+
+    def release(self) -> None:
+        self._event.set()
+
+
+class _Embedder:
+    def embed_query(self, queries: List[str]) -> List[List[float]]:
+        return [[float(len(query))] for query in queries]
+
+
+class _VectorStore:
+    def __init__(self, gate: _Gate) -> None:
+        self.gate = gate
+        self.calls = 0
+
+    def query(self, embeddings: List[List[float]], n_results: int, nprobe: Any = None, filters: Any = None):
+        self.calls += 1
+        self.gate.wait()
+        return [
+            [{"id": f"vec{row}-0", "document": "v", "metadata": {}, "score": 1.0 - row / 10} for row in range(n_results)]
+            for _ in embeddings
+        ]
+
+
+class _BM25:
+    def __init__(self, gate: _Gate, empty: bool = False) -> None:
+        self.gate = gate
+        self.empty = empty
+
+    def query(self, query: str, top_k: int, filters: Any = None) -> List[RetrievedChunk]:
+        self.gate.wait()
+        if self.empty:
+            return []
+        return [RetrievedChunk(id=f"bm{row}-0", text="b", metadata={}, score=10.0 - row) for row in range(top_k)]
+
+
+@pytest.fixture
+def gates():
+    created: List[_Gate] = []
+
+    def make(blocked: bool) -> _Gate:
+        created.append(_Gate(blocked))
+        return created[-1]
+
+    yield make
+    for gate in created:
+        gate.release()
+
+
+def _retriever(vector_gate: _Gate, bm25: _BM25, **kwargs: Any) -> Retriever:
+    return Retriever(_VectorStore(vector_gate), _Embedder(), top_k=3, bm25_index=bm25, max_workers=4, **kwargs)
+
+
+def _sources(results: List[RetrievedChunk]) -> set:
+    return {chunk.id[:2] for chunk in results}
+
+
+@pytest.mark.parametrize(
+    ("vector_timeout", "bm25_timeout"),
+    [(_TIMEOUT, 0.0), (_TIMEOUT, _TIMEOUT)],
+)
+def test_slow_vector_leg_falls_back_to_bm25(gates, vector_timeout, bm25_timeout):
+    retriever = _retriever(gates(True), _BM25(gates(False)), vector_timeout=vector_timeout, bm25_timeout=bm25_timeout)
+    timings: Dict[str, float] = {}
+    started = time.monotonic()
+    results = retriever.retrieve("query", use_hybrid=True, timings=timings)
+    assert time.monotonic() - started < 1.0
+    assert _sources(results) == {"bm"}
+    assert "vector" not in timings and "bm25" in timings
+
+
+@pytest.mark.parametrize(
+    ("vector_timeout", "bm25_timeout"),
+    [(0.0, _TIMEOUT), (_TIMEOUT, _TIMEOUT)],
+)
+def test_slow_bm25_leg_leaves_vector_results(gates, vector_timeout, bm25_timeout):
+    retriever = _retriever(gates(False), _BM25(gates(True)), vector_timeout=vector_timeout, bm25_timeout=bm25_timeout)
+    timings: Dict[str, float] = {}
+    results = retriever.retrieve("query", use_hybrid=True, timings=timings)
+    assert _sources(results) == {"ve"}
+    assert "bm25" not in timings and "vector" in timings
+
+
+def test_vector_leg_is_awaited_without_bm25_results(gates):
+    vector_gate = gates(True)
+    retriever = _retriever(vector_gate, _BM25(gates(False), empty=True), vector_timeout=_TIMEOUT, bm25_timeout=_TIMEOUT)
+    threading.Timer(4 * _TIMEOUT, vector_gate.release).start()
+    assert _sources(retriever.retrieve("query", use_hybrid=True)) == {"ve"}
+
+
+def test_queued_leg_runs_on_the_calling_thread(gates):
+    blocker = gates(True)
+    retriever = Retriever(
+        _VectorStore(gates(False)), _Embedder(), top_k=3, bm25_index=_BM25(gates(False)), max_workers=1,
+        bm25_timeout=_TIMEOUT,
+    )
+    # Occupy the only worker: the BM25 leg stays queued, so its deadline never starts.
+    retriever._executor.submit(blocker.wait)
+    results = retriever.retrieve("query", use_hybrid=True)
+    assert _sources(results) == {"ve", "bm"}
+
+
+def test_batch_enforces_vector_timeout_when_every_query_can_fall_back(gates):
+    retriever = _retriever(gates(True), _BM25(gates(False)), vector_timeout=_TIMEOUT, bm25_timeout=_TIMEOUT)
+    started = time.monotonic()
+    results = retriever.retrieve_many(["a", "b"], use_hybrid=[True, True])
+    assert time.monotonic() - started < 1.0
+    assert [_sources(result) for result in results] == [{"bm"}, {"bm"}]
+
+
+def test_batch_waits_for_a_vector_call_shared_with_a_vector_only_query(gates):
+    vector_gate = gates(True)
+    retriever = _retriever(vector_gate, _BM25(gates(False)), vector_timeout=_TIMEOUT)
+    threading.Timer(4 * _TIMEOUT, vector_gate.release).start()
+    results = retriever.retrieve_many(["a", "b"], use_hybrid=[True, False])
+    assert _sources(results[1]) == {"ve"}
+    assert _sources(results[0]) == {"ve", "bm"}
+
+
+def test_batch_drops_a_late_bm25_leg(gates):
+    retriever = _retriever(gates(False), _BM25(gates(True)), bm25_timeout=_TIMEOUT)
+    results = retriever.retrieve_many(["a"], use_hybrid=[True])
+    assert _sources(results[0]) == {"ve"}
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import time
+
+import numpy as np
+import pytest
+
+from app.core.semantic_cache import SemanticCache
+
+
+def _unit(*values: float) -> np.ndarray:
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_similar_query_in_the_same_namespace_hits():
+    cache = SemanticCache(8, threshold=0.95)
+    cache.add("k5", _unit(1, 0, 0), "data engineer jobs", "cached")
+    match = cache.lookup("k5", _unit(1, 0.1, 0))
+    assert match is not None
+    assert (match.value, match.query) == ("cached", "data engineer jobs")
+    assert match.similarity == pytest.approx(float(_unit(1, 0.1, 0)[0]))
+    assert cache.lookup("k5", _unit(1, 1, 0)) is None
+    assert cache.lookup("k10", _unit(1, 0, 0)) is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_expired_entries_miss():
+    cache = SemanticCache(8, threshold=0.9, ttl_seconds=0.01)
+    cache.add("ns", _unit(1, 0), "q", "v")
+    time.sleep(0.02)
+    assert cache.lookup("ns", _unit(1, 0)) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_near_duplicate_replaces_its_entry():
+    cache = SemanticCache(8, threshold=0.9)
+    cache.add("ns", _unit(1, 0), "q", "old")
+    cache.add("ns", _unit(1, 0), "q", "new")
+    assert cache.stats()["entries"] == 1
+    assert cache.lookup("ns", _unit(1, 0)).value == "new"
+
+
+def test_oldest_entry_is_overwritten_when_full():
+    cache = SemanticCache(2, threshold=0.99)
+    cache.add("ns", _unit(1, 0, 0), "a", "a")
+    cache.add("ns", _unit(0, 1, 0), "b", "b")
+    cache.add("ns", _unit(0, 0, 1), "c", "c")
+    assert cache.lookup("ns", _unit(1, 0, 0)) is None
+    assert cache.lookup("ns", _unit(0, 1, 0)).value == "b"
+    assert cache.lookup("ns", _unit(0, 0, 1)).value == "c"
+
+
+def test_namespace_ids_are_reclaimed_when_their_slots_are_overwritten():
+    cache = SemanticCache(4, threshold=0.99)
+    for idx in range(1000):
+        cache.add(f"budget={idx}", _unit(1, idx % 7), f"q{idx}", idx)
+        assert len(cache._namespace_ids) <= 4
+    assert set(cache._namespace_ids.values()) <= set(range(4))
+    for idx in range(996, 1000):
+        assert cache.lookup(f"budget={idx}", _unit(1, idx % 7)).value == idx
+    assert cache.lookup("budget=995", _unit(1, 995 % 7)) is None
+
+
+def test_namespace_shared_by_several_slots_survives_partial_eviction():
+    cache = SemanticCache(3, threshold=0.99)
+    cache.add("a", _unit(1, 0, 0), "a1", "a1")
+    cache.add("a", _unit(0, 1, 0), "a2", "a2")
+    cache.add("b", _unit(0, 0, 1), "b1", "b1")
+    # Overwrites a1; "a" still owns the second slot.
+    cache.add("c", _unit(1, 1, 0), "c1", "c1")
+    assert cache.lookup("a", _unit(0, 1, 0)).value == "a2"
+    # Overwrites a2, the last slot of "a", whose ID is then free for "d".
+    cache.add("d", _unit(1, 0, 1), "d1", "d1")
+    assert "a" not in cache._namespace_ids
+    assert cache.lookup("a", _unit(0, 1, 0)) is None
+    assert cache.lookup("d", _unit(1, 0, 1)).value == "d1"
+    assert cache.lookup("b", _unit(0, 0, 1)).value == "b1"
+    assert cache.lookup("c", _unit(1, 1, 0)).value == "c1"
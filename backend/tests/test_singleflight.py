@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+class _Redis:
+    """The lock commands SingleFlight uses: SET NX PX, EXISTS and the release script."""
+
+    def __init__(self) -> None:
+        self.values: Dict[str, str] = {}
+
+    def set(self, key: str, value: str, nx: bool = False, px: Optional[int] = None) -> Optional[bool]:
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    def exists(self, key: str) -> int:
+        return int(key in self.values)
+
+    def eval(self, script: str, numkeys: int, key: str, token: str) -> int:
+        if self.values.get(key) == token:
+            del self.values[key]
+            return 1
+        return 0
+
+
+def _counting(result: Any, calls: List[int], delay: float = 0.01):
+    async def compute() -> Any:
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return result
+
+    return compute
+
+
+def test_concurrent_callers_share_one_computation():
+    flight = SingleFlight()
+    calls: List[int] = []
+
+    async def scenario() -> List[Any]:
+        compute = _counting("answer", calls)
+        return await asyncio.gather(*(flight.do("k", compute) for _ in range(5)), flight.do("other", compute))
+
+    assert asyncio.run(scenario()) == ["answer"] * 6
+    assert len(calls) == 2
+    assert flight.stats() == {"leaders": 2, "local_followers": 4, "remote_followers": 0, "in_flight": 0}
+
+
+def test_cancelled_caller_does_not_cancel_the_computation():
+    flight = SingleFlight()
+    calls: List[int] = []
+
+    async def scenario() -> Any:
+        compute = _counting("answer", calls, delay=0.05)
+        first = asyncio.ensure_future(flight.do("k", compute))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(flight.do("k", compute))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(scenario()) == "answer"
+    assert len(calls) == 1
+
+
+def test_errors_reach_every_caller_and_are_not_remembered():
+    flight = SingleFlight()
+    attempts: List[int] = []
+
+    async def failing() -> Any:
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("llm down")
+
+    async def scenario() -> List[Any]:
+        results = await asyncio.gather(flight.do("k", failing), flight.do("k", failing), return_exceptions=True)
+        results.append(await flight.do("k", _counting("answer", [])))
+        return results
+
+    first, second, third = asyncio.run(scenario())
+    assert isinstance(first, RuntimeError) and isinstance(second, RuntimeError)
+    assert third == "answer"
+    assert len(attempts) == 1
+
+
+def test_follower_loads_the_result_published_by_the_lock_holder():
+    redis = _Redis()
+    redis.values["lock:k"] = "other-worker"
+    flight = SingleFlight(redis, poll_interval_seconds=0.005)
+    published: Dict[str, str] = {}
+    calls: List[int] = []
+
+    async def load() -> Optional[str]:
+        return published.get("k")
+
+    async def scenario() -> str:
+        asyncio.get_running_loop().call_later(0.03, published.__setitem__, "k", "from other worker")
+        return await flight.do("k", _counting("local", calls), load)
+
+    assert asyncio.run(scenario()) == "from other worker"
+    assert calls == []
+    assert flight.stats()["remote_followers"] == 1
+
+
+def test_follower_computes_when_the_lock_holder_gives_up():
+    redis = _Redis()
+    redis.values["lock:k"] = "other-worker"
+    flight = SingleFlight(redis, poll_interval_seconds=0.005)
+    calls: List[int] = []
+
+    async def load() -> Optional[str]:
+        return None
+
+    async def scenario() -> str:
+        asyncio.get_running_loop().call_later(0.02, redis.values.pop, "lock:k")
+        return await flight.do("k", _counting("local", calls), load)
+
+    assert asyncio.run(scenario()) == "local"
+    assert len(calls) == 1
+    # The follower took and then released its own lock.
+    assert "lock:k" not in redis.values
+
+
+@pytest.mark.parametrize("lock_lost", [False, True])
+def test_leader_releases_only_its_own_lock(lock_lost):
+    redis = _Redis()
+    flight = SingleFlight(redis)
+
+    async def compute() -> str:
+        assert "lock:k" in redis.values
+        if lock_lost:
+            # The lock expired mid-computation and another worker took it.
+            redis.values["lock:k"] = "other-worker"
+        return "answer"
+
+    async def load() -> Optional[str]:
+        return None
+
+    assert asyncio.run(flight.do("k", compute, load)) == "answer"
+    assert redis.values.get("lock:k") == ("other-worker" if lock_lost else None)
+
+
+def test_follower_stops_waiting_at_the_timeout():
+    redis = _Redis()
+    redis.values["lock:k"] = "stuck-worker"
+    flight = SingleFlight(redis, wait_timeout_seconds=0.03, poll_interval_seconds=0.005)
+
+    async def load() -> Optional[str]:
+        return None
+
+    assert asyncio.run(flight.do("k", _counting("local", []), load)) == "local"
+    assert redis.values["lock:k"] == "stuck-worker"
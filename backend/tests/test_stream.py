@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import json
+from typing import Any, AsyncIterator, List, Optional, Tuple
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routes import get_pipeline, get_response_cache, get_semantic_cache, router
+from app.core.cache import TieredCache, TTLCache
+from app.rag.retrieval.types import RetrievedChunk
+from app.rag.schemas import QueryResponse
+
+
+class _Pipeline:
+    """Retrieves fixed chunks and streams `deltas`, failing after `fail_after` of them."""
+
+    filter_extraction = False
+
+    def __init__(self, deltas: List[str], fail_after: Optional[int] = None) -> None:
+        self.deltas = deltas
+        self.fail_after = fail_after
+        self.retrievals = 0
+
+    async def aretrieve(self, **_: Any) -> List[RetrievedChunk]:
+        self.retrievals += 1
+        return [RetrievedChunk(id="job1-0", text="Data engineer", metadata={"job_title": "Data Engineer"}, score=1.0)]
+
+    async def astream_answer(self, query: str, results: List[RetrievedChunk]) -> AsyncIterator[str]:
+        for idx, delta in enumerate(self.deltas):
+            if idx == self.fail_after:
+                raise RuntimeError("connection reset")
+            yield delta
+
+
+def _client(pipeline: _Pipeline) -> Tuple[TestClient, TieredCache]:
+    cache = TieredCache(
+        lambda: None,
+        60,
+        encode=lambda response: response.model_dump_json(),
+        decode=QueryResponse.model_validate_json,
+        l1=TTLCache(16, 60),
+    )
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_pipeline] = lambda: pipeline
+    app.dependency_overrides[get_response_cache] = lambda: cache
+    app.dependency_overrides[get_semantic_cache] = lambda: None
+    return TestClient(app), cache
+
+
+def _events(body: str) -> List[Tuple[str, Any]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        name, data = block.split("\n", 1)
+        events.append((name[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def _stream(client: TestClient) -> List[Tuple[str, Any]]:
+    response = client.post("/api/query/stream", json={"query": "data engineer"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    return _events(response.text)
+
+
+def test_stream_sends_hits_tokens_and_done_then_caches():
+    pipeline = _Pipeline(["Two ", "jobs."])
+    client, cache = _client(pipeline)
+    events = _stream(client)
+    assert [name for name, _ in events] == ["hits", "token", "token", "done"]
+    assert events[0][1][0]["id"] == "job1-0"
+    assert events[-1][1] == {"answer": "Two jobs."}
+
+    replayed = _stream(client)
+    assert [name for name, _ in replayed] == ["hits", "token", "done"]
+    assert replayed[-1][1] == {"answer": "Two jobs."}
+    assert pipeline.retrievals == 1
+
+
+@pytest.mark.parametrize("fail_after", [1, 2])
+def test_failure_mid_stream_sends_error_without_done_or_caching(fail_after):
+    pipeline = _Pipeline(["Two ", "jobs", "."], fail_after=fail_after)
+    client, cache = _client(pipeline)
+    events = _stream(client)
+    names = [name for name, _ in events]
+    assert names == ["hits"] + ["token"] * fail_after + ["error"]
+    assert "done" not in names
+
+    assert cache.l1.stats()["entries"] == 0
+    _stream(client)
+    assert pipeline.retrievals == 2
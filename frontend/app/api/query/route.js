@@ -9,8 +9,7 @@ export async function POST(request) {
     cache: "no-store"
   });
 
-  const body = await response.text();
-  return new Response(body, {
+  return new Response(response.body, {
     status: response.status,
     headers: { "Content-Type": response.headers.get("content-type") || "application/json" }
   });
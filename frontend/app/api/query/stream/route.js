@@ -0,0 +1,21 @@
+export async function POST(request) {
+  const apiBaseUrl = process.env.API_BASE_URL || "http://localhost:8000";
+  const payload = await request.json();
+
+  const response = await fetch(`${apiBaseUrl}/api/query/stream`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(payload),
+    cache: "no-store"
+  });
+
+  // Pass the event stream through unbuffered so hits and tokens reach the browser as they arrive.
+  return new Response(response.body, {
+    status: response.status,
+    headers: {
+      "Content-Type": response.headers.get("content-type") || "text/event-stream",
+      "Cache-Control": "no-cache",
+      "X-Accel-Buffering": "no"
+    }
+  });
+}
@@ -79,6 +79,29 @@ const extractSummary = (text) => {
   return summary.join("\n").trim();
 };
 
+const readEvents = async (response, onEvent) => {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true }).replace(/\r\n/g, "\n");
+    let boundary;
+    while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      let event = "message";
+      const data = [];
+      for (const line of block.split("\n")) {
+        if (line.startsWith("event:")) event = line.slice(6).trim();
+        else if (line.startsWith("data:")) data.push(line.slice(5).trim());
+      }
+      if (data.length > 0) onEvent(event, JSON.parse(data.join("\n")));
+    }
+  }
+};
+
 export default function Home() {
   const [query, setQuery] = useState("");
   const [topK, setTopK] = useState(5);
@@ -99,7 +122,7 @@ export default function Home() {
     setSuggestions([]);
 
     try {
-      const res = await fetch("/api/query", {
+      const res = await fetch("/api/query/stream", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify({
@@ -115,11 +138,20 @@ export default function Home() {
         throw new Error(detail || "Request failed");
       }
 
-      const data = await res.json();
-      const responseAnswer = data.answer || "";
-      setAnswer(responseAnswer);
-      setSuggestions(parseSuggestions(responseAnswer));
-      setHits(data.hits || []);
+      // Hits arrive as soon as retrieval finishes; the answer streams in afterwards.
+      await readEvents(res, (event, data) => {
+        if (event === "hits") {
+          setHits(data || []);
+        } else if (event === "token") {
+          setAnswer((current) => current + (data.text || ""));
+        } else if (event === "done") {
+          const responseAnswer = data.answer || "";
+          setAnswer(responseAnswer);
+          setSuggestions(parseSuggestions(responseAnswer));
+        } else if (event === "error") {
+          setError(data.detail || "The answer was interrupted.");
+        }
+      });
     } catch (err) {
       setError(err.message || "Something went wrong.");
     } finally {